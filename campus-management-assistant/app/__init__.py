@@ -50,6 +50,71 @@ def create_app() -> Flask:
             except Exception:
                 # Column likely exists or dialect doesn't support this; ignore
                 pass
+            # Backfill conditional-fetch counters on scrape_logs
+            db.session.rollback()
+            for column in ('bytes_fetched', 'bytes_saved', 'not_modified', 'extractions_skipped',
+                           'requests_made', 'retries', 'latency_ms_avg', 'latency_ms_max',
+                           'pages_crawled', 'robots_blocked', 'pages_skipped', 'documents_replaced'):
+                try:
+                    db.session.execute(text(f"ALTER TABLE scrape_logs ADD COLUMN {column} INTEGER DEFAULT 0"))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+            # Backfill crawl settings and crawled pages' stored links
+            for table, column in (('scraped_websites', 'crawl_enabled INTEGER DEFAULT 0'),
+                                  ('scraped_websites', 'crawl_max_depth INTEGER'),
+                                  ('scraped_websites', 'crawl_max_pages INTEGER'),
+                                  ('scraped_websites', 'crawl_include TEXT'),
+                                  ('scraped_websites', 'crawl_exclude TEXT'),
+                                  ('fetch_records', 'links TEXT'),
+                                  ('fetch_records', 'lastmod VARCHAR')):
+                try:
+                    db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column}"))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+            # Backfill the source URL of scraped chatbot documents
+            try:
+                db.session.execute(text("ALTER TABLE chatbot_documents ADD COLUMN source_url VARCHAR"))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            try:
+                db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_chatbot_documents_source_url "
+                                        "ON chatbot_documents (source_url)"))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            # Backfill blob references (content-addressed uploads and scraped PDFs)
+            for table in ('notice_files', 'fetch_records'):
+                try:
+                    db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN blob_sha256 VARCHAR(64) REFERENCES blobs(sha256)"))
+                    db.session.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_blob_sha256 ON {table} (blob_sha256)"))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+            # Backfill the MinHash signature column of chatbot documents
+            try:
+                db.session.execute(text("ALTER TABLE chatbot_documents ADD COLUMN minhash BLOB"))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            # Backfill the PDF page number of chatbot passages
+            try:
+                db.session.execute(text("ALTER TABLE chatbot_chunks ADD COLUMN page_no INTEGER"))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            # Full-text mirrors for notices, FAQs and chatbot document passages
+            from .services.search_service import ensure_fts
+            ensure_fts()
+            # Chatbot document index from its on-disk artifact (rebuilt if stale), when it
+            # serves searches; the default FTS backend never reads it
+            from .services import chatbot_index_store
+            from .services.chatbot_service import search_backend
+            if chatbot_index_store.INDEX_WARM and not chatbot_index_store.LAST_WARM \
+                    and search_backend() == 'memory':
+                chatbot_index_store.warm_index()
         except Exception:
             pass
         try:
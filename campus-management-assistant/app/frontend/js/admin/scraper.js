@@ -5,7 +5,9 @@ document.addEventListener('DOMContentLoaded', () => {
   const previewContainer = document.getElementById('previewContainer');
   const indicator = document.getElementById('scrapeIndicator');
   const btnRunAllTop = document.getElementById('btnRunAllTop');
+  const indexStats = document.getElementById('indexStats');
   if (!list) return;
+  let sitesById = {};
   function setIndicator(text, show) {
     if (!indicator) return;
     indicator.textContent = text || 'Running…';
@@ -23,12 +25,58 @@ document.addEventListener('DOMContentLoaded', () => {
       .then(data => {
         if (!data || !data.ok) return;
         const sites = Array.isArray(data.sites) ? data.sites : [];
+        sitesById = Object.fromEntries(sites.map(s => [String(s.id), s]));
         list.innerHTML = sites.map(siteHtml).join('');
         wireActions();
       })
       .catch(() => {});
   }
 
+  function loadIndexStats() {
+    if (!indexStats) return;
+    fetch('/api/admin/scraper/index-stats')
+      .then(r => r.json())
+      .then(d => { if (d && d.ok) indexStats.innerHTML = indexStatsHtml(d.stats || {}); })
+      .catch(() => {});
+  }
+
+  function indexStatsHtml(st) {
+    const kb = n => Math.round((n || 0) / 1024);
+    const types = Object.entries(st.by_source_type || {}).map(([t, n]) => `${escapeHtml(t)} ${n}`).join(' · ');
+    const growth = (st.growth || []).map(g =>
+      `<span style="margin-right:12px;">${escapeHtml(g.day)}: +${g.added} / −${g.replaced}</span>`).join('');
+    return `
+      <div style="padding:12px 16px; margin-bottom:16px; border:1px solid #1f2933; border-radius:8px; color:#9ca3af;">
+        <div style="color:#e5e7eb; margin-bottom:6px;">Chatbot index</div>
+        <div>Documents: ${st.documents || 0} (${types || 'none'}) · ${kb(st.content_chars)} KB text · ${st.source_urls || 0} scraped URLs${st.scraped_without_url ? ` · ${st.scraped_without_url} older scraped documents without URL` : ''}</div>
+        <div>In memory: ${st.indexed_documents || 0} documents in ${st.indexed_chunks || 0} passages, ${st.indexed_terms || 0} terms, ${st.indexed_tokens || 0} tokens · artifact ${kb(st.artifact_bytes)} KB</div>
+        <div>Last 7 days (added / replaced): ${growth || 'no changes'}</div>
+      </div>`;
+  }
+
+  // Scrapes run as background jobs; poll the job until it finishes
+  function pollJob(jobId, onUpdate) {
+    return new Promise((resolve, reject) => {
+      function tick() {
+        fetch(`/api/admin/scraper/jobs/${jobId}`)
+          .then(r => r.json())
+          .then(d => {
+            if (!d || !d.ok || !d.job) { reject(new Error('job lookup failed')); return; }
+            if (onUpdate) onUpdate(d.job);
+            if (d.job.done) resolve(d.job); else setTimeout(tick, 1500);
+          })
+          .catch(reject);
+      }
+      tick();
+    });
+  }
+
+  function progressText(job) {
+    if (job.status === 'queued') return 'Queued…';
+    const kb = Math.round((job.bytes_fetched || 0) / 1024);
+    return `Sites ${job.sites_done}/${job.sites_total} · PDFs ${job.pdfs_fetched} · ${kb} KB`;
+  }
+
   // Run all sources
   window.runAllScrapers = function(){
     setIndicator('Running all sources…', true);
@@ -36,12 +84,15 @@ document.addEventListener('DOMContentLoaded', () => {
     fetch('/api/admin/scraper/run-all', { method: 'POST' })
       .then(r => r.json())
       .then(d => {
-        const ok = d && d.ok;
-        const completed = d && d.completed;
-        const total = d && d.total;
-        toast && toast.show && toast.show(ok ? `Run all completed (${completed}/${total})` : 'Run all failed', ok ? 'success' : 'error');
+        if (!d || !d.ok || !d.job_id) throw new Error('submit failed');
+        return pollJob(d.job_id, job => setIndicator(progressText(job), true));
+      })
+      .then(job => {
+        const ok = job.status === 'success';
+        toast && toast.show && toast.show(`Run all ${job.status} (${job.sites_done - job.sites_failed}/${job.sites_total})`, ok ? 'success' : 'error');
         // Show latest logs after a short delay
         setTimeout(() => openPreviewForSite(null), 500);
+        loadIndexStats();
       })
       .catch(() => { toast && toast.show && toast.show('Run all error', 'error'); })
       .finally(() => { disableRunButtons(false); setTimeout(() => setIndicator('', false), 800); });
@@ -52,19 +103,59 @@ document.addEventListener('DOMContentLoaded', () => {
       <div class="scraper-item" data-id="${s.id}">
         <div class="scraper-info">
           <h3>${escapeHtml(s.url)}</h3>
-          <p class="meta">Added: ${escapeHtml(s.added_at || '')}</p>
+          <p class="meta">Added: ${escapeHtml(s.added_at || '')}${crawlMeta(s.crawl)}</p>
         </div>
         <div class="scraper-status ${s.enabled ? 'enabled' : 'disabled'}">${s.enabled ? 'ENABLED' : 'DISABLED'}</div>
         <div class="scraper-actions">
           <button class="btn-primary" data-action="run">Run Now</button>
           <button class="btn-secondary" data-action="logs">Logs</button>
+          <button class="btn-secondary" data-action="crawl">Crawl</button>
           <button class="btn-secondary" data-action="toggle">${s.enabled ? 'Disable' : 'Enable'}</button>
           <button class="btn-delete" data-action="delete">Delete</button>
         </div>
       </div>`;
   }
 
+  function crawlMeta(c) {
+    if (!c || !c.enabled) return '';
+    const depth = c.max_depth == null ? 'default' : c.max_depth;
+    const pages = c.max_pages == null ? 'default' : c.max_pages;
+    return ` · Crawl: depth ${escapeHtml(depth)}, up to ${escapeHtml(pages)} pages`;
+  }
+
+  // Crawl settings: follow same-site links from the source URL
+  function editCrawl(id) {
+    const c = (sitesById[String(id)] || {}).crawl || {};
+    const enabled = confirm('Follow links from this source (crawl mode)? Cancel scrapes the single page only.');
+    const settings = { enabled };
+    if (enabled) {
+      const depth = prompt('Link depth (blank for default)', c.max_depth == null ? '' : c.max_depth);
+      if (depth === null) return;
+      const pages = prompt('Maximum pages per run (blank for default)', c.max_pages == null ? '' : c.max_pages);
+      if (pages === null) return;
+      const include = prompt('Only paths matching (comma separated, e.g. /notices/*; blank for all)', (c.include || '').split('\n').join(', '));
+      if (include === null) return;
+      const exclude = prompt('Skip paths matching (comma separated)', (c.exclude || '').split('\n').join(', '));
+      if (exclude === null) return;
+      Object.assign(settings, { max_depth: depth.trim(), max_pages: pages.trim(), include, exclude });
+    }
+    fetch(`/api/admin/scraper/sites/${id}/crawl`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(settings)
+    })
+      .then(r => r.json())
+      .then(d => {
+        toast && toast.show && toast.show(d && d.ok ? 'Crawl settings saved' : ((d && d.message) || 'Save failed'), d && d.ok ? 'success' : 'error');
+        if (d && d.ok) loadSites();
+      })
+      .catch(() => { toast && toast.show && toast.show('Save error', 'error'); });
+  }
+
   function wireActions() {
+    list.querySelectorAll('[data-action="crawl"]').forEach(btn => {
+      btn.addEventListener('click', () => editCrawl(btn.closest('.scraper-item')?.getAttribute('data-id')));
+    });
     list.querySelectorAll('[data-action="run"]').forEach(btn => {
       const id = btn.closest('.scraper-item')?.getAttribute('data-id');
       btn.addEventListener('click', () => {
@@ -77,11 +168,19 @@ document.addEventListener('DOMContentLoaded', () => {
         setIndicator('Running scraper…', true);
         fetch(`/api/admin/scraper/sites/${id}/run`, { method: 'POST' })
           .then(r => r.json())
+          .then(d => {
+            if (d && d.ok && d.job_id) {
+              return pollJob(d.job_id, job => setIndicator(progressText(job), true))
+                .then(job => ({ ok: job.status === 'success', status: job.status }));
+            }
+            return d || { ok: false };
+          })
           .then(d => {
             const label = d.ok ? 'success' : (d.status === 'disabled' ? 'disabled' : 'failed');
             toast && toast.show && toast.show(`Run ${label}`, d.ok ? 'success' : 'error');
             // Show latest logs for this source
             openPreviewForSite(id);
+            loadIndexStats();
             if (window.api && api.emitChange) api.emitChange('scraper', { id });
             // Reflect disabled state explicitly
             if (!d.ok && d.status === 'disabled' && statusEl) {
@@ -211,6 +310,18 @@ document.addEventListener('DOMContentLoaded', () => {
     const status = safe(l, 'status');
     const len = safe(l, 'extracted_text_length');
     const pdfs = safe(l, 'pdf_links_found');
+    const fetched = safe(l, 'bytes_fetched') || '0';
+    const saved = safe(l, 'bytes_saved') || '0';
+    const unchanged = safe(l, 'not_modified') || '0';
+    const skipped = safe(l, 'extractions_skipped') || '0';
+    const reqs = safe(l, 'requests_made') || '0';
+    const retries = safe(l, 'retries') || '0';
+    const latAvg = safe(l, 'latency_ms_avg') || '0';
+    const latMax = safe(l, 'latency_ms_max') || '0';
+    const crawled = safe(l, 'pages_crawled') || '0';
+    const blocked = safe(l, 'robots_blocked') || '0';
+    const unchangedPages = safe(l, 'pages_skipped') || '0';
+    const replaced = safe(l, 'documents_replaced') || '0';
     return `
       <div style="padding: 12px; border-bottom: 1px solid #1f2933;">
         <div style="display:flex; justify-content: space-between; margin-bottom:6px;">
@@ -219,6 +330,11 @@ document.addEventListener('DOMContentLoaded', () => {
         </div>
         <div style="color:#9ca3af;">Extracted text length: ${escapeHtml(len)}</div>
         <div style="color:#9ca3af;">PDF links found: ${escapeHtml(pdfs)}</div>
+        <div style="color:#9ca3af;">Bytes fetched: ${escapeHtml(fetched)} (saved by 304: ${escapeHtml(saved)})</div>
+        <div style="color:#9ca3af;">Not modified: ${escapeHtml(unchanged)}, extractions skipped: ${escapeHtml(skipped)}</div>
+        <div style="color:#9ca3af;">Requests: ${escapeHtml(reqs)} (retries: ${escapeHtml(retries)}), latency avg/max: ${escapeHtml(latAvg)}/${escapeHtml(latMax)} ms</div>
+        <div style="color:#9ca3af;">Pages crawled: ${escapeHtml(crawled)} (blocked by robots.txt: ${escapeHtml(blocked)}, unchanged in sitemap: ${escapeHtml(unchangedPages)})</div>
+        <div style="color:#9ca3af;">Outdated documents replaced: ${escapeHtml(replaced)}</div>
       </div>`;
   }
 
@@ -233,4 +349,5 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 
   loadSites();
+  loadIndexStats();
 });
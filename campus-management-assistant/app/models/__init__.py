@@ -1,9 +1,11 @@
 from .user import User
 from .notice_category import NoticeCategory
 from .notice import Notice
+from .blob import Blob
+from .pdf_extraction import PdfExtraction, PdfPage
 from .notice_file import NoticeFile
 from .faq import FAQ
-from .chatbot_document import ChatbotDocument
-from .scraper import ScrapedWebsite, ScrapeLog
+from .chatbot_document import ChatbotDocument, ChatbotChunk, ChatbotLshBucket, ChatbotChunkTombstone, ChatbotRevision
+from .scraper import ScrapedWebsite, ScrapeLog, ScrapeJob, FetchRecord
 from .logs import EmailLog, SystemLog
 
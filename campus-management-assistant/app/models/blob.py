@@ -0,0 +1,17 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class Blob(db.Model):
+    """A stored file, addressed by the SHA-256 of its bytes (see services/blob_store)."""
+    __tablename__ = 'blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String)
+
+    # Rows pointing at this blob (notice_files, fetch_records); 0 means collectable
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    released_at = db.Column(db.DateTime)  # last time a reference was dropped
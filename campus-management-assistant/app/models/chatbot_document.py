@@ -9,6 +9,8 @@ class ChatbotDocument(db.Model):
 
     source_type = db.Column(db.String, nullable=False)
     source_id = db.Column(db.Integer)
+    # Scraped documents: the page or PDF URL; only its latest version is kept
+    source_url = db.Column(db.String, index=True)
 
     content = db.Column(db.Text, nullable=False)
     content_hash = db.Column(db.String, unique=True, nullable=False)
@@ -16,3 +18,63 @@ class ChatbotDocument(db.Model):
     visibility = db.Column(db.String, nullable=False)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # MinHash signature of the content (services/minhash); b'' when too short to sign,
+    # NULL for documents stored before signatures (scripts/backfill_chatbot_documents.py)
+    minhash = db.Column(db.LargeBinary)
+
+    # Retrieval units (see services/chunking); deleted with the document
+    chunks = db.relationship('ChatbotChunk', lazy=True, order_by='ChatbotChunk.seq',
+                             cascade='all, delete-orphan', back_populates='document')
+    lsh_buckets = db.relationship('ChatbotLshBucket', lazy=True, cascade='all, delete-orphan')
+
+
+class ChatbotChunk(db.Model):
+    """An overlapping passage of a chatbot document: content[start_offset:end_offset]."""
+    __tablename__ = 'chatbot_chunks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('chatbot_documents.id', ondelete='CASCADE'),
+                            nullable=False, index=True)
+    seq = db.Column(db.Integer, nullable=False)  # 0-based position within the document
+    page_no = db.Column(db.Integer)  # 1-based PDF page the passage lies on; NULL for other documents
+
+    start_offset = db.Column(db.Integer, nullable=False)
+    end_offset = db.Column(db.Integer, nullable=False)
+    content = db.Column(db.Text, nullable=False)
+
+    document = db.relationship('ChatbotDocument', back_populates='chunks')
+
+
+class ChatbotLshBucket(db.Model):
+    """One LSH band bucket of a document's MinHash signature, for near-duplicate lookups."""
+    __tablename__ = 'chatbot_lsh_buckets'
+    __table_args__ = (db.Index('ix_chatbot_lsh_buckets_band_bucket', 'band', 'bucket'),)
+
+    document_id = db.Column(db.Integer, db.ForeignKey('chatbot_documents.id', ondelete='CASCADE'),
+                            primary_key=True)
+    band = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.BigInteger, nullable=False)
+
+
+class ChatbotChunkTombstone(db.Model):
+    """A deleted chatbot passage, logged so every worker process drops it from its
+    in-memory index; ids give the order in which the deletes were committed."""
+    __tablename__ = 'chatbot_chunk_tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    chunk_id = db.Column(db.Integer, nullable=False)
+    content = db.Column(db.Text, nullable=False)  # as indexed: removal needs its tokens
+    deleted_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class ChatbotRevision(db.Model):
+    """Single-row counter bumped whenever chatbot passages are added or removed.
+
+    Every worker process compares it with the revision its cached answers were
+    computed at, so a write in one process invalidates the caches of all.
+    """
+    __tablename__ = 'chatbot_revision'
+
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    revision = db.Column(db.Integer, nullable=False, default=0)
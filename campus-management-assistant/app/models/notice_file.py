@@ -11,6 +11,8 @@ class NoticeFile(db.Model):
     file_name = db.Column(db.String, nullable=False)
     file_path = db.Column(db.String, nullable=False)
     file_type = db.Column(db.String)
+    # Content-addressed copy of the file (None for uploads stored before the blob store)
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blobs.sha256'), index=True)
 
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
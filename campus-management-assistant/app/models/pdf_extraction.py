@@ -0,0 +1,42 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class PdfExtraction(db.Model):
+    """Extracted text of a PDF, keyed by the SHA-256 of its bytes and the extractor version."""
+    __tablename__ = 'pdf_extractions'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    # pdf_service.EXTRACTOR_VERSION; rows of other versions are ignored (and re-extracted)
+    extractor_version = db.Column(db.String(32), primary_key=True)
+
+    page_count = db.Column(db.Integer)  # pages in the file (only the first PDF_EXTRACT_MAX_PAGES are read)
+    extract_seconds = db.Column(db.Float)
+    error = db.Column(db.String)  # set when extraction failed for good (unreadable, over memory cap)
+
+    extracted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    pages = db.relationship('PdfPage', lazy=True, order_by='PdfPage.page_number',
+                            cascade='all, delete-orphan', back_populates='extraction')
+
+    @property
+    def text(self):
+        """Normalized text of the document (None if it has none), joined from its pages."""
+        return ' '.join(p.text for p in self.pages) or None
+
+
+class PdfPage(db.Model):
+    """Normalized text of one PDF page (pages without text are not stored)."""
+    __tablename__ = 'pdf_pages'
+    __table_args__ = (
+        db.ForeignKeyConstraint(['sha256', 'extractor_version'],
+                                ['pdf_extractions.sha256', 'pdf_extractions.extractor_version'],
+                                ondelete='CASCADE'),
+    )
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    extractor_version = db.Column(db.String(32), primary_key=True)
+    page_number = db.Column(db.Integer, primary_key=True)  # 1-based
+    text = db.Column(db.Text, nullable=False)
+
+    extraction = db.relationship('PdfExtraction', back_populates='pages')
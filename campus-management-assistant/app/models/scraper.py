@@ -11,6 +11,13 @@ class ScrapedWebsite(db.Model):
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
     enabled = db.Column(db.Boolean, default=True)
 
+    # Crawl mode: follow same-site links from `url` (see services/crawler)
+    crawl_enabled = db.Column(db.Boolean, default=False)
+    crawl_max_depth = db.Column(db.Integer)
+    crawl_max_pages = db.Column(db.Integer)
+    crawl_include = db.Column(db.Text)  # path patterns, one per line
+    crawl_exclude = db.Column(db.Text)
+
 
 class ScrapeLog(db.Model):
     __tablename__ = 'scrape_logs'
@@ -21,7 +28,75 @@ class ScrapeLog(db.Model):
     status = db.Column(db.String)
     extracted_text_length = db.Column(db.Integer)
     pdf_links_found = db.Column(db.Integer)
+    # Conditional fetching: downloaded vs avoided bytes, URLs answered with 304 or an
+    # identical body, PDF texts read from the extraction cache instead of extracted
+    bytes_fetched = db.Column(db.Integer, default=0)
+    bytes_saved = db.Column(db.Integer, default=0)
+    not_modified = db.Column(db.Integer, default=0)
+    extractions_skipped = db.Column(db.Integer, default=0)
+    # HTTP attempts (including retries); latency per URL, summed over its attempts
+    requests_made = db.Column(db.Integer, default=0)
+    retries = db.Column(db.Integer, default=0)
+    latency_ms_avg = db.Column(db.Integer, default=0)
+    latency_ms_max = db.Column(db.Integer, default=0)
+    # Crawl mode: pages fetched (including 304s) and links skipped by robots.txt
+    pages_crawled = db.Column(db.Integer, default=0)
+    robots_blocked = db.Column(db.Integer, default=0)
+    # Sitemap entries not fetched because their <lastmod> is unchanged
+    pages_skipped = db.Column(db.Integer, default=0)
+    # Older chatbot documents of the same URLs retired because the content changed
+    documents_replaced = db.Column(db.Integer, default=0)
 
     scraped_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     website = db.relationship('ScrapedWebsite', backref=db.backref('logs', lazy=True, cascade='all, delete-orphan'))
+
+
+class ScrapeJob(db.Model):
+    __tablename__ = 'scrape_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String, nullable=False)  # 'all' | 'site'
+    website_id = db.Column(db.Integer, db.ForeignKey('scraped_websites.id', ondelete='SET NULL'))
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+
+    # queued -> running -> success | partial | error
+    status = db.Column(db.String, nullable=False, default='queued', index=True)
+    message = db.Column(db.String)
+
+    sites_total = db.Column(db.Integer, default=0)
+    sites_done = db.Column(db.Integer, default=0)
+    sites_failed = db.Column(db.Integer, default=0)
+    pdfs_fetched = db.Column(db.Integer, default=0)
+    bytes_fetched = db.Column(db.Integer, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+
+class FetchRecord(db.Model):
+    """HTTP validators and content fingerprint of the last fetch of a URL."""
+    __tablename__ = 'fetch_records'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String, unique=True, nullable=False)
+    website_id = db.Column(db.Integer, db.ForeignKey('scraped_websites.id'))
+
+    etag = db.Column(db.String)
+    last_modified = db.Column(db.String)
+    content_hash = db.Column(db.String)
+    size = db.Column(db.Integer)
+    file_path = db.Column(db.String)
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blobs.sha256'), index=True)
+    # Crawled pages: same-site links found at the last full parse, one per line,
+    # replayed when the page is answered with 304 so the crawl still reaches them
+    links = db.Column(db.Text)
+    # <lastmod> of the URL's sitemap entry when it was last fetched
+    lastmod = db.Column(db.String)
+
+    fetched_at = db.Column(db.DateTime)  # last 200 response
+    checked_at = db.Column(db.DateTime)  # last request of any outcome
+
+    website = db.relationship('ScrapedWebsite', backref=db.backref('fetch_records', lazy=True, cascade='all, delete-orphan'))
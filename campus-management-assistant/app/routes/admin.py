@@ -2,14 +2,13 @@ from flask import Blueprint, redirect, url_for, request, flash, jsonify, send_fr
 from flask_login import login_required, current_user
 from . import require_role
 from ..extensions import db
-from ..services.notice_service import admin_all_notices, recent_published_notices, create_notice, update_notice, publish_notice, delete_notice_owned, attach_file
+from ..services.notice_service import admin_all_notices, recent_published_notices, create_notice, update_notice, publish_notice, delete_notice_owned, attach_file, remove_legacy_file
 from ..services.faq_service import all_faqs_admin, recent_answered_faqs, create_faq, answer_faq, get_faq
 from ..services import get_system_logs, get_email_logs
-from ..services.scraper_service import list_websites, add_website, get_website, scrape_website, list_logs
-from ..services.scraper_service import scrape_all
+from ..services.scraper_service import list_websites, add_website, get_website, list_logs, update_crawl_settings, index_metrics
+from ..services.scrape_job_service import submit_job, get_job, job_to_dict
 from ..services.auth_service import list_all_users, set_user_active, delete_user, create_moderator
 from ..models.notice_file import NoticeFile
-import os
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -116,10 +115,9 @@ def admin_delete_notice_attachment(notice_id: int, file_id: int):
         nf = db.session.get(NoticeFile, file_id)
         if not nf or nf.notice_id != n.id:
             return jsonify({'ok': False, 'message': 'Attachment not found'}), 404
-        # Remove file from disk safely
+        # Remove file from disk safely (shared blobs are left to garbage collection)
         try:
-            if nf.file_path and os.path.exists(nf.file_path):
-                os.remove(nf.file_path)
+            remove_legacy_file(nf)
         except Exception:
             pass
         db.session.delete(nf)
@@ -605,6 +603,13 @@ def api_admin_scraper_sites():
             'name': getattr(s, 'name', '') or '',
             'url': s.url,
             'enabled': bool(getattr(s, 'enabled', True)),
+            'crawl': {
+                'enabled': bool(s.crawl_enabled),
+                'max_depth': s.crawl_max_depth,
+                'max_pages': s.crawl_max_pages,
+                'include': s.crawl_include or '',
+                'exclude': s.crawl_exclude or '',
+            },
             'added_at': s.added_at.strftime('%d %b %Y %H:%M') if getattr(s, 'added_at', None) else ''
         } for s in sites
     ]
@@ -633,8 +638,19 @@ def api_admin_scraper_run(site_id: int):
     # Respect enabled flag: do not run when disabled
     if not bool(getattr(site, 'enabled', True)):
         return jsonify({'ok': False, 'status': 'disabled'}), 200
-    ok, status = scrape_website(site)
-    return jsonify({'ok': ok, 'status': status})
+    # Runs in the background; poll GET /api/admin/scraper/jobs/<job_id>
+    job, _ = submit_job('site', site.id, current_user.id)
+    return jsonify({'ok': True, 'status': job.status, 'job_id': job.id}), 202
+
+@admin_bp.post('/api/admin/scraper/sites/<int:site_id>/crawl')
+@login_required
+@require_role('admin')
+def api_admin_scraper_crawl(site_id: int):
+    site = get_website(site_id)
+    if not site:
+        return jsonify({'ok': False, 'message': 'Not found'}), 404
+    ok, msg = update_crawl_settings(site, request.get_json(silent=True) or {})
+    return jsonify({'ok': ok, 'message': msg}), (200 if ok else 400)
 
 @admin_bp.post('/api/admin/scraper/sites/<int:site_id>/enable')
 @login_required
@@ -669,11 +685,20 @@ def api_admin_scraper_disable(site_id: int):
 @require_role('admin')
 def api_admin_scraper_run_all():
     try:
-        completed, total = scrape_all()
-        return jsonify({'ok': True, 'completed': completed, 'total': total})
+        job, _ = submit_job('all', None, current_user.id)
+        return jsonify({'ok': True, 'status': job.status, 'job_id': job.id}), 202
     except Exception:
         return jsonify({'ok': False}), 500
 
+@admin_bp.get('/api/admin/scraper/jobs/<int:job_id>')
+@login_required
+@require_role('admin')
+def api_admin_scraper_job(job_id: int):
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'ok': False, 'message': 'Not found'}), 404
+    return jsonify({'ok': True, 'job': job_to_dict(job)})
+
 @admin_bp.post('/api/admin/scraper/sites/<int:site_id>/delete')
 @login_required
 @require_role('admin')
@@ -689,6 +714,15 @@ def api_admin_scraper_delete(site_id: int):
     except Exception:
         return jsonify({'ok': False}), 500
 
+@admin_bp.get('/api/admin/scraper/index-stats')
+@login_required
+@require_role('admin')
+def api_admin_scraper_index_stats():
+    try:
+        return jsonify({'ok': True, 'stats': index_metrics()})
+    except Exception:
+        return jsonify({'ok': False}), 500
+
 @admin_bp.get('/api/admin/scraper/logs')
 @login_required
 @require_role('admin')
@@ -706,6 +740,18 @@ def api_admin_scraper_logs():
             'status': l.status,
             'extracted_text_length': l.extracted_text_length,
             'pdf_links_found': l.pdf_links_found,
+            'bytes_fetched': l.bytes_fetched or 0,
+            'bytes_saved': l.bytes_saved or 0,
+            'not_modified': l.not_modified or 0,
+            'extractions_skipped': l.extractions_skipped or 0,
+            'requests_made': l.requests_made or 0,
+            'retries': l.retries or 0,
+            'latency_ms_avg': l.latency_ms_avg or 0,
+            'latency_ms_max': l.latency_ms_max or 0,
+            'pages_crawled': l.pages_crawled or 0,
+            'robots_blocked': l.robots_blocked or 0,
+            'pages_skipped': l.pages_skipped or 0,
+            'documents_replaced': l.documents_replaced or 0,
             'scraped_at': fmt_dt(getattr(l, 'scraped_at', None)),
         } for l in logs
     ]
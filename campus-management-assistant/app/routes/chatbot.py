@@ -1,12 +1,17 @@
 from flask import Blueprint, request, jsonify, send_from_directory
-import random
 from flask_login import login_required, current_user
 from . import require_role
-from ..services.chatbot_service import ask_gemini, chatbot_health
+from ..services.chatbot_service import answer_query, answer_batch, chatbot_health, BATCH_MAX
 
 chatbot_bp = Blueprint('chatbot', __name__)
 
 
+def _request_role() -> str:
+    if getattr(current_user, 'is_authenticated', False) and getattr(current_user, 'role', '') == 'student':
+        return 'student'
+    return 'guest'
+
+
 @chatbot_bp.get('/guest/chatbot')
 def guest_chatbot():
     return send_from_directory('frontend/guest', 'chatbot.html')
@@ -15,9 +20,9 @@ def guest_chatbot():
 @chatbot_bp.post('/guest/chatbot')
 def guest_chatbot_post():
     q = request.form.get('query', '').strip()
-    ok, ans = ask_gemini(q, role='guest')
-    confidence = random.randint(70, 90)
-    return render_template('guest/chatbot.html', query=q, answer=ans, ok=ok, confidence=confidence)
+    result = answer_query(q, role='guest')
+    return render_template('guest/chatbot.html', query=q, answer=result['answer'], ok=result['ok'],
+                           confidence=result['confidence'])
 
 
 
@@ -27,9 +32,9 @@ def guest_chatbot_post():
 @require_role('student')
 def student_chatbot_post():
     q = request.form.get('query', '').strip()
-    ok, ans = ask_gemini(q, role='student')
-    confidence = random.randint(70, 90)
-    return render_template('student/chatbot.html', query=q, answer=ans, ok=ok, confidence=confidence)
+    result = answer_query(q, role='student')
+    return render_template('student/chatbot.html', query=q, answer=result['answer'], ok=result['ok'],
+                           confidence=result['confidence'])
 
 
 @chatbot_bp.post('/chatbot/query')
@@ -39,15 +44,41 @@ def chatbot_query():
         q = str(data.get('query', '')).strip()
         if not q:
             return jsonify({"ok": False, "answer": "Please provide a question."}), 400
-        role = 'student' if getattr(current_user, 'is_authenticated', False) and getattr(current_user, 'role', '') == 'student' else 'guest'
-        ok, ans = ask_gemini(q, role=role)
+        role = _request_role()
+        result = answer_query(q, role=role)
+        ok = bool(result['ok'])
         status = 200 if ok else 400
-        confidence = random.randint(70, 90)
-        return jsonify({"ok": ok, "answer": ans, "confidence": confidence}), status
+        return jsonify({"ok": ok, "answer": result['answer'], "confidence": result['confidence'],
+                        "sources": result['sources'], "alternatives": result['alternatives']}), status
     except Exception:
         return jsonify({"ok": False, "answer": "Sorry, an error occurred."}), 500
 
 
+@chatbot_bp.post('/chatbot/query/batch')
+def chatbot_query_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not queries:
+            return jsonify({"ok": False, "message": "Provide a non-empty 'queries' list."}), 400
+        if len(queries) > BATCH_MAX:
+            return jsonify({"ok": False, "message": f"At most {BATCH_MAX} queries per batch."}), 400
+        queries = [str(q or '').strip() for q in queries]
+        answered = iter(answer_batch([q for q in queries if q], role=_request_role()))
+        results = []
+        for q in queries:
+            if not q:
+                results.append({"query": q, "ok": False, "answer": "Please provide a question.",
+                                "confidence": 0, "sources": []})
+                continue
+            r = next(answered)
+            results.append({"query": q, "ok": bool(r['ok']), "answer": r['answer'],
+                            "confidence": r['confidence'], "sources": r['sources']})
+        return jsonify({"ok": True, "results": results}), 200
+    except Exception:
+        return jsonify({"ok": False, "message": "Sorry, an error occurred."}), 500
+
+
 @chatbot_bp.get('/chatbot/health')
 def chatbot_health_route():
     try:
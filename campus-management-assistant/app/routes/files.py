@@ -7,6 +7,7 @@ from ..models.notice_file import NoticeFile
 from ..models.logs import SystemLog
 from ..services.logs_service import log_event
 from ..services.notice_service import UPLOAD_DIR
+from ..services import blob_store
 
 files_bp = Blueprint('files', __name__)
 
@@ -40,10 +41,11 @@ def download_notice_file(file_id: int):
                 abort(403)
 
         # Serve safely from the known uploads directory
-        directory = os.path.dirname(nf.file_path)
-        filename = os.path.basename(nf.file_path)
+        file_path = blob_store.blob_path(nf.blob_sha256) if nf.blob_sha256 else nf.file_path
+        directory = os.path.dirname(file_path)
+        filename = os.path.basename(file_path)
         # Ensure the file resides under the expected uploads dir
-        uploads_root = os.path.abspath(UPLOAD_DIR)
+        uploads_root = os.path.abspath(blob_store.BLOB_DIR if nf.blob_sha256 else UPLOAD_DIR)
         if not os.path.abspath(directory).startswith(uploads_root):
             log_event('files', 'blocked_path_traversal', {
                 'file_id': file_id,
@@ -54,7 +56,7 @@ def download_notice_file(file_id: int):
             abort(403)
 
         # If the file is missing on disk, return 404
-        if not os.path.exists(nf.file_path):
+        if not os.path.exists(file_path):
             log_event('files', 'missing_file_on_disk', {
                 'file_id': file_id,
                 'notice_id': nf.notice_id,
@@ -63,6 +65,9 @@ def download_notice_file(file_id: int):
             })
             abort(404)
 
+        # Blobs are named by hash; give them back their uploaded name (and type)
+        if nf.blob_sha256:
+            return send_from_directory(directory, filename, as_attachment=True, download_name=nf.file_name)
         # Serve file; avoid specifying download_name for broader Flask compatibility
         return send_from_directory(directory, filename, as_attachment=True)
     except Exception as e:
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, redirect, url_for, flash, send_from_directory
-from flask_login import login_required
+from flask_login import login_required, current_user
 from . import require_role
-from ..services.scraper_service import add_website, list_websites, scrape_website, scrape_all, list_logs, get_website
+from ..services.scraper_service import add_website, list_websites, list_logs, get_website
+from ..services.scrape_job_service import submit_job
 
 scraper_bp = Blueprint('scraper', __name__)
 
@@ -45,7 +46,8 @@ def scraper_add():
 def scraper_run(website_id: int):
     site = get_website(website_id)
     if site:
-        scrape_website(site)
+        submit_job('site', site.id, current_user.id)
+        flash('Scrape queued; results appear in the logs when it finishes.', 'info')
     return redirect(url_for('scraper.scraper_home'))
 
 
@@ -53,5 +55,6 @@ def scraper_run(website_id: int):
 @login_required
 @require_role('admin')
 def scraper_run_all():
-    scrape_all()
+    submit_job('all', None, current_user.id)
+    flash('Scrape of all sources queued.', 'info')
     return redirect(url_for('scraper.scraper_home'))
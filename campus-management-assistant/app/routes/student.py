@@ -2,6 +2,7 @@ from flask import Blueprint, request, redirect, url_for, jsonify, send_from_dire
 from flask_login import login_required, current_user
 from . import require_role
 from ..services.notice_service import student_visible_notices, student_visible_notices_by_category, list_categories, todays_student_notices
+from ..services.search_service import fts_available, search_notices
 from ..services.faq_service import student_answered_faqs, submit_question, answered_faqs_filtered, todays_answered_faqs, student_asked_faqs
 
 student_bp = Blueprint('student', __name__)
@@ -40,8 +41,15 @@ def notice_detail(notice_id: int):
 @login_required
 @require_role('student')
 def api_student_notices():
-    """Return student-visible notices with category, date, and attachments."""
-    items = student_visible_notices(current_user)
+    """Return student-visible notices with category, date, and attachments.
+
+    With `?q=` the notices are full-text searched and ranked instead.
+    """
+    q = (request.args.get('q') or '').strip()
+    if q and fts_available():
+        items = search_notices(q, current_user)
+    else:
+        items = student_visible_notices(current_user)
     def fmt_date(dt):
         try:
             return dt.strftime('%d %b %Y') if dt else ''
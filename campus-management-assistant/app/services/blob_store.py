@@ -0,0 +1,262 @@
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import os
+import tempfile
+import time
+from sqlalchemy import event, func, inspect, or_
+from ..extensions import db
+from ..models.blob import Blob
+from ..models.notice_file import NoticeFile
+from ..models.scraper import FetchRecord
+from ..models.pdf_extraction import PdfExtraction, PdfPage
+from ..models.logs import SystemLog
+from .pdf_service import cache_extraction, cached_extraction, extract_pdf_text, read_pdf
+from . import pdf_extractor
+
+# Files live at BLOB_DIR/ab/cd/abcd... keyed by the SHA-256 of their bytes, so
+# identical uploads and scraped PDFs are stored (and their text extracted) once.
+BLOB_DIR = os.path.abspath(os.getenv('BLOB_DIR') or os.path.join(os.path.dirname(__file__), '..', 'uploads', 'blobs'))
+# Unreferenced blobs and stray temp files younger than this survive garbage collection
+GC_GRACE = float(os.getenv('BLOB_GC_GRACE', '3600'))
+CHUNK = 64 * 1024
+
+# Tables whose blob_sha256 column holds a reference
+REFERRERS = (NoticeFile, FetchRecord)
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(BLOB_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def temp_file() -> Tuple[int, str]:
+    """An open (fd, path) temp file on the blob volume, for commit_file()."""
+    tmp_dir = os.path.join(BLOB_DIR, 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    return tempfile.mkstemp(dir=tmp_dir, suffix='.part')
+
+
+def commit_file(tmp_path: str, sha256: str) -> str:
+    """Move a complete temp file to its content address; a copy already there wins."""
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_stream(stream: BinaryIO) -> Tuple[str, int]:
+    """Copy a file-like object into the store; returns (sha256, size). Touches no database state."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = temp_file()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = stream.read(CHUNK)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        sha256 = digest.hexdigest()
+        commit_file(tmp, sha256)
+        return sha256, size
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def ensure_blob(sha256: str, size: int, content_type: Optional[str] = None) -> Blob:
+    """The Blob row for a committed file, added (and flushed) if new. The caller commits."""
+    blob = db.session.get(Blob, sha256)
+    if blob is None:
+        blob = Blob(sha256=sha256, size=size, content_type=content_type, ref_count=0)
+        db.session.add(blob)
+        db.session.flush()
+    return blob
+
+
+def put_stream(stream: BinaryIO, content_type: Optional[str] = None) -> Blob:
+    sha256, size = write_stream(stream)
+    return ensure_blob(sha256, size, content_type)
+
+
+def extracted_text(blob: Blob) -> Optional[str]:
+    """PDF text of a blob, parsed only the first time its content is seen."""
+    return extract_pdf_text(blob_path(blob.sha256), blob.sha256)
+
+
+def extract_pending(blobs: Iterable[Blob]) -> Dict[str, Optional[str]]:
+    """Extract every blob not in the extraction cache at once, one extraction process
+    each; returns their texts by SHA-256. The caller commits."""
+    todo = [sha for sha in dict.fromkeys(b.sha256 for b in blobs if b is not None)
+            if cached_extraction(sha) is None]
+    if len(todo) < 2:
+        return {}  # extracted_text() handles a single file on demand
+
+    def extract(sha256: str):
+        try:
+            return read_pdf(blob_path(sha256)), None
+        except Exception as e:
+            return None, e
+
+    workers = min(len(todo), pdf_extractor.WORKERS if pdf_extractor.ISOLATED else 1)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='pdf-extract') as pool:
+        results = list(pool.map(extract, todo))
+    texts: Dict[str, Optional[str]] = {}
+    for sha256, (parsed, error) in zip(todo, results):
+        cache_extraction(sha256, parsed, error)
+        texts[sha256] = parsed.text if parsed else None
+        if error is not None:
+            db.session.add(SystemLog(module='pdf', message=f'pdf extract error: {error} blob={sha256[:12]}'))
+    return texts
+
+
+# Reference counting: every insert, re-point or delete of a referring row adjusts
+# blobs.ref_count inside the same flush. Bulk query deletes bypass these hooks;
+# recount_refs() (run by garbage collection) repairs any drift.
+
+def _adjust(connection, sha256: Optional[str], delta: int) -> None:
+    if not sha256:
+        return
+    table = Blob.__table__
+    values = {'ref_count': table.c.ref_count + delta}
+    if delta < 0:
+        values['released_at'] = datetime.utcnow()
+    connection.execute(table.update().where(table.c.sha256 == sha256).values(**values))
+
+
+def _after_insert(mapper, connection, target) -> None:
+    _adjust(connection, target.blob_sha256, 1)
+
+
+def _after_update(mapper, connection, target) -> None:
+    history = inspect(target).attrs.blob_sha256.history
+    if history.has_changes():
+        for old in history.deleted:
+            _adjust(connection, old, -1)
+        for new in history.added:
+            _adjust(connection, new, 1)
+
+
+def _after_delete(mapper, connection, target) -> None:
+    _adjust(connection, target.blob_sha256, -1)
+
+
+for _model in REFERRERS:
+    event.listen(_model, 'after_insert', _after_insert)
+    event.listen(_model, 'after_update', _after_update)
+    event.listen(_model, 'after_delete', _after_delete)
+
+
+def _reference_counts() -> Dict[str, int]:
+    """Number of rows referring to each blob, from the referring tables."""
+    counts: Dict[str, int] = {}
+    for model in REFERRERS:
+        rows = (db.session.query(model.blob_sha256, func.count())
+                .filter(model.blob_sha256.isnot(None))
+                .group_by(model.blob_sha256).all())
+        for sha256, n in rows:
+            counts[sha256] = counts.get(sha256, 0) + n
+    return counts
+
+
+def _recounted(blob: Blob, counts: Dict[str, int], now: datetime) -> Tuple[int, Optional[datetime]]:
+    """(ref_count, released_at) the blob has after a recount."""
+    actual = counts.get(blob.sha256, 0)
+    return actual, now if actual < (blob.ref_count or 0) else blob.released_at
+
+
+def recount_refs() -> int:
+    """Recompute ref_count from the referring tables; returns how many blobs changed."""
+    counts = _reference_counts()
+    changed = 0
+    now = datetime.utcnow()
+    for blob in Blob.query.all():
+        actual, released_at = _recounted(blob, counts, now)
+        if blob.ref_count != actual:
+            blob.ref_count, blob.released_at = actual, released_at
+            changed += 1
+    db.session.commit()
+    return changed
+
+
+def adopt_legacy_files() -> int:
+    """Move files stored before the blob store (per-upload / per-scrape names) into it."""
+    moved = 0
+    for model in REFERRERS:
+        rows = model.query.filter(model.blob_sha256.is_(None), model.file_path.isnot(None)).all()
+        for row in rows:
+            old_path = row.file_path
+            if not os.path.exists(old_path):
+                continue
+            with open(old_path, 'rb') as f:
+                blob = put_stream(f)
+            row.blob_sha256 = blob.sha256
+            row.file_path = blob_path(blob.sha256)
+            db.session.commit()
+            os.remove(old_path)
+            moved += 1
+    return moved
+
+
+def collect_garbage(grace: float = GC_GRACE, dry_run: bool = False) -> Dict[str, int]:
+    """Delete unreferenced blobs (rows and files), orphan files and stale temp files.
+
+    Anything touched within `grace` seconds is kept, so uploads and scrapes in
+    flight are never collected between writing a file and referencing it.
+    With `dry_run` nothing is written: reference counts are recomputed in
+    memory and only reported.
+    """
+    stats = {'recounted': 0, 'blobs_deleted': 0, 'bytes_freed': 0, 'orphan_files': 0, 'temp_files': 0}
+    if dry_run:
+        counts, now = _reference_counts(), datetime.utcnow()
+        cutoff = now - timedelta(seconds=grace)
+        dead = []
+        for blob in Blob.query.all():
+            actual, released_at = _recounted(blob, counts, now)
+            stats['recounted'] += blob.ref_count != actual
+            since = released_at or blob.created_at
+            if actual <= 0 and since is not None and since < cutoff:
+                dead.append(blob)
+    else:
+        stats['recounted'] = recount_refs()
+        cutoff = datetime.utcnow() - timedelta(seconds=grace)
+        dead = (Blob.query
+                .filter(Blob.ref_count <= 0)
+                .filter(or_(Blob.released_at < cutoff, (Blob.released_at.is_(None)) & (Blob.created_at < cutoff)))
+                .all())
+    for blob in dead:
+        stats['blobs_deleted'] += 1
+        stats['bytes_freed'] += blob.size or 0
+        if not dry_run:
+            path = blob_path(blob.sha256)
+            if os.path.exists(path):
+                os.remove(path)
+            PdfPage.query.filter_by(sha256=blob.sha256).delete()
+            PdfExtraction.query.filter_by(sha256=blob.sha256).delete()
+            db.session.delete(blob)
+    if not dry_run:
+        db.session.commit()
+
+    # Files on disk without a row (crashed before ensure_blob) and abandoned temp files
+    known = {sha for (sha,) in db.session.query(Blob.sha256).all()}
+    oldest = time.time() - grace
+    if os.path.isdir(BLOB_DIR):
+        for root, _dirs, files in os.walk(BLOB_DIR):
+            is_tmp = os.path.basename(root) == 'tmp'
+            for name in files:
+                path = os.path.join(root, name)
+                if (not is_tmp and name in known) or os.path.getmtime(path) >= oldest:
+                    continue
+                key = 'temp_files' if is_tmp else 'orphan_files'
+                stats[key] += 1
+                stats['bytes_freed'] += os.path.getsize(path)
+                if not dry_run:
+                    os.remove(path)
+    return stats
@@ -0,0 +1,100 @@
+from typing import Dict, Hashable, Optional, Callable
+from collections import OrderedDict
+import os
+import threading
+import time
+
+CACHE_SIZE = int(os.getenv('CHATBOT_CACHE_SIZE', '1024'))
+CACHE_TTL = float(os.getenv('CHATBOT_CACHE_TTL', '300'))
+
+
+class AnswerCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Entries belong to a generation (see `sync`): moving to another generation
+    drops them, and values computed under an older one are not stored.
+    A size of 0 disables caching. All operations are thread-safe.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation: Optional[Hashable] = None
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at <= self._clock():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: object, generation: Optional[Hashable] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return  # computed before a change another caller already synced to
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def sync(self, generation: Hashable) -> None:
+        """Switch to `generation`, dropping every entry if it differs from the current one."""
+        with self._lock:
+            if generation != self.generation:
+                if self.generation is not None:
+                    self._data.clear()
+                    self.invalidations += 1
+                self.generation = generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'generation': self.generation,
+            }
+
+
+ANSWER_CACHE = AnswerCache(CACHE_SIZE, CACHE_TTL)
+
+
+def invalidate_answers() -> None:
+    """Drop every cached answer of this process; call whenever a knowledge source changes.
+
+    Other worker processes notice document changes through the shared
+    revision (chatbot_document_service.document_revision) on their next lookup.
+    """
+    ANSWER_CACHE.clear()
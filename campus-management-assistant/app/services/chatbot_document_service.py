@@ -0,0 +1,392 @@
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+import hashlib
+import os
+import threading
+from flask import has_app_context
+from sqlalchemy import event, func, or_, and_, select, union_all, literal, null, bindparam
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import object_session
+from ..extensions import db
+from ..models.chatbot_document import ChatbotDocument, ChatbotChunk, ChatbotLshBucket, ChatbotChunkTombstone, \
+    ChatbotRevision
+from .document_index import DocumentIndex, ROLE_VISIBILITY, make_snippet
+from .chatbot_cache import invalidate_answers
+from .chunking import make_chunks
+from . import minhash
+
+# Near-duplicate detection at insert (MinHash/LSH): content at least this similar
+# to a stored document of the same visibility and source supersedes it; a scraped
+# page this similar to another URL's page is kept as one copy
+NEAR_DUP_ENABLED = os.getenv('CHATBOT_NEAR_DUPLICATES', '1') == '1'
+NEAR_DUP_THRESHOLD = float(os.getenv('CHATBOT_NEAR_DUP_THRESHOLD', '0.9'))
+# Deleted passages stay in the tombstone log this long; a worker index that
+# has not synced since is rebuilt
+TOMBSTONE_DAYS = int(os.getenv('CHATBOT_TOMBSTONE_DAYS', '7'))
+
+_INDEX = DocumentIndex()
+_INDEX_LOCK = threading.Lock()
+_INDEX_LOADED = threading.Event()
+
+
+def hash_text(text: str) -> str:
+    normalized = " ".join(text.split()).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _sign(doc: ChatbotDocument, sig: Optional[Tuple[int, ...]]) -> None:
+    """Store a document's MinHash signature and its LSH band buckets (b'' when too short to sign)."""
+    doc.minhash = minhash.pack(sig) if sig is not None else b''
+    doc.lsh_buckets = [ChatbotLshBucket(band=band, bucket=bucket)
+                       for band, bucket in minhash.band_keys(sig)] if sig is not None else []
+
+
+def near_duplicates(sig: Optional[Tuple[int, ...]], visibility: str) -> List[ChatbotDocument]:
+    """Stored documents of the same visibility at least NEAR_DUP_THRESHOLD similar to `sig`.
+
+    Only documents sharing an LSH bucket with the signature are compared, so
+    the cost follows the number of candidates, not the size of the table.
+    """
+    if sig is None or not NEAR_DUP_ENABLED:
+        return []
+    buckets = [and_(ChatbotLshBucket.band == band, ChatbotLshBucket.bucket == bucket)
+               for band, bucket in minhash.band_keys(sig)]
+    ids = [i for (i,) in db.session.query(ChatbotLshBucket.document_id).filter(or_(*buckets)).distinct()]
+    if not ids:
+        return []
+    found = []
+    for doc in ChatbotDocument.query.filter(ChatbotDocument.id.in_(ids), ChatbotDocument.visibility == visibility):
+        other = minhash.unpack(doc.minhash)
+        if other is not None and minhash.similarity(sig, other) >= NEAR_DUP_THRESHOLD:
+            found.append(doc)
+    return found
+
+
+def store_document(source_type: str, source_id: Optional[int], content: str, visibility: str,
+                   content_hash: Optional[str] = None,
+                   pages: Optional[List[Tuple[int, str]]] = None) -> Optional[ChatbotDocument]:
+    """Insert a chatbot document unless identical content already exists.
+
+    Near-duplicates of the content from the same source (e.g. a notice's
+    circular re-published with a small edit) are deleted in its favour.
+    Similar documents of other sources are kept: two notices may differ only
+    in a date or a semester. A PDF's (page number, text) `pages` make its
+    passages page by page (see chunking.make_chunks). Returns the new document,
+    or None when it was a duplicate. The caller's exception handling applies to
+    database errors.
+    """
+    h = content_hash or hash_text(content)
+    if ChatbotDocument.query.filter_by(content_hash=h).first():
+        return None
+    sig = minhash.signature(content)
+    if source_id is not None:
+        for old in near_duplicates(sig, visibility):
+            if (old.source_type, old.source_id) == (source_type, source_id):
+                db.session.delete(old)
+    doc = ChatbotDocument(
+        source_type=source_type,
+        source_id=source_id,
+        content=content,
+        content_hash=h,
+        visibility=visibility,
+        created_at=datetime.utcnow(),
+        chunks=make_chunks(content, pages),
+    )
+    _sign(doc, sig)
+    db.session.add(doc)
+    db.session.commit()
+    return doc
+
+
+def replace_document(source_type: str, source_id: Optional[int], source_url: str, content: str,
+                     visibility: str, replace_legacy: bool = False,
+                     pages: Optional[List[Tuple[int, str]]] = None) -> Tuple[Optional[ChatbotDocument], int]:
+    """Make `content` the current document for `source_url`, deleting older versions.
+
+    Returns (current document, number of documents retired). The current
+    document is None when identical content already belongs to another source,
+    or near-duplicate content to another scraped URL (a mirror: one copy is
+    kept). Documents of other sources are never deleted. An identical row
+    stored before URLs were tracked (same source, no URL) is claimed instead
+    of duplicated; with `replace_legacy`, other such rows of the same
+    source_type/source_id count as older versions too. A PDF's `pages` are
+    used as in `store_document`. The caller's exception handling applies to
+    database errors.
+    """
+    h = hash_text(content)
+    current = ChatbotDocument.query.filter_by(content_hash=h).first()
+    if current is not None and current.source_url is None \
+            and (current.source_type, current.source_id) == (source_type, source_id):
+        current.source_url = source_url
+    older = ChatbotDocument.source_url == source_url
+    if replace_legacy:
+        older = or_(older, and_(ChatbotDocument.source_url.is_(None), ChatbotDocument.source_type == source_type,
+                                ChatbotDocument.source_id == source_id))
+    stale = [d for d in ChatbotDocument.query.filter(older).all() if current is None or d.id != current.id]
+    for doc in stale:
+        db.session.delete(doc)
+    if current is None:
+        sig = minhash.signature(content)
+        if not any(d.source_url for d in near_duplicates(sig, visibility)):
+            current = ChatbotDocument(
+                source_type=source_type,
+                source_id=source_id,
+                source_url=source_url,
+                content=content,
+                content_hash=h,
+                visibility=visibility,
+                created_at=datetime.utcnow(),
+                chunks=make_chunks(content, pages),
+            )
+            _sign(current, sig)
+            db.session.add(current)
+    elif current.source_url != source_url:
+        current = None
+    db.session.commit()
+    return current, len(stale)
+
+
+def retire_documents(source_url: str) -> int:
+    """Delete every document scraped from `source_url` (the page or PDF is gone)."""
+    stale = ChatbotDocument.query.filter_by(source_url=source_url).all()
+    for doc in stale:
+        db.session.delete(doc)
+    db.session.commit()
+    return len(stale)
+
+
+def chunk_documents(batch: int = 200) -> int:
+    """Chunk documents stored before passage chunking (or whose chunks are missing); returns how many."""
+    done = last_id = 0
+    while True:
+        docs = (ChatbotDocument.query
+                .filter(ChatbotDocument.id > last_id, ~ChatbotDocument.chunks.any())
+                .order_by(ChatbotDocument.id.asc())
+                .limit(batch).all())
+        if not docs:
+            break
+        for doc in docs:
+            doc.chunks = make_chunks(doc.content)
+        last_id = docs[-1].id
+        db.session.commit()
+        done += len(docs)
+    return done
+
+
+def sign_documents(batch: int = 200) -> int:
+    """Add MinHash signatures to documents stored before near-duplicate detection; returns how
+    many were signed. Documents too short to sign are marked checked (b'') and not read again."""
+    done = last_id = 0
+    while True:
+        docs = (ChatbotDocument.query
+                .filter(ChatbotDocument.id > last_id, ChatbotDocument.minhash.is_(None))
+                .order_by(ChatbotDocument.id.asc())
+                .limit(batch).all())
+        if not docs:
+            break
+        for doc in docs:
+            sig = minhash.signature(doc.content)
+            _sign(doc, sig)
+            done += sig is not None
+        last_id = docs[-1].id
+        db.session.commit()
+    return done
+
+
+def document_stats(days: int = 7) -> Dict[str, object]:
+    """Size of the document table and the in-memory index, and recent additions per day."""
+    since = datetime.utcnow() - timedelta(days=days)
+    by_type = dict(db.session.query(ChatbotDocument.source_type, func.count(ChatbotDocument.id))
+                   .group_by(ChatbotDocument.source_type).all())
+    chars = db.session.query(func.coalesce(func.sum(func.length(ChatbotDocument.content)), 0)).scalar()
+    urls = db.session.query(func.count(func.distinct(ChatbotDocument.source_url))).scalar()
+    untracked = (ChatbotDocument.query
+                 .filter(ChatbotDocument.source_type.like('scrape%'), ChatbotDocument.source_url.is_(None))
+                 .count())
+    added = dict(db.session.query(func.date(ChatbotDocument.created_at), func.count(ChatbotDocument.id))
+                 .filter(ChatbotDocument.created_at >= since)
+                 .group_by(func.date(ChatbotDocument.created_at)).all())
+    chunks, chunked = db.session.query(func.count(ChatbotChunk.id),
+                                       func.count(func.distinct(ChatbotChunk.document_id))).one()
+    index = _INDEX
+    return {
+        'documents': sum(by_type.values()),
+        'by_source_type': by_type,
+        'content_chars': int(chars or 0),
+        'source_urls': int(urls or 0),
+        'scraped_without_url': untracked,
+        'added_per_day': {str(day): n for day, n in added.items()},
+        'index_loaded': _INDEX_LOADED.is_set(),
+        'chunks': int(chunks or 0),
+        'indexed_documents': int(chunked or 0) if _INDEX_LOADED.is_set() else 0,
+        'indexed_chunks': len(index),
+        'indexed_terms': index.term_count,
+        'indexed_tokens': index.token_count,
+    }
+
+
+_TOMBSTONES = ChatbotChunkTombstone.__table__
+
+
+def _changes_since(index: DocumentIndex):
+    """Tombstones (added=0), then passages to add (added=1), that `index` has not applied.
+
+    One statement, so both come from the same snapshot. Passages at or below
+    `last_id` whose id was tombstoned are included: SQLite reuses the max rowid.
+    """
+    chunks, docs = ChatbotChunk.__table__, ChatbotDocument.__table__
+    newer = _TOMBSTONES.c.id > index.last_tombstone
+    removed = (select(literal(0).label('added'), _TOMBSTONES.c.id, _TOMBSTONES.c.chunk_id,
+                      _TOMBSTONES.c.content, null().label('visibility'))
+               .where(newer))
+    added = (select(literal(1), chunks.c.id, chunks.c.id, chunks.c.content, docs.c.visibility)
+             .select_from(chunks.join(docs, docs.c.id == chunks.c.document_id))
+             .where(or_(chunks.c.id > index.last_id,
+                        chunks.c.id.in_(select(_TOMBSTONES.c.chunk_id).where(newer)))))
+    return union_all(removed, added).order_by('added', 'id')
+
+
+def _sync_index() -> DocumentIndex:
+    """Apply passages deleted and added since the last sync, by this or any other worker process.
+
+    Reads committed rows on a connection of its own, so the caller's session is
+    never flushed and its uncommitted changes never reach the index. An index
+    whose next tombstones were already pruned is rebuilt.
+    """
+    global _INDEX
+    with _INDEX_LOCK, db.engine.connect() as conn:
+        rows = conn.execute(_changes_since(_INDEX)).all()
+        if len(_INDEX) and rows and not rows[0].added and rows[0].id > _INDEX.last_tombstone + 1:
+            _INDEX = DocumentIndex()
+            rows = conn.execute(_changes_since(_INDEX)).all()
+        for added, row_id, chunk_id, content, visibility in rows:
+            if added:
+                _INDEX.add(chunk_id, content, visibility)
+            else:
+                _INDEX.remove(chunk_id, content)
+                _INDEX.last_tombstone = row_id
+        _INDEX_LOADED.set()
+    return _INDEX
+
+
+_BUMP_REVISION = (insert(ChatbotRevision.__table__).values(id=1, revision=1)
+                  .on_conflict_do_update(index_elements=['id'],
+                                         set_={'revision': ChatbotRevision.__table__.c.revision + 1}))
+
+# The newest tombstone is kept so its id is never handed out again
+_PRUNE_TOMBSTONES = (_TOMBSTONES.delete()
+                     .where(_TOMBSTONES.c.deleted_at < bindparam('before'),
+                            _TOMBSTONES.c.id < select(func.max(_TOMBSTONES.c.id)).scalar_subquery()))
+
+
+_REVISION_DIRTY = 'chatbot_revision_dirty'
+_DELETED_CHUNKS = 'chatbot_deleted_chunks'
+_INDEX_DIRTY = 'chatbot_index_dirty'
+
+
+@event.listens_for(ChatbotChunk, 'after_insert')
+@event.listens_for(ChatbotChunk, 'after_delete')
+def _mark_revision(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[_REVISION_DIRTY] = True
+
+
+@event.listens_for(ChatbotChunk, 'after_delete')
+def _queue_tombstone(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DELETED_CHUNKS, []).append(
+            {'chunk_id': target.id, 'content': target.content, 'deleted_at': datetime.utcnow()})
+
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_revision(session, flush_context) -> None:
+    # Once per flush that touched passages, in the same transaction: other
+    # workers see the change, its tombstones and the new revision together or not at all
+    deleted = session.info.pop(_DELETED_CHUNKS, None)
+    if deleted:
+        session.connection().execute(_TOMBSTONES.insert(), deleted)
+        session.connection().execute(_PRUNE_TOMBSTONES,
+                                     {'before': datetime.utcnow() - timedelta(days=TOMBSTONE_DAYS)})
+    if session.info.pop(_REVISION_DIRTY, False):
+        session.info[_INDEX_DIRTY] = True
+        session.connection().execute(_BUMP_REVISION)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _sync_after_commit(session) -> None:
+    if session.info.pop(_INDEX_DIRTY, False):
+        if _INDEX_LOADED.is_set():
+            _sync_index()
+        invalidate_answers()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_changes(session) -> None:
+    for key in (_REVISION_DIRTY, _DELETED_CHUNKS, _INDEX_DIRTY):
+        session.info.pop(key, None)
+
+
+def document_revision() -> Optional[int]:
+    """Shared counter of passage inserts and deletes, across all worker processes
+    (None outside an application context, where no documents are searched)."""
+    if not has_app_context():
+        return None
+    return db.session.query(ChatbotRevision.revision).filter(ChatbotRevision.id == 1).scalar() or 0
+
+
+def install_index(index: DocumentIndex) -> None:
+    """Replace the in-memory index (e.g. one loaded from the on-disk artifact)."""
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = index
+        _INDEX_LOADED.set()
+
+
+def reset_index() -> None:
+    """Drop the in-memory index; the next search rebuilds it from the database."""
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = DocumentIndex()
+        _INDEX_LOADED.clear()
+
+
+def current_index() -> DocumentIndex:
+    return _INDEX
+
+
+def search_documents(query: str, role: str, limit: int = 3) -> List[Dict[str, object]]:
+    """BM25-ranked documents visible to `role`, each with its best-matching passage as snippet."""
+    return _search_index(_sync_index(), query, role, limit)
+
+
+def search_documents_many(queries: List[str], role: str, limit: int = 3) -> List[List[Dict[str, object]]]:
+    """`search_documents` for several queries against one sync of the index."""
+    index = _sync_index()
+    return [_search_index(index, query, role, limit) for query in queries]
+
+
+def _search_index(index: DocumentIndex, query: str, role: str, limit: int) -> List[Dict[str, object]]:
+    visibilities = ROLE_VISIBILITY.get(role, ROLE_VISIBILITY['guest'])
+    results = []
+    seen = set()
+    # Several passages of one document may rank high; fetch extra and keep the best per document
+    for hit in index.search(query, visibilities, limit=limit * 4):
+        chunk = db.session.get(ChatbotChunk, hit.doc_id)
+        if not chunk or chunk.document_id in seen:
+            continue
+        seen.add(chunk.document_id)
+        doc = chunk.document
+        results.append({
+            'document_id': doc.id,
+            'chunk_id': chunk.id,
+            'page_no': chunk.page_no,
+            'source_type': doc.source_type,
+            'source_id': doc.source_id,
+            'score': round(hit.score, 3),
+            'snippet': make_snippet(chunk.content, query),
+        })
+        if len(results) == limit:
+            break
+    return results
@@ -0,0 +1,128 @@
+from typing import Dict, Optional, Tuple
+import os
+import pickle
+import tempfile
+import time
+from sqlalchemy import func
+from ..config import APP_DIR
+from ..extensions import db
+from ..models.chatbot_document import ChatbotDocument, ChatbotChunk
+from ..models.logs import SystemLog
+from .document_index import DocumentIndex
+from .chatbot_document_service import install_index, reset_index, current_index, _sync_index
+
+# Serialized BM25 index so workers skip re-tokenizing every document at boot.
+# Loaded in create_app only when the in-memory backend serves searches. Each
+# worker process unpickles its own copy (gunicorn runs without --preload, so no
+# pooled SQLite connection or background thread crosses a fork): the artifact
+# saves start-up time, not memory.
+INDEX_PATH = os.getenv('CHATBOT_INDEX_PATH', os.path.join(APP_DIR, 'database', 'chatbot_index.pkl'))
+INDEX_WARM = os.getenv('CHATBOT_INDEX_WARM', '1').strip().lower() not in ('0', 'false', 'no')
+# Bump when DocumentIndex internals, tokenization or the indexed unit change
+FORMAT_VERSION = 3
+
+LAST_WARM: Dict[str, object] = {}
+
+
+def db_version() -> Tuple[int, int, str]:
+    """(row count, max id, fingerprint of the row at max id) of chatbot_chunks.
+
+    The fingerprint (parent content hash and position) catches SQLite reusing a
+    deleted max rowid for a new chunk.
+    """
+    count, max_id = db.session.query(func.count(ChatbotChunk.id), func.max(ChatbotChunk.id)).one()
+    return int(count or 0), int(max_id or 0), _hash_at(int(max_id or 0))
+
+
+def _hash_at(chunk_id: int) -> str:
+    row = (db.session.query(ChatbotDocument.content_hash, ChatbotChunk.seq)
+           .join(ChatbotChunk, ChatbotChunk.document_id == ChatbotDocument.id)
+           .filter(ChatbotChunk.id == chunk_id).first())
+    return f'{row[0]}:{row[1]}' if row else ''
+
+
+def save_index(index: DocumentIndex, version: Tuple[int, int, str], path: Optional[str] = None) -> int:
+    """Write the index artifact atomically; returns its size in bytes."""
+    path = path or INDEX_PATH
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = {'format': FORMAT_VERSION, 'db_version': tuple(version), 'index': index}
+    fd, tmp_path = tempfile.mkstemp(prefix='.chatbot-index-', suffix='.pkl', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return os.path.getsize(path)
+
+
+def load_index(path: Optional[str] = None) -> Optional[Tuple[DocumentIndex, Tuple[int, int, str]]]:
+    """Read an artifact written by `save_index`; None if missing, stale format or corrupt."""
+    try:
+        with open(path or INDEX_PATH, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or payload.get('format') != FORMAT_VERSION:
+        return None
+    index = payload.get('index')
+    if not isinstance(index, DocumentIndex):
+        return None
+    return index, tuple(payload.get('db_version', (0, 0, '')))
+
+
+def _unchanged_prefix(saved: Tuple[int, int, str]) -> bool:
+    # Nothing at or below the saved max id was deleted or replaced since the artifact was written
+    count, max_id, tail_hash = saved
+    present = (db.session.query(func.count(ChatbotChunk.id))
+               .filter(ChatbotChunk.id <= max_id).scalar())
+    return int(present or 0) == count and _hash_at(max_id) == tail_hash
+
+
+def warm_index(path: Optional[str] = None) -> Dict[str, object]:
+    """Load the document index at startup, rebuilding only when the artifact is unusable.
+
+    - artifact matches the database: use it as is
+    - only new rows since it was written: load it, index the new rows, rewrite it
+    - missing, corrupt or rows deleted: rebuild from the database and rewrite it
+    """
+    global LAST_WARM
+    started = time.perf_counter()
+    current = db_version()
+    loaded = load_index(path)
+    if loaded and loaded[1] == current:
+        install_index(loaded[0])
+        source = 'artifact'
+    elif loaded and loaded[1][1] <= current[1] and _unchanged_prefix(loaded[1]):
+        install_index(loaded[0])
+        _sync_index()
+        source = 'artifact+sync'
+    else:
+        reset_index()
+        _sync_index()
+        source = 'rebuilt'
+    if source != 'artifact':
+        try:
+            save_index(current_index(), current, path)
+        except Exception as e:
+            try:
+                db.session.add(SystemLog(module='chatbot', message=f'index artifact write failed: {e}'))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+    LAST_WARM = {
+        'source': source,
+        'chunks': len(current_index()),
+        'db_version': list(current),
+        'seconds': round(time.perf_counter() - started, 4),
+    }
+    return dict(LAST_WARM)
+
+
+def index_status() -> Dict[str, object]:
+    return {'indexed_chunks': len(current_index()), 'startup': dict(LAST_WARM) or None}
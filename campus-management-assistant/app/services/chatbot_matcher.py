@@ -0,0 +1,301 @@
+from typing import List, Dict, Tuple, Optional, Iterable
+from dataclasses import dataclass
+import re
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    # Unicode normalization + casefold
+    t = unicodedata.normalize('NFKC', text).casefold().strip()
+    # Remove zero-width characters commonly present in Indic scripts
+    t = t.replace('\u200b', '').replace('\u200c', '').replace('\u200d', '')
+    # Replace common punctuation (including Hindi danda) with spaces
+    t = re.sub(r"[\?\!\.,;:\|\u0964\u0965]", " ", t)  # \u0964=।, \u0965=॥
+    # Collapse whitespace
+    t = re.sub(r"\s+", " ", t)
+    return t
+
+
+# Word characters plus the Indic blocks, whose vowel signs are not matched by \w
+_TOKEN_RE = re.compile(r"[\w\u0900-\u0DFF]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class AhoCorasick:
+    """Multi-pattern substring search.
+
+    Patterns are added up front; `build()` computes failure links once so that
+    `find(text)` reports every pattern occurring in `text` in a single pass.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._patterns: Dict[str, int] = {}
+
+    def add(self, pattern: str) -> int:
+        """Register a pattern and return its id (re-adding returns the same id)."""
+        if pattern in self._patterns:
+            return self._patterns[pattern]
+        pid = len(self._patterns)
+        self._patterns[pattern] = pid
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+        return pid
+
+    def build(self) -> None:
+        queue = list(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        i = 0
+        while i < len(queue):
+            node = queue[i]
+            i += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> set:
+        """Return the ids of all patterns that occur in `text`."""
+        found = set()
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Optimal-string-alignment distance (edits + adjacent swaps), or None if above `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return None
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else None
+
+
+def _trigrams(word: str) -> List[str]:
+    padded = f"${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class TrigramIndex:
+    """Character-trigram index over a vocabulary for typo-tolerant lookup.
+
+    Candidates must share enough trigrams to possibly lie within the edit
+    bound (each edit or swap disturbs at most four padded trigrams); only those
+    are verified with a bounded edit distance.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = sorted(set(words))
+        self._grams: Dict[str, List[int]] = {}
+        for wid, word in enumerate(self.words):
+            for g in set(_trigrams(word)):
+                self._grams.setdefault(g, []).append(wid)
+
+    @staticmethod
+    def max_distance(word: str) -> int:
+        if len(word) < 4:
+            return 0
+        return 1 if len(word) < 8 else 2
+
+    def closest(self, word: str) -> Optional[str]:
+        limit = self.max_distance(word)
+        if not limit:
+            return None
+        grams = set(_trigrams(word))
+        shared: Dict[int, int] = {}
+        for g in grams:
+            for wid in self._grams.get(g, ()):
+                shared[wid] = shared.get(wid, 0) + 1
+        needed = max(1, len(grams) - 4 * limit)
+        best: Optional[Tuple[int, int, str]] = None
+        for wid, count in shared.items():
+            if count < needed:
+                continue
+            cand = self.words[wid]
+            dist = bounded_edit_distance(word, cand, limit)
+            if dist is None:
+                continue
+            key = (dist, -count, cand)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
+
+
+# Match-type weights: the query contains the keyword phrase verbatim, contains it
+# once spaces are ignored, or merely contains each of its tokens somewhere.
+PHRASE_WEIGHT = 1.0
+NOSPACE_WEIGHT = 0.9
+TOKENS_WEIGHT = 0.75
+# Applied on top when the query only matched after typo correction
+FUZZY_PENALTY = 0.85
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    entry: int
+    score: float
+    match_type: str
+    answer: str
+
+
+class KeywordMatcher:
+    """Compiled form of a keyword knowledge list.
+
+    All keywords are normalized once. A keyword matches a query when either
+    - its space-stripped form occurs in the space-stripped query, or
+    - every one of its tokens occurs somewhere in the query.
+    One automaton runs over the space-stripped query, another over the query
+    itself to find keyword phrases and tokens; inverted lists map each pattern
+    back to the keywords that need it.
+
+    Each matching keyword scores `weight * (0.6 + 0.4 * coverage)`, where the
+    weight comes from the match type and coverage is the share of the
+    (space-stripped) query the keyword spans. An entry scores as its best keyword.
+
+    When nothing matches exactly, unknown query tokens are corrected to the
+    closest keyword token via a trigram index and the query is ranked again
+    with a penalty ('fuzzy' matches).
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, object]]):
+        self.answers: List[str] = []
+        self._always: Optional[int] = None
+        self._nospace = AhoCorasick()
+        self._text = AhoCorasick()
+        # pattern id -> keyword ids, per automaton / role of the pattern
+        self._nospace_refs: Dict[int, List[int]] = {}
+        self._phrase_refs: Dict[int, List[int]] = {}
+        self._token_refs: Dict[int, List[int]] = {}
+        # keyword id -> (entry index, number of distinct tokens, space-stripped length)
+        self._keywords: List[Tuple[int, int, int]] = []
+        self._vocab: set = set()
+
+        for idx, item in enumerate(entries):
+            kws = item.get("keywords", [])
+            self.answers.append(str(item.get("answer", "")))
+            if not isinstance(kws, list):
+                continue
+            for kw in kws:
+                self._add_keyword(idx, kw)
+        self._nospace.build()
+        self._text.build()
+        self._fuzzy = TrigramIndex(self._vocab)
+
+    def _add_keyword(self, entry_idx: int, keyword: str) -> None:
+        k = normalize_text(keyword)
+        k_ns = k.replace(' ', '')
+        if not k_ns:
+            # An empty keyword is a substring of every query
+            if self._always is None or entry_idx < self._always:
+                self._always = entry_idx
+            return
+        tokens = {tok for tok in k.split(' ') if tok}
+        kid = len(self._keywords)
+        self._keywords.append((entry_idx, len(tokens), len(k_ns)))
+        self._nospace_refs.setdefault(self._nospace.add(k_ns), []).append(kid)
+        self._phrase_refs.setdefault(self._text.add(k.strip()), []).append(kid)
+        for tok in tokens:
+            self._token_refs.setdefault(self._text.add(tok), []).append(kid)
+        self._vocab.update(tokens)
+
+    def rank(self, query: str, limit: Optional[int] = None, fuzzy: bool = True) -> List[KeywordMatch]:
+        """Score every matching entry in one pass; best first, ties in list order.
+
+        The fuzzy pass only runs when the exact pass finds nothing.
+        """
+        q = normalize_text(query)
+        exact = self._rank_normalized(q, limit)
+        if exact or not fuzzy:
+            return exact
+        corrected = self.correct(q)
+        if corrected == q:
+            return []
+        return [KeywordMatch(entry=m.entry, score=round(m.score * FUZZY_PENALTY, 4), match_type='fuzzy',
+                             answer=m.answer)
+                for m in self._rank_normalized(corrected, limit)]
+
+    def correct(self, normalized_query: str) -> str:
+        """Replace unknown query tokens with their closest keyword token, if any is close enough."""
+        out = []
+        for tok in normalized_query.split(' '):
+            if tok and tok not in self._vocab:
+                tok = self._fuzzy.closest(tok) or tok
+            out.append(tok)
+        return ' '.join(out)
+
+    def _rank_normalized(self, q: str, limit: Optional[int]) -> List[KeywordMatch]:
+        q_ns = q.replace(' ', '')
+        q_len = max(len(q_ns), 1)
+        # keyword id -> (weight, match type)
+        kw_hits: Dict[int, Tuple[float, str]] = {}
+        for pid in self._nospace.find(q_ns):
+            for kid in self._nospace_refs[pid]:
+                kw_hits[kid] = (NOSPACE_WEIGHT, 'nospace')
+        token_counts: Dict[int, int] = {}
+        for pid in self._text.find(q):
+            for kid in self._phrase_refs.get(pid, ()):
+                kw_hits[kid] = (PHRASE_WEIGHT, 'phrase')
+            for kid in self._token_refs.get(pid, ()):
+                token_counts[kid] = token_counts.get(kid, 0) + 1
+        for kid, count in token_counts.items():
+            if count == self._keywords[kid][1] and kid not in kw_hits:
+                kw_hits[kid] = (TOKENS_WEIGHT, 'tokens')
+
+        best: Dict[int, Tuple[float, str]] = {}
+        if self._always is not None:
+            best[self._always] = (TOKENS_WEIGHT * 0.6, 'tokens')
+        for kid, (weight, kind) in kw_hits.items():
+            entry, _, k_len = self._keywords[kid]
+            score = weight * (0.6 + 0.4 * min(1.0, k_len / q_len))
+            if entry not in best or score > best[entry][0]:
+                best[entry] = (score, kind)
+        ordered = sorted(best.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [KeywordMatch(entry=e, score=round(sc, 4), match_type=kind, answer=self.answers[e])
+                for e, (sc, kind) in ordered]
+
+    def match(self, query: str) -> Optional[int]:
+        """Return the index of the best-scoring entry for `query`, or None."""
+        top = self.rank(query, limit=1)
+        return top[0].entry if top else None
+
+    def answer(self, query: str) -> Optional[str]:
+        idx = self.match(query)
+        return None if idx is None else self.answers[idx]
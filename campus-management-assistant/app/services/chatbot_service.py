@@ -1,11 +1,161 @@
-from typing import Tuple, Dict
-from .chatbot_static_knowledge import answer_for
+from typing import Tuple, Dict, List, Optional
+import os
+import time
+from ..models.logs import SystemLog
+from ..extensions import db
+from .chatbot_static_knowledge import (KnowledgeSnapshot, current_snapshot, rank_answers, knowledge_status,
+                                       FALLBACK_ANSWER)
+from .chatbot_document_service import search_documents_many, document_revision
+from .search_service import fts_available, search_chatbot_documents
+from .chatbot_matcher import normalize_text
+from .chatbot_cache import ANSWER_CACHE
+from .chatbot_index_store import index_status
+
+# 'auto' uses the SQLite FTS5 mirror when present, else the in-memory BM25 index
+SEARCH_BACKEND = os.getenv('CHATBOT_SEARCH_BACKEND', 'auto').strip().lower()
+BATCH_MAX = int(os.getenv('CHATBOT_BATCH_MAX', '50'))
+# Seconds between reads of the shared document revision; cache hits in between touch no database
+REVISION_CHECK_INTERVAL = float(os.getenv('CHATBOT_REVISION_CHECK_INTERVAL', '1'))
+TOP_K = 3
+# Document answers are capped below keyword answers; BM25 is squashed into 0..cap
+DOCUMENT_CONFIDENCE_CAP = 70
+
+_revision: Optional[int] = None
+_revision_next_check = 0.0
+
+
+def search_backend() -> str:
+    if SEARCH_BACKEND in ('fts', 'memory'):
+        return SEARCH_BACKEND
+    return 'fts' if fts_available() else 'memory'
+
+
+def _document_hits(queries: List[str], role: str) -> List[List[Dict[str, object]]]:
+    if search_backend() == 'fts':
+        return [search_chatbot_documents(q, role) for q in queries]
+    return search_documents_many(queries, role)
+
+
+def _effective_role(role: str) -> str:
+    # Only students see private knowledge and student documents
+    return 'student' if role == 'student' else 'guest'
+
+
+def _document_revision() -> Optional[int]:
+    """The shared document revision, read at most once per REVISION_CHECK_INTERVAL.
+
+    Writes in this process clear the cache themselves; other workers' writes
+    reach it within one interval.
+    """
+    global _revision, _revision_next_check
+    now = time.monotonic()
+    if _revision is None or now >= _revision_next_check:
+        revision = document_revision()
+        if revision is None:
+            return None
+        _revision, _revision_next_check = revision, now + REVISION_CHECK_INTERVAL
+    return _revision
+
+
+def answer_query(user_query: str, role: str) -> Dict[str, object]:
+    """Cached answer for a query; see `_compute_answers`."""
+    return answer_batch([user_query], role)[0]
+
+
+def answer_batch(queries: List[str], role: str) -> List[Dict[str, object]]:
+    """Answer many queries for one role, in order, in one pass.
+
+    The knowledge snapshot and document revision are taken once, queries that
+    normalize to the same text share one cache lookup, and only the misses are
+    computed, together.
+    """
+    role = _effective_role(role)
+    # A knowledge file edit swaps the snapshot and clears the cache before the lookups
+    snapshot = current_snapshot()
+    # Documents written by any worker bump the shared revision and retire cached answers here
+    revision = _document_revision()
+    if revision is not None:
+        ANSWER_CACHE.sync(revision)
+    keys = [normalize_text(q).strip() for q in queries]
+    answers: Dict[str, Dict[str, object]] = {}
+    misses: Dict[str, str] = {}
+    for q, key in zip(queries, keys):
+        if key in answers or key in misses:
+            continue
+        cached = ANSWER_CACHE.get((key, role))
+        if cached is not None:
+            answers[key] = cached
+        else:
+            misses[key] = q
+    if misses:
+        computed = _compute_answers(list(misses.values()), role, snapshot)
+        for key, (result, cacheable) in zip(misses, computed):
+            if cacheable:
+                ANSWER_CACHE.put((key, role), result, revision)
+            answers[key] = result
+    return [dict(answers[key]) for key in keys]
+
+
+def _compute_answers(queries: List[str], role: str,
+                     snapshot: KnowledgeSnapshot) -> List[Tuple[Dict[str, object], bool]]:
+    """Keyword knowledge first, then BM25-ranked chatbot documents, for each query.
+
+    Queries the keyword matcher cannot answer are searched together. Document
+    answers carry the matching snippet and cite their sources. Returns each
+    result and whether it may be cached (not after a search error).
+    """
+    ranked = [rank_answers(q, role, limit=TOP_K, snapshot=snapshot) for q in queries]
+    unanswered = [q for q, r in zip(queries, ranked) if not r]
+    cacheable = True
+    try:
+        hits = iter(_document_hits(unanswered, role) if unanswered else [])
+    except Exception as e:
+        hits = iter([[] for _ in unanswered])
+        cacheable = False
+        try:
+            db.session.rollback()
+            db.session.add(SystemLog(module='chatbot', message=f'document search error: {e}'))
+            db.session.commit()
+        except Exception:
+            pass
+    results = []
+    for r in ranked:
+        if r:
+            results.append(({
+                'ok': True,
+                'answer': r[0]['answer'],
+                'confidence': r[0]['confidence'],
+                'source': 'knowledge',
+                'sources': [],
+                'alternatives': r[1:],
+            }, True))
+            continue
+        doc_hits = next(hits)
+        if doc_hits:
+            results.append(({
+                'ok': True,
+                'answer': doc_hits[0]['snippet'],
+                'confidence': _document_confidence(float(doc_hits[0]['score'])),
+                'source': 'documents',
+                'sources': doc_hits,
+                'alternatives': [],
+            }, cacheable))
+        else:
+            results.append(({'ok': False, 'answer': FALLBACK_ANSWER, 'confidence': 0, 'source': None,
+                             'sources': [], 'alternatives': []}, cacheable))
+    return results
+
+
+def _document_confidence(score: float) -> int:
+    if score <= 0:
+        return 0
+    return int(round(DOCUMENT_CONFIDENCE_CAP * score / (score + 4.0)))
 
 
 def ask_gemini(user_query: str, role: str) -> Tuple[bool, str]:
     """Deterministic knowledge-based response without external APIs."""
-    ok, ans = answer_for(user_query, role)
-    return ok, ans
+    result = answer_query(user_query, role)
+    return bool(result['ok']), str(result['answer'])
 
 
 def chatbot_health() -> Dict[str, object]:
@@ -13,4 +163,8 @@ def chatbot_health() -> Dict[str, object]:
         'ok': True,
         'mode': 'static',
         'ready': True,
+        'search_backend': search_backend(),
+        'cache': ANSWER_CACHE.stats(),
+        'knowledge': knowledge_status(),
+        'document_index': index_status(),
     }
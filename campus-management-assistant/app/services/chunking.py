@@ -0,0 +1,109 @@
+from typing import List, Optional, Sequence, Tuple
+import os
+import re
+from ..models.chatbot_document import ChatbotChunk
+
+# Chatbot documents are retrieved as overlapping passages rather than whole
+# documents: a scraped page or PDF can run to hundreds of KB, and scoring it as
+# one unit both dilutes BM25 and returns a snippet from anywhere in it.
+CHUNK_CHARS = int(os.getenv('CHATBOT_CHUNK_CHARS', '1000'))
+# Characters of trailing sentences repeated at the start of the next passage
+CHUNK_OVERLAP = int(os.getenv('CHATBOT_CHUNK_OVERLAP', '150'))
+
+# Sentence ends: . ! ? and the Devanagari danda / double danda, or a line break
+_BOUNDARY = re.compile(r"(?<=[.!?।॥])[\"')\]]*\s+|\n+")
+
+Span = Tuple[int, int]
+
+
+def _trimmed(text: str, start: int, end: int) -> Span:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def sentence_spans(text: str) -> List[Span]:
+    """(start, end) offsets of the sentences of `text`, surrounding whitespace excluded."""
+    spans = []
+    start = 0
+    for m in _BOUNDARY.finditer(text):
+        span = _trimmed(text, start, m.end())
+        if span[1] > span[0]:
+            spans.append(span)
+        start = m.end()
+    span = _trimmed(text, start, len(text))
+    if span[1] > span[0]:
+        spans.append(span)
+    return spans
+
+
+def _split_long(text: str, start: int, end: int, size: int) -> List[Span]:
+    """Cut a sentence longer than `size` at the last space before each limit."""
+    pieces = []
+    while end - start > size:
+        cut = text.rfind(' ', start + 1, start + size + 1)
+        if cut <= start:
+            cut = start + size
+        pieces.append(_trimmed(text, start, cut))
+        start = _trimmed(text, cut, end)[0]
+    if end > start:
+        pieces.append((start, end))
+    return pieces
+
+
+def chunk_spans(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[Span]:
+    """Passages of at most `size` characters made of whole sentences.
+
+    Each passage after the first starts with the last sentences of the one
+    before, up to `overlap` characters, so an answer spanning a boundary is
+    still found in one passage. Only sentences longer than `size` are cut.
+    """
+    size = max(1, size)
+    units: List[Span] = []
+    for start, end in sentence_spans(text):
+        units.extend(_split_long(text, start, end, size) if end - start > size else [(start, end)])
+    spans = []
+    i = 0
+    while i < len(units):
+        j = i
+        while j + 1 < len(units) and units[j + 1][1] - units[i][0] <= size:
+            j += 1
+        spans.append((units[i][0], units[j][1]))
+        if j + 1 == len(units):
+            break
+        k = j + 1
+        while k - 1 > i and units[j][1] - units[k - 1][0] <= overlap:
+            k -= 1
+        i = k
+    return spans
+
+
+def page_ranges(content: str, pages: Optional[Sequence[Tuple[int, str]]] = None
+                ) -> List[Tuple[Optional[int], int, int]]:
+    """(page number, start, end) of each page of `content`, given the (page number,
+    text) pairs it was joined from with single spaces (as pdf_service joins pages).
+
+    Without pages, or when they do not add up to `content`, the whole content is
+    one range without a page number.
+    """
+    texts = [(number, text) for number, text in pages or () if text]
+    if not texts or ' '.join(text for _, text in texts) != content:
+        return [(None, 0, len(content))]
+    ranges = []
+    start = 0
+    for number, text in texts:
+        ranges.append((number, start, start + len(text)))
+        start += len(text) + 1
+    return ranges
+
+
+def make_chunks(content: str, pages: Optional[Sequence[Tuple[int, str]]] = None) -> List[ChatbotChunk]:
+    """Passages of `content`; with its pages, no passage crosses a page and each carries its page number."""
+    content = content or ''
+    spans = []
+    for page_no, offset, end in page_ranges(content, pages):
+        spans.extend((page_no, offset + start, offset + stop) for start, stop in chunk_spans(content[offset:end]))
+    return [ChatbotChunk(seq=n, page_no=page_no, start_offset=start, end_offset=end, content=content[start:end])
+            for n, (page_no, start, end) in enumerate(spans)]
@@ -0,0 +1,156 @@
+from typing import Callable, ContextManager, Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+import os
+import threading
+from . import http_client
+
+# Crawl mode for a ScrapedWebsite: follow same-site links from its URL, breadth
+# first, within a depth and page budget and the site's include/exclude patterns.
+DEFAULT_DEPTH = int(os.getenv('SCRAPER_CRAWL_DEPTH', '2'))
+DEFAULT_MAX_PAGES = int(os.getenv('SCRAPER_CRAWL_MAX_PAGES', '50'))
+MAX_DEPTH_LIMIT = 10
+MAX_PAGES_LIMIT = 2000
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize(url: str) -> str:
+    """One spelling per page: lowercase scheme/host, no default port, no fragment, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    if parts.username:
+        host = f'{parts.username}@{host}'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def parse_patterns(text: Optional[str]) -> Tuple[str, ...]:
+    """Patterns are stored one per line (commas also separate)."""
+    if not text:
+        return ()
+    return tuple(p.strip() for p in text.replace(',', '\n').splitlines() if p.strip())
+
+
+@dataclass(frozen=True)
+class CrawlPolicy:
+    max_depth: int = DEFAULT_DEPTH
+    max_pages: int = DEFAULT_MAX_PAGES
+    # Shell-style patterns matched against path + query, e.g. /notices/*, */exam*, *.php?print=*
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_site(cls, site) -> Optional['CrawlPolicy']:
+        """The site's crawl settings, or None when it is scraped as a single page."""
+        if not getattr(site, 'crawl_enabled', False):
+            return None
+        depth = site.crawl_max_depth if site.crawl_max_depth is not None else DEFAULT_DEPTH
+        pages = site.crawl_max_pages if site.crawl_max_pages is not None else DEFAULT_MAX_PAGES
+        return cls(
+            max_depth=max(0, min(depth, MAX_DEPTH_LIMIT)),
+            max_pages=max(1, min(pages, MAX_PAGES_LIMIT)),
+            include=parse_patterns(site.crawl_include),
+            exclude=parse_patterns(site.crawl_exclude),
+        )
+
+    def allows(self, url: str) -> bool:
+        parts = urlsplit(url)
+        target = parts.path + (f'?{parts.query}' if parts.query else '')
+        if any(fnmatchcase(target, p) for p in self.exclude):
+            return False
+        return not self.include or any(fnmatchcase(target, p) for p in self.include)
+
+
+class Frontier:
+    """Which pages of one site get fetched in this crawl.
+
+    Tracks canonical URLs already queued (this run) and the page budget. Used
+    only by the scraper's writer thread, so it needs no locking.
+    """
+
+    def __init__(self, policy: CrawlPolicy):
+        self.policy = policy
+        self.seen: Set[str] = set()
+        self.queued = 0
+
+    def add_seed(self, url: str) -> None:
+        self.seen.add(canonicalize(url))
+        self.queued += 1
+
+    def offer(self, url: str, depth: int) -> Optional[str]:
+        """Canonical URL to fetch at `depth`, or None if it is out of scope, seen or over budget."""
+        if depth > self.policy.max_depth or self.queued >= self.policy.max_pages:
+            return None
+        canonical = canonicalize(url)
+        if canonical in self.seen or not self.policy.allows(canonical):
+            return None
+        self.seen.add(canonical)
+        self.queued += 1
+        return canonical
+
+    def mark_seen(self, url: str) -> bool:
+        """Claim an in-scope URL without fetching it (e.g. unchanged per the sitemap).
+
+        Does not use the page budget; False if it is out of scope or already seen.
+        """
+        canonical = canonicalize(url)
+        if canonical in self.seen or not self.policy.allows(canonical):
+            return False
+        self.seen.add(canonical)
+        return True
+
+    def offer_all(self, urls: Iterable[str], depth: int) -> List[str]:
+        return [u for u in (self.offer(url, depth) for url in urls) if u]
+
+
+class RobotsCache:
+    """robots.txt rules per scheme and host, fetched once per crawl from worker threads."""
+
+    def __init__(self, slot: Optional[Callable[[str], ContextManager]] = None,
+                 agent: Optional[str] = None):
+        self.slot = slot
+        self.agent = agent or http_client.USER_AGENT
+        self._lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._rules: Dict[str, RobotFileParser] = {}
+
+    def _load(self, root: str) -> RobotFileParser:
+        rules = RobotFileParser(root + '/robots.txt')
+        try:
+            r = http_client.get(root + '/robots.txt', slot=self.slot, retries=1)
+            if r.status_code in (401, 403):
+                rules.disallow_all = True
+            elif r.status_code >= 500:
+                # Server trouble: assume nothing may be crawled until next time
+                rules.disallow_all = True
+            elif r.status_code >= 400:
+                rules.allow_all = True
+            else:
+                rules.parse(r.text.splitlines())
+        except Exception:
+            rules.disallow_all = True
+        return rules
+
+    def _rules_for(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        root = f'{parts.scheme}://{parts.netloc}'
+        with self._lock:
+            host_lock = self._host_locks.setdefault(root, threading.Lock())
+        with host_lock:
+            rules = self._rules.get(root)
+            if rules is None:
+                rules = self._rules[root] = self._load(root)
+        return rules
+
+    def allowed(self, url: str) -> bool:
+        return self._rules_for(url).can_fetch(self.agent, url)
+
+    def sitemaps(self, url: str) -> List[str]:
+        """Sitemap URLs listed in the host's robots.txt (`Sitemap:` lines)."""
+        return list(self._rules_for(url).site_maps() or [])
@@ -0,0 +1,142 @@
+from typing import List, Dict, Iterable
+from dataclasses import dataclass
+import heapq
+import math
+import re
+from .chatbot_matcher import tokenize
+
+
+# Very common words that carry no retrieval signal (English, Hindi, Hinglish)
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'be', 'to', 'of', 'in', 'on', 'for', 'at', 'by',
+    'and', 'or', 'what', 'when', 'where', 'how', 'which', 'who', 'do', 'does', 'can', 'i',
+    'me', 'my', 'we', 'you', 'it', 'this', 'that', 'with', 'from', 'about', 'please', 'tell',
+    'है', 'हैं', 'का', 'की', 'के', 'में', 'से', 'को', 'क्या', 'कब', 'और', 'आहे', 'काय',
+    'kab', 'hai', 'kya', 'ki', 'ka', 'ke', 'me',
+}
+
+ROLE_VISIBILITY = {
+    'guest': frozenset({'public'}),
+    'student': frozenset({'public', 'student'}),
+}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    doc_id: int
+    score: float
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct, non-stopword tokens of a query in first-seen order."""
+    seen = []
+    for tok in tokenize(text):
+        if tok not in STOPWORDS and tok not in seen:
+            seen.append(tok)
+    return seen
+
+
+class DocumentIndex:
+    """In-memory BM25 index over chatbot documents.
+
+    Documents are added incrementally; corpus statistics (document count,
+    average length, document frequencies) are maintained on every add so
+    search never rescans the corpus. Visibility is stored per document and
+    filtered at query time. `last_id` and `last_tombstone` record how far the
+    index has caught up with the passage table and its deletion log.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._visibility: Dict[int, str] = {}
+        self._total_length = 0
+        self.last_id = 0
+        self.last_tombstone = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._lengths
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    @property
+    def token_count(self) -> int:
+        return self._total_length
+
+    def add(self, doc_id: int, text: str, visibility: str) -> None:
+        if doc_id in self._lengths:
+            return
+        tokens = tokenize(text or '')
+        counts: Dict[str, int] = {}
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, tf in counts.items():
+            self._postings.setdefault(tok, {})[doc_id] = tf
+        self._lengths[doc_id] = len(tokens)
+        self._visibility[doc_id] = visibility
+        self._total_length += len(tokens)
+        self.last_id = max(self.last_id, doc_id)
+
+    def remove(self, doc_id: int, text: str) -> None:
+        """Forget a document; `text` must be the content it was added with."""
+        if doc_id not in self._lengths:
+            return
+        for tok in set(tokenize(text or '')):
+            posting = self._postings.get(tok)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[tok]
+        self._total_length -= self._lengths.pop(doc_id)
+        del self._visibility[doc_id]
+        if doc_id == self.last_id:
+            # SQLite may hand a deleted max rowid out again; let sync pick it up
+            self.last_id = max(self._lengths, default=0)
+
+    def search(self, query: str, visibilities: Iterable[str], limit: int = 3) -> List[SearchHit]:
+        terms = query_terms(query)
+        n = len(self._lengths)
+        if not terms or not n:
+            return []
+        allowed = frozenset(visibilities)
+        avgdl = self._total_length / n or 1.0
+        scores: Dict[int, float] = {}
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                if self._visibility[doc_id] not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+        return [SearchHit(doc_id=d, score=s) for d, s in best]
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+def make_snippet(content: str, query: str, max_len: int = 300) -> str:
+    """Pick the sentence that covers the most query terms and trim it."""
+    terms = set(query_terms(query))
+    best, best_score = '', -1
+    for sentence in _SENTENCE_SPLIT.split(content or ''):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        score = len(terms.intersection(tokenize(sentence)))
+        if score > best_score:
+            best, best_score = sentence, score
+    if len(best) > max_len:
+        best = best[:max_len].rsplit(' ', 1)[0] + '…'
+    return best
@@ -1,17 +1,11 @@
 from typing import List, Tuple, Optional
 from datetime import datetime
-import hashlib
 from ..extensions import db
 from ..models.faq import FAQ
 from ..models.user import User
-from ..models.chatbot_document import ChatbotDocument
 from ..models.logs import SystemLog
-
-
-def _hash_text(text: str) -> str:
-    normalized = " ".join(text.split()).strip().lower()
-    import hashlib
-    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+from .chatbot_document_service import store_document
+from .search_service import fts_available, match_expression, search_faqs
 
 
 def submit_question(asked_by: User, question: str, category: str, target_department: Optional[str]) -> Tuple[bool, Optional[FAQ], str]:
@@ -42,17 +36,8 @@ def answer_faq(faq: FAQ, answer: str, answered_by: User) -> Tuple[bool, str]:
         db.session.commit()
         # Create chatbot document
         text = f"Q: {faq.question}\nA: {faq.answer}"
-        h = _hash_text(text)
-        if not ChatbotDocument.query.filter_by(content_hash=h).first():
-            db.session.add(ChatbotDocument(
-                source_type='faq',
-                source_id=faq.id,
-                content=text,
-                content_hash=h,
-                visibility='public',  # FAQs are public unless restricted later by category logic
-                created_at=datetime.utcnow(),
-            ))
-            db.session.commit()
+        # FAQs are public unless restricted later by category logic
+        store_document('faq', faq.id, text, 'public')
         return True, 'answered'
     except Exception as e:
         db.session.add(SystemLog(module='faq', message=f'answer error: {e}'))
@@ -71,6 +56,8 @@ def student_answered_faqs() -> List[FAQ]:
 
 def answered_faqs_filtered(category: Optional[str] = None, q: Optional[str] = None) -> List[FAQ]:
     from sqlalchemy import or_
+    if q and fts_available() and match_expression(q, match_all=True):
+        return search_faqs(q, category=category)
     qry = FAQ.query.filter_by(status='answered')
     if category:
         qry = qry.filter_by(category=category)
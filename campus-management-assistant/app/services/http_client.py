@@ -0,0 +1,127 @@
+from typing import Callable, ContextManager, Dict, Optional
+from dataclasses import dataclass
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive Session per host, shared by every scraper thread in the process
+USER_AGENT = os.getenv('SCRAPER_USER_AGENT', 'CampusAssistantBot/1.0')
+POOL_SIZE = int(os.getenv('SCRAPER_POOL_SIZE', '4'))
+CONNECT_TIMEOUT = float(os.getenv('SCRAPER_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('SCRAPER_READ_TIMEOUT', os.getenv('SCRAPER_TIMEOUT', '15')))
+# GET is idempotent: retry connection errors, timeouts and transient statuses
+RETRIES = int(os.getenv('SCRAPER_RETRIES', '3'))
+BACKOFF = float(os.getenv('SCRAPER_BACKOFF', '0.5'))
+BACKOFF_MAX = float(os.getenv('SCRAPER_BACKOFF_MAX', '30'))
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+@dataclass
+class RequestStats:
+    """Filled in by get(), also when it raises."""
+    attempts: int = 0
+    latency: float = 0.0  # seconds spent in requests, excluding backoff sleeps and slot waits
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc.lower()}'
+
+
+def session_for(url: str) -> requests.Session:
+    """The pooled Session for the URL's scheme and host (created on first use)."""
+    key = _host_key(url)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            # Retries are handled in get() so they can be counted, paced and jittered
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, POOL_SIZE), max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSIONS[key] = session
+        return session
+
+
+def close_sessions() -> None:
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+
+
+def backoff_delay(attempt: int, rng: Callable[[], float] = random.random) -> float:
+    """Full-jitter exponential backoff for the given 0-based retry."""
+    return rng() * min(BACKOFF_MAX, BACKOFF * (2 ** attempt))
+
+
+def _retry_after(response: requests.Response) -> float:
+    value = (response.headers.get('Retry-After') or '').strip()
+    if not value:
+        return 0.0
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return 0.0
+    return min(BACKOFF_MAX, max(0.0, seconds))
+
+
+def get(url: str, headers: Optional[Dict[str, str]] = None,
+        slot: Optional[Callable[[str], ContextManager]] = None,
+        stats: Optional[RequestStats] = None, retries: Optional[int] = None,
+        stream: bool = False, sleep: Callable[[float], None] = time.sleep) -> requests.Response:
+    """GET through the host's pooled Session with retries.
+
+    Each attempt runs inside `slot(url)` (e.g. HostLimiter.slot) so retries obey
+    the same per-host limits; backoff sleeps happen outside it. Returns the final
+    response, which may still carry a retryable status once retries run out, and
+    re-raises the last connection/timeout error. With `stream` the body of the
+    returned response is left unread and latency covers the headers only.
+    """
+    stats = stats if stats is not None else RequestStats()
+    retries = RETRIES if retries is None else retries
+    session = session_for(url)
+    attempt = 0
+    while True:
+        stats.attempts += 1
+        with slot(url) if slot else nullcontext():
+            started = time.monotonic()
+            try:
+                response = session.get(url, headers=headers, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                                       stream=stream)
+                error = None
+            except RETRY_ERRORS as e:
+                error = e
+            finally:
+                stats.latency += time.monotonic() - started
+        if error is not None:
+            if attempt >= retries:
+                raise error
+            delay = backoff_delay(attempt)
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            delay = max(backoff_delay(attempt), _retry_after(response))
+            response.close()
+        attempt += 1
+        sleep(delay)
@@ -0,0 +1,83 @@
+from typing import List, Optional, Tuple
+import hashlib
+import os
+import struct
+
+# MinHash signatures over word shingles, banded for locality-sensitive hashing:
+# two documents with Jaccard similarity s share at least one band bucket with
+# probability 1 - (1 - s^ROWS)^BANDS, so near-duplicates are found by looking up
+# BANDS buckets instead of comparing against every stored document.
+#
+# Signatures use one-permutation hashing: each shingle is hashed once and the
+# hash's top bits pick one of NUM_PERM bins that keeps its minimum, with empty
+# bins filled from the next non-empty one. That costs one hash per shingle
+# rather than NUM_PERM, which matters for scraped pages of hundreds of KB.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS  # 8 rows: candidates from ~0.7 similarity up
+SHINGLE_WORDS = 3
+# Texts with fewer shingles than this are too short to call near-duplicates
+MIN_SHINGLES = int(os.getenv('CHATBOT_NEAR_DUP_MIN_SHINGLES', '20'))
+
+_BIN_BITS = NUM_PERM.bit_length() - 1  # NUM_PERM is a power of two
+_VALUE_BITS = 64 - _BIN_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_MASK32 = 0xFFFFFFFF
+# Added per bin skipped when an empty bin borrows a neighbour's minimum
+_BORROW_STEP = 0x9E3779B1
+_PACK = struct.Struct(f'<{NUM_PERM}I')
+
+
+def shingles(text: str) -> set:
+    words = (text or '').lower().split()
+    if len(words) < SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def signature(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of the text's word shingles; None when it has fewer than MIN_SHINGLES."""
+    items = shingles(text)
+    if len(items) < max(1, MIN_SHINGLES):
+        return None
+    bins: List[Optional[int]] = [None] * NUM_PERM
+    for item in items:
+        h = _hash64(item)
+        slot, value = h >> _VALUE_BITS, h & _VALUE_MASK
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    sig = []
+    for i in range(NUM_PERM):
+        step = 0
+        while bins[(i + step) % NUM_PERM] is None:
+            step += 1
+        sig.append((bins[(i + step) % NUM_PERM] + step * _BORROW_STEP) >> (_VALUE_BITS - 32) & _MASK32)
+    return tuple(sig)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the share of matching signature positions."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def pack(sig: Tuple[int, ...]) -> bytes:
+    return _PACK.pack(*sig)
+
+
+def unpack(data: bytes) -> Optional[Tuple[int, ...]]:
+    return _PACK.unpack(data) if data and len(data) == _PACK.size else None
+
+
+def band_keys(sig: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs of a signature; buckets are stable signed 64-bit hashes of the band's rows."""
+    packed = pack(sig)
+    keys = []
+    for band in range(BANDS):
+        rows = packed[band * ROWS * 4:(band + 1) * ROWS * 4]
+        bucket = int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'little', signed=True)
+        keys.append((band, bucket))
+    return keys
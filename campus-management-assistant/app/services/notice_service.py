@@ -1,6 +1,5 @@
 from typing import List, Optional, Tuple
 from datetime import datetime
-import hashlib
 import os
 from werkzeug.datastructures import FileStorage
 from ..extensions import db
@@ -8,20 +7,17 @@ from ..models.user import User
 from ..models.notice import Notice
 from ..models.notice_category import NoticeCategory
 from ..models.notice_file import NoticeFile
-from ..models.chatbot_document import ChatbotDocument
+from ..models.blob import Blob
 from ..models.logs import SystemLog
-from .pdf_service import extract_pdf_text
+from .pdf_service import extract_pdf_text, cached_pages
+from . import blob_store
+from .chatbot_document_service import store_document
 from .email_service import send_notice_published
 
 UPLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads', 'notices'))
 ALLOWED_EXT = {'.pdf', '.png', '.jpg', '.jpeg'}
 
 
-def _hash_text(text: str) -> str:
-    normalized = " ".join(text.split()).strip().lower()
-    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
-
-
 def create_notice(author: User, title: str, summary: Optional[str], content: str, category_name: str,
                   visibility: str, target_department: Optional[str], target_year: Optional[int]) -> Tuple[bool, Optional[Notice], str]:
     try:
@@ -84,15 +80,14 @@ def attach_file(notice: Notice, storage: FileStorage) -> Tuple[bool, Optional[No
         ext = os.path.splitext(name)[1].lower()
         if ext not in ALLOWED_EXT:
             return False, None, 'invalid type'
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        safe_name = f"{notice.id}_{int(datetime.utcnow().timestamp())}{ext}"
-        file_path = os.path.join(UPLOAD_DIR, safe_name)
-        storage.save(file_path)
+        # Identical bytes (re-uploads, the same circular on several notices) share one blob
+        blob = blob_store.put_stream(storage.stream, content_type=storage.mimetype)
         nf = NoticeFile(
             notice_id=notice.id,
             file_name=name,
-            file_path=file_path,
+            file_path=blob_store.blob_path(blob.sha256),
             file_type=ext,
+            blob_sha256=blob.sha256,
             uploaded_at=datetime.utcnow(),
         )
         db.session.add(nf)
@@ -113,33 +108,16 @@ def publish_notice(notice: Notice, send_email: bool = True) -> Tuple[bool, str]:
             'student' if notice.visibility == 'student' else 'student'
         )
         base_text = f"{notice.title}\n{notice.summary or ''}\n{notice.content}"
-        hash_value = _hash_text(base_text)
-        if not ChatbotDocument.query.filter_by(content_hash=hash_value).first():
-            db.session.add(ChatbotDocument(
-                source_type='notice',
-                source_id=notice.id,
-                content=base_text,
-                content_hash=hash_value,
-                visibility=visibility,
-                created_at=datetime.utcnow(),
-            ))
-            db.session.commit()
-        # PDFs
-        for nf in notice.files:
-            if nf.file_type == '.pdf':
-                text = extract_pdf_text(nf.file_path)
-                if text:
-                    h = _hash_text(text)
-                    if not ChatbotDocument.query.filter_by(content_hash=h).first():
-                        db.session.add(ChatbotDocument(
-                            source_type='notice_pdf',
-                            source_id=notice.id,
-                            content=text,
-                            content_hash=h,
-                            visibility=visibility,
-                            created_at=datetime.utcnow(),
-                        ))
-                        db.session.commit()
+        store_document('notice', notice.id, base_text, visibility)
+        # PDFs: distinct attachments not extracted yet are extracted in parallel first
+        pdfs = [nf for nf in notice.files if nf.file_type == '.pdf']
+        texts = blob_store.extract_pending(db.session.get(Blob, nf.blob_sha256) for nf in pdfs if nf.blob_sha256)
+        db.session.commit()
+        for nf in pdfs:
+            text = texts[nf.blob_sha256] if nf.blob_sha256 in texts else notice_file_text(nf)
+            if text:
+                pages = cached_pages(nf.blob_sha256) if nf.blob_sha256 else None
+                store_document('notice_pdf', notice.id, text, visibility, pages=pages)
         # Send email notifications (do not block on failure)
         if send_email:
             try:
@@ -154,6 +132,22 @@ def publish_notice(notice: Notice, send_email: bool = True) -> Tuple[bool, str]:
         return False, 'error'
 
 
+def notice_file_text(nf: NoticeFile) -> Optional[str]:
+    """Text of a PDF attachment, extracted once per distinct file (see pdf_extractions)."""
+    if nf.blob_sha256:
+        blob = db.session.get(Blob, nf.blob_sha256)
+        if blob:
+            return blob_store.extracted_text(blob)
+    return extract_pdf_text(nf.file_path)
+
+
+def remove_legacy_file(nf: NoticeFile) -> None:
+    """Delete a pre-blob-store upload from disk. Blob files may be shared and are
+    reclaimed by garbage collection once nothing references them."""
+    if not nf.blob_sha256 and nf.file_path and os.path.exists(nf.file_path):
+        os.remove(nf.file_path)
+
+
 # Visibility fetching
 
 def guest_public_notices() -> List[Notice]:
@@ -188,8 +182,7 @@ def delete_notice_owned(notice_id: int, owner: User) -> Tuple[bool, str]:
         # Delete attached files from disk safely
         for nf in list(n.files):
             try:
-                if nf.file_path and os.path.exists(nf.file_path):
-                    os.remove(nf.file_path)
+                remove_legacy_file(nf)
             except Exception as e:
                 db.session.add(SystemLog(module='notice', message=f"file delete warn: {e} notice_id={n.id} file_id={nf.id}"))
                 db.session.commit()
@@ -0,0 +1,122 @@
+from typing import Callable, List, Optional, Sequence
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urldefrag, urlsplit
+import os
+import re
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# Parse each scraped page once and run every extractor over the same tree.
+# lxml's C parser is used when installed (pip install lxml); SCRAPER_HTML_PARSER
+# forces a BeautifulSoup backend by name.
+PREFERRED_PARSERS = ('lxml', 'html.parser')
+
+# <meta> names/properties that carry a page's modification time, best first
+MODIFIED_META = (
+    'last-modified', 'article:modified_time', 'og:updated_time', 'dcterms.modified',
+    'dc.date.modified', 'revised', 'date',
+)
+# "Last updated: 12/03/2025", "Last modified on 12 March 2025" in the page text
+_MODIFIED_TEXT = re.compile(
+    r'last\s+(?:updated|modified|revised)\s*(?:on)?\s*[:\-]?\s*'
+    r'(\d{1,4}[./\-]\d{1,2}[./\-]\d{1,4}|\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]{3,9},?\s+\d{4}|[A-Za-z]{3,9}\s+\d{1,2},?\s+\d{4})',
+    re.IGNORECASE,
+)
+
+
+def _pick_parser() -> str:
+    forced = (os.getenv('SCRAPER_HTML_PARSER') or '').strip()
+    for name in ((forced,) if forced else ()) + PREFERRED_PARSERS:
+        try:
+            BeautifulSoup('', name)
+            return name
+        except FeatureNotFound:
+            continue
+    return 'html.parser'
+
+
+PARSER = _pick_parser()
+
+
+@dataclass
+class ParsedPage:
+    url: str
+    title: str = ''
+    text: str = ''
+    pdf_links: List[str] = field(default_factory=list)
+    # Same-site http(s) links other than PDFs, without fragments, in page order
+    links: List[str] = field(default_factory=list)
+    # Raw modification date found in meta tags, <time> or "last updated" text
+    modified_hint: Optional[str] = None
+
+
+Extractor = Callable[[BeautifulSoup, ParsedPage], None]
+
+
+def _site(netloc: str) -> str:
+    host = netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def extract_links(soup: BeautifulSoup, page: ParsedPage) -> None:
+    site = _site(urlsplit(page.url).netloc)
+    seen = set()
+    for a in soup.find_all('a', href=True):
+        href = a['href'].strip()
+        absolute, _ = urldefrag(urljoin(page.url, href))
+        if not absolute or absolute in seen:
+            continue
+        parts = urlsplit(absolute)
+        if href.lower().endswith('.pdf') or parts.path.lower().endswith('.pdf'):
+            seen.add(absolute)
+            page.pdf_links.append(absolute)
+        elif parts.scheme in ('http', 'https') and _site(parts.netloc) == site:
+            seen.add(absolute)
+            page.links.append(absolute)
+
+
+def extract_title(soup: BeautifulSoup, page: ParsedPage) -> None:
+    tag = soup.title
+    if tag is None:
+        meta = soup.find('meta', attrs={'property': 'og:title'})
+        page.title = ' '.join((meta.get('content') or '').split()) if meta else ''
+    else:
+        page.title = ' '.join(tag.get_text().split())
+
+
+def extract_modified(soup: BeautifulSoup, page: ParsedPage) -> None:
+    found = {}
+    for meta in soup.find_all('meta', content=True):
+        key = (meta.get('name') or meta.get('property') or meta.get('http-equiv') or meta.get('itemprop') or '').lower()
+        if key in MODIFIED_META and key not in found:
+            found[key] = meta['content'].strip()
+    for key in MODIFIED_META:
+        if found.get(key):
+            page.modified_hint = found[key]
+            return
+    tag = soup.find('time', datetime=True)
+    if tag is not None:
+        page.modified_hint = tag['datetime'].strip() or None
+
+
+def extract_text(soup: BeautifulSoup, page: ParsedPage) -> None:
+    """Visible text, whitespace-normalized. Removes script/style from the tree, so it runs last."""
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+    page.text = " ".join(soup.get_text(separator=' ').split()).strip()
+    if page.modified_hint is None:
+        match = _MODIFIED_TEXT.search(page.text)
+        if match:
+            page.modified_hint = match.group(1)
+
+
+EXTRACTORS: Sequence[Extractor] = (extract_links, extract_title, extract_modified, extract_text)
+
+
+def parse_page(url: str, html: str, extractors: Sequence[Extractor] = EXTRACTORS,
+               parser: Optional[str] = None) -> ParsedPage:
+    """Parse `html` once and fill a ParsedPage by running each extractor in order."""
+    soup = BeautifulSoup(html, parser or PARSER)
+    page = ParsedPage(url)
+    for extractor in extractors:
+        extractor(soup, page)
+    return page
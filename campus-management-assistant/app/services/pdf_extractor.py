@@ -0,0 +1,224 @@
+from typing import Any, Callable, Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+# PDF text extraction in separate worker processes: pdfplumber is CPU-bound and
+# holds the GIL, and a malformed or huge file must not stall the caller. Each
+# document gets a hard timeout and a memory cap; a worker that times out, dies
+# or runs out of memory is killed and replaced. PDF_EXTRACT_ISOLATED=0 runs
+# extraction in the calling thread instead (no limits).
+ISOLATED = os.getenv('PDF_EXTRACT_ISOLATED', '1') == '1'
+WORKERS = int(os.getenv('PDF_EXTRACT_WORKERS', str(os.cpu_count() or 2)))
+TIMEOUT = float(os.getenv('PDF_EXTRACT_TIMEOUT', '60'))
+# Address space a worker may use on top of its size at startup (POSIX only)
+MEMORY_MB = int(os.getenv('PDF_EXTRACT_MEMORY_MB', '1024'))
+# Workers are replaced after this many documents (pdfminer caches only grow)
+MAX_TASKS = int(os.getenv('PDF_EXTRACT_MAX_TASKS', '200'))
+# fork where available: spawn/forkserver re-import the main module (run.py) in every worker
+START_METHOD = os.getenv('PDF_EXTRACT_START_METHOD') or (
+    'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class ExtractionFailed(Exception):
+    """Extraction did not finish: kind is 'timeout', 'crashed', 'memory' or 'error'."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+@dataclass
+class Extraction:
+    path: str
+    result: Any = None  # what the target returned (pdf_service.ParsedPdf by default)
+    error: Optional[str] = None
+    kind: Optional[str] = None  # ExtractionFailed.kind when it failed
+    seconds: float = 0.0
+
+
+def _limit_memory(extra_bytes: int) -> None:
+    try:
+        import resource
+    except ImportError:
+        return  # Windows: only the timeout applies
+    base = 0
+    try:
+        with open('/proc/self/statm') as f:
+            base = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = base + extra_bytes
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _serve(conn, target: Callable[[str], Any], memory_bytes: int) -> None:
+    """Worker process loop: one path in, one (status, payload) out, until None or EOF."""
+    _limit_memory(memory_bytes)
+    while True:
+        try:
+            path = conn.recv()
+        except (EOFError, OSError):
+            return
+        if path is None:
+            return
+        try:
+            reply = ('ok', target(path))
+        except MemoryError:
+            reply = ('memory', 'memory limit exceeded')
+        except Exception as e:
+            reply = ('error', f'{type(e).__name__}: {e}')
+        try:
+            conn.send(reply)
+        except MemoryError:
+            conn.send(('memory', 'memory limit exceeded'))
+
+
+class _Worker:
+    def __init__(self, ctx, target, memory_bytes: int):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_serve, args=(child, target, memory_bytes),
+                                name='pdf-extract', daemon=True)
+        self.proc.start()
+        child.close()
+        self.tasks = 0
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(1)
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.proc.join(1)
+        except (OSError, ValueError):
+            pass
+        self.kill()
+
+
+class ExtractorPool:
+    """Long-lived extraction processes, checked out by one calling thread at a time.
+
+    Any number of threads may call `extract` concurrently; at most `workers`
+    documents are extracted at once and the rest wait for a free process.
+    """
+
+    def __init__(self, workers: int = WORKERS, timeout: float = TIMEOUT, memory_mb: int = MEMORY_MB,
+                 max_tasks: int = MAX_TASKS, target: Optional[Callable[[str], Any]] = None,
+                 start_method: str = START_METHOD):
+        if target is None:
+            from .pdf_service import parse_pdf
+            target = parse_pdf
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.memory_bytes = max(0, memory_mb) * 1024 * 1024
+        self.max_tasks = max(1, max_tasks)
+        self.target = target
+        self._ctx = multiprocessing.get_context(start_method)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._idle: 'queue.LifoQueue[_Worker]' = queue.LifoQueue()
+        self._closed = False
+
+    def _checkout(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _Worker(self._ctx, self.target, self.memory_bytes)
+
+    def extract(self, path: str, timeout: Optional[float] = None) -> Any:
+        """The target's result for one PDF; raises ExtractionFailed."""
+        if self._closed:
+            raise ExtractionFailed('error', 'extractor pool is closed')
+        timeout = self.timeout if timeout is None else timeout
+        with self._slots:
+            worker = self._checkout()
+            keep = False
+            try:
+                worker.tasks += 1
+                worker.conn.send(path)
+                if not worker.conn.poll(timeout):
+                    raise ExtractionFailed('timeout', f'PDF extraction timed out after {timeout:g}s')
+                try:
+                    status, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.proc.join(1)
+                    raise ExtractionFailed('crashed', f'PDF extraction process died (exit code {worker.proc.exitcode})')
+                if status == 'ok':
+                    keep = worker.tasks < self.max_tasks
+                    return payload
+                keep = status == 'error' and worker.tasks < self.max_tasks
+                raise ExtractionFailed(status, payload)
+            except (BrokenPipeError, ConnectionResetError):
+                raise ExtractionFailed('crashed', 'PDF extraction process is gone')
+            finally:
+                if keep and not self._closed:
+                    self._idle.put(worker)
+                else:
+                    worker.kill()
+
+    def extract_many(self, paths: Iterable[str], timeout: Optional[float] = None) -> List[Extraction]:
+        """Extract several PDFs in parallel (up to `workers` at once), in input order."""
+        paths = list(paths)
+
+        def one(path: str) -> Extraction:
+            started = time.monotonic()
+            result = Extraction(path)
+            try:
+                result.result = self.extract(path, timeout)
+            except ExtractionFailed as e:
+                result.error, result.kind = str(e), e.kind
+            result.seconds = time.monotonic() - started
+            return result
+
+        if len(paths) <= 1:
+            return [one(p) for p in paths]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(paths)), thread_name_prefix='pdf-extract') as pool:
+            return list(pool.map(one, paths))
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
+
+
+_POOL: Optional[ExtractorPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> ExtractorPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ExtractorPool()
+        return _POOL
+
+
+def shutdown() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown)
+
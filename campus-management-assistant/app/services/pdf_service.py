@@ -1,19 +1,136 @@
-from typing import Optional
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from datetime import datetime
+import hashlib
+import os
+import time
+from sqlalchemy.exc import IntegrityError
 from ..extensions import db
 from ..models.logs import SystemLog
+from ..models.pdf_extraction import PdfExtraction, PdfPage
+from . import pdf_extractor
 import pdfplumber
 
+# Cache key for pdf_extractions: bump the suffix whenever parse_pdf's output
+# changes; a pdfplumber upgrade invalidates the cache on its own.
+EXTRACTOR_VERSION = f'pdfplumber-{pdfplumber.__version__}/2'
+# Pages read per document; later pages are counted but not extracted (0 = all)
+MAX_PAGES = int(os.getenv('PDF_EXTRACT_MAX_PAGES', '500'))
+# Failures that say nothing about the file itself are retried on the next call
+TRANSIENT_FAILURES = ('timeout', 'crashed')
 
-def extract_pdf_text(file_path: str) -> Optional[str]:
+
+class ParsedPdf(NamedTuple):
+    pages: Tuple[str, ...]  # normalized text per page read, '' for pages without text
+    page_count: int
+    seconds: float
+
+    @property
+    def text(self) -> Optional[str]:
+        return ' '.join(p for p in self.pages if p) or None
+
+    @property
+    def numbered_pages(self) -> List[Tuple[int, str]]:
+        """(page number, text) of the pages with text; `text` is these joined."""
+        return [(n, p) for n, p in enumerate(self.pages, 1) if p]
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def iter_pdf_pages(pdf, max_pages: int = MAX_PAGES) -> Iterator[Tuple[int, str]]:
+    """(page number, normalized text) for each page of an open pdfplumber PDF.
+
+    Each page's layout objects are released once its text is out, so memory
+    stays at about one page regardless of document length.
+    """
+    for number, page in enumerate(pdf.pages, 1):
+        if max_pages and number > max_pages:
+            return
+        try:
+            text = page.extract_text() or ""
+        finally:
+            page.close()
+        yield number, normalize_text(text)
+
+
+def parse_pdf(file_path: str, max_pages: int = MAX_PAGES) -> ParsedPdf:
+    """Page texts of a PDF in the current process (what extraction workers run)."""
+    started = time.monotonic()
+    with pdfplumber.open(file_path) as pdf:
+        pages = tuple(text for _, text in iter_pdf_pages(pdf, max_pages))
+        return ParsedPdf(pages, len(pdf.pages), time.monotonic() - started)
+
+
+def read_pdf(file_path: str) -> ParsedPdf:
+    """Page texts, page count and parse time of a PDF. Raises on unreadable files,
+    and with pdf_extractor.ExtractionFailed on timeouts, crashes and memory overruns.
+
+    Runs in an extraction worker process (see pdf_extractor) and touches no
+    database state, so scraper worker threads can call it directly.
+    """
+    if not pdf_extractor.ISOLATED:
+        return parse_pdf(file_path)
+    return pdf_extractor.get_pool().extract(file_path)
+
+
+def file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_extraction(sha256: str) -> Optional[PdfExtraction]:
+    return db.session.get(PdfExtraction, (sha256, EXTRACTOR_VERSION))
+
+
+def cache_extraction(sha256: str, parsed: Optional[ParsedPdf] = None,
+                     error: Optional[Exception] = None) -> Optional[PdfExtraction]:
+    """Record a parse (or a permanent failure) for the file; transient failures are not
+    recorded. The caller commits."""
+    if error is not None and getattr(error, 'kind', None) in TRANSIENT_FAILURES:
+        return None
+    row = cached_extraction(sha256)
+    if row is None:
+        row = PdfExtraction(sha256=sha256, extractor_version=EXTRACTOR_VERSION)
+        db.session.add(row)
+    if parsed is not None:
+        row.page_count, row.extract_seconds, row.error = parsed.page_count, parsed.seconds, None
+        row.pages = [PdfPage(page_number=n, text=text) for n, text in parsed.numbered_pages]
+    else:
+        row.pages, row.error = [], str(error)[:500]
+    row.extracted_at = datetime.utcnow()
+    return row
+
+
+def cached_pages(sha256: str) -> List[Tuple[int, str]]:
+    """(page number, text) of the cached extraction's pages that have text, for page-level chunks."""
+    row = cached_extraction(sha256)
+    return [(p.page_number, p.text) for p in row.pages] if row is not None else []
+
+
+def extract_pdf_text(file_path: str, sha256: Optional[str] = None) -> Optional[str]:
+    """Text of a PDF, parsed once per distinct file content: later calls for the same
+    bytes (another upload, a re-publish, a re-scrape) read pdf_extractions instead.
+    Failures are logged to system_logs and return None."""
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text_parts = []
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                text_parts.append(text)
-            raw = "\n".join(text_parts)
-            normalized = " ".join(raw.split()).strip().lower()
-            return normalized if normalized else None
+        sha256 = sha256 or file_sha256(file_path)
+        row = cached_extraction(sha256)
+        if row is not None:
+            return row.text
+        try:
+            parsed = read_pdf(file_path)
+        except Exception as e:
+            cache_extraction(sha256, error=e)
+            raise
+        cache_extraction(sha256, parsed)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # extracted concurrently elsewhere; same text
+        return parsed.text
     except Exception as e:
         try:
             db.session.add(SystemLog(module='pdf', message=f'pdf extract error: {e}'))
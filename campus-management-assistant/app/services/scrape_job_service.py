@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+from sqlalchemy import update
+from ..extensions import db
+from ..models.scraper import ScrapeJob, ScrapedWebsite
+from ..models.logs import SystemLog
+from .scraper_service import list_websites, scrape_sites
+
+# Jobs are rows in scrape_jobs; every server process (run.py) runs one background
+# worker that claims queued jobs atomically, so gunicorn workers never run the
+# same job twice.
+JOB_WORKER = os.getenv('SCRAPER_JOB_WORKER', '1').strip().lower() not in ('0', 'false', 'no')
+JOB_POLL = float(os.getenv('SCRAPER_JOB_POLL', '2'))
+# A running job whose progress has not moved for this long belonged to a dead process
+JOB_STALE = float(os.getenv('SCRAPER_JOB_STALE', '900'))
+# Minimum seconds between progress commits while a job runs
+PROGRESS_INTERVAL = 1.0
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+_WAKE = threading.Event()
+_WORKER: Optional[threading.Thread] = None
+_WORKER_LOCK = threading.Lock()
+
+
+def submit_job(kind: str, website_id: Optional[int] = None, user_id: Optional[int] = None) -> Tuple[ScrapeJob, bool]:
+    """Queue a scrape ('all' or one 'site'); returns (job, created).
+
+    An identical job that is still queued or running is returned instead of
+    queueing a duplicate.
+    """
+    existing = (ScrapeJob.query
+                .filter(ScrapeJob.kind == kind, ScrapeJob.website_id == website_id,
+                        ScrapeJob.status.in_(ACTIVE_STATUSES))
+                .order_by(ScrapeJob.id.asc())
+                .first())
+    if existing:
+        return existing, False
+    job = ScrapeJob(kind=kind, website_id=website_id, requested_by=user_id, status='queued')
+    db.session.add(job)
+    db.session.commit()
+    _WAKE.set()
+    return job, True
+
+
+def get_job(job_id: int) -> Optional[ScrapeJob]:
+    return db.session.get(ScrapeJob, job_id)
+
+
+def list_jobs(limit: int = 20) -> List[ScrapeJob]:
+    return ScrapeJob.query.order_by(ScrapeJob.id.desc()).limit(limit).all()
+
+
+def job_to_dict(job: ScrapeJob) -> Dict[str, object]:
+    def fmt(dt):
+        return dt.isoformat(timespec='seconds') + 'Z' if dt else None
+    total = job.sites_total or 0
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'website_id': job.website_id,
+        'status': job.status,
+        'message': job.message,
+        'sites_total': total,
+        'sites_done': job.sites_done or 0,
+        'sites_failed': job.sites_failed or 0,
+        'pdfs_fetched': job.pdfs_fetched or 0,
+        'bytes_fetched': job.bytes_fetched or 0,
+        'percent': int(100 * (job.sites_done or 0) / total) if total else (100 if job.finished_at else 0),
+        'done': job.status not in ACTIVE_STATUSES,
+        'created_at': fmt(job.created_at),
+        'started_at': fmt(job.started_at),
+        'finished_at': fmt(job.finished_at),
+    }
+
+
+def _fail_stale_jobs() -> None:
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE)
+    db.session.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.status == 'running', ScrapeJob.updated_at < cutoff)
+        .values(status='error', message='interrupted (worker stopped)', finished_at=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def claim_next_job() -> Optional[int]:
+    """Atomically move the oldest queued job to running; None if there is none."""
+    _fail_stale_jobs()
+    while True:
+        row = (db.session.query(ScrapeJob.id)
+               .filter(ScrapeJob.status == 'queued')
+               .order_by(ScrapeJob.id.asc())
+               .first())
+        if not row:
+            return None
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == row[0], ScrapeJob.status == 'queued')
+            .values(status='running', started_at=now, updated_at=now)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return row[0]
+        # Another process claimed it first; try the next one
+
+
+def _job_sites(job: ScrapeJob) -> List[ScrapedWebsite]:
+    if job.kind == 'site':
+        site = db.session.get(ScrapedWebsite, job.website_id) if job.website_id else None
+        return [site] if site and getattr(site, 'enabled', True) else []
+    return [s for s in list_websites() if getattr(s, 'enabled', True)]
+
+
+def run_job(job_id: int) -> Optional[ScrapeJob]:
+    """Execute a claimed job on the current thread, committing progress as it goes."""
+    job = db.session.get(ScrapeJob, job_id)
+    if not job:
+        return None
+    last_commit = [0.0]
+
+    def on_progress(totals: Dict[str, int]) -> None:
+        changed_sites = totals['sites_done'] != (job.sites_done or 0)
+        for key, value in totals.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.utcnow()
+        now = time.monotonic()
+        if changed_sites or now - last_commit[0] >= PROGRESS_INTERVAL:
+            db.session.commit()
+            last_commit[0] = now
+
+    try:
+        sites = _job_sites(job)
+        job.sites_total = len(sites)
+        db.session.commit()
+        if not sites:
+            job.status = 'error'
+            job.message = 'site not found or disabled' if job.kind == 'site' else 'no enabled sites'
+        else:
+            statuses = scrape_sites(sites, progress=on_progress)
+            failed = sum(1 for s in statuses.values() if s != 'success')
+            job.status = 'success' if not failed else ('error' if failed == len(statuses) else 'partial')
+            job.message = f'{len(statuses) - failed}/{len(statuses)} sites scraped'
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(ScrapeJob, job_id)
+        job.status = 'error'
+        job.message = f'job failed: {e}'
+        db.session.add(SystemLog(module='scraper', message=f'scrape job {job_id} error: {e}'))
+    job.finished_at = job.updated_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+def _worker_loop(app) -> None:
+    while True:
+        try:
+            with app.app_context():
+                while True:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    run_job(job_id)
+                    db.session.remove()
+        except Exception:
+            # Keep the worker alive; the job row records its own failure
+            pass
+        _WAKE.wait(JOB_POLL)
+        _WAKE.clear()
+
+
+def start_job_worker(app) -> Optional[threading.Thread]:
+    """Start this process's background job worker once (daemon thread)."""
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None or not _WORKER.is_alive():
+            _WORKER = threading.Thread(target=_worker_loop, args=(app,), name='scrape-jobs', daemon=True)
+            _WORKER.start()
+    return _WORKER
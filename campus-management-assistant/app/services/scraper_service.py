@@ -1,22 +1,39 @@
-from typing import List, Tuple, Optional
-from urllib.parse import urljoin
+from typing import List, Tuple, Optional, Dict, Iterable, Callable, ContextManager, Container, Set
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 import os
 import hashlib
+import threading
 import time
 import requests
-from bs4 import BeautifulSoup
+from sqlalchemy import func
 from ..extensions import db
-from ..models.scraper import ScrapedWebsite, ScrapeLog
-from ..models.chatbot_document import ChatbotDocument
+from ..models.scraper import ScrapedWebsite, ScrapeLog, FetchRecord
+from ..models.pdf_extraction import PdfExtraction
 from ..models.logs import SystemLog
-from .pdf_service import extract_pdf_text
+from .pdf_service import ParsedPdf, EXTRACTOR_VERSION, read_pdf, cache_extraction, cached_extraction, cached_pages
+from .chatbot_document_service import replace_document, retire_documents, document_stats
+from . import blob_store, chatbot_index_store, http_client, sitemap
+from .page_parser import parse_page
+from .http_client import RequestStats
+from .crawler import (CrawlPolicy, Frontier, RobotsCache, canonicalize, parse_patterns,
+                      MAX_DEPTH_LIMIT, MAX_PAGES_LIMIT)
+from .sitemap import SitemapEntry, read_sitemaps
 
-SCRAPED_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads', 'scraped'))
-
-
-def _hash_text(text: str) -> str:
-    normalized = " ".join(text.split()).strip().lower()
-    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+# Global cap on concurrent fetches, then per-host connection and pacing limits
+WORKERS = int(os.getenv('SCRAPER_WORKERS', '8'))
+HOST_CONNECTIONS = int(os.getenv('SCRAPER_HOST_CONNECTIONS', '2'))
+HOST_DELAY = float(os.getenv('SCRAPER_HOST_DELAY', '0.5'))
+# PDFs are streamed to disk; anything larger, or not a PDF, is dropped
+PDF_MAX_BYTES = int(float(os.getenv('SCRAPER_PDF_MAX_MB', '50')) * 1024 * 1024)
+PDF_CHUNK = 64 * 1024
+PDF_CONTENT_TYPES = frozenset({
+    'application/pdf', 'application/x-pdf', 'application/acrobat',
+    'application/octet-stream', 'binary/octet-stream', 'application/download', 'application/force-download',
+})
 
 
 def add_website(url: str, name: Optional[str] = None) -> Tuple[bool, str]:
@@ -33,6 +50,51 @@ def add_website(url: str, name: Optional[str] = None) -> Tuple[bool, str]:
         return False, 'Error'
 
 
+def update_crawl_settings(site: ScrapedWebsite, settings: Dict) -> Tuple[bool, str]:
+    """Apply crawl settings from an admin form: enabled, max_depth, max_pages, include, exclude."""
+    try:
+        if 'enabled' in settings:
+            site.crawl_enabled = bool(settings['enabled'])
+        for key, limit in (('max_depth', MAX_DEPTH_LIMIT), ('max_pages', MAX_PAGES_LIMIT)):
+            if key in settings:
+                value = settings[key]
+                if value in (None, ''):
+                    value = None
+                else:
+                    value = int(value)
+                    if not 0 <= value <= limit:
+                        return False, f'{key} must be between 0 and {limit}'
+                setattr(site, f'crawl_{key}', value)
+        for key in ('include', 'exclude'):
+            if key in settings:
+                setattr(site, f'crawl_{key}', '\n'.join(parse_patterns(settings[key] or '')) or None)
+        db.session.commit()
+        return True, 'Saved'
+    except (TypeError, ValueError):
+        db.session.rollback()
+        return False, 'Invalid crawl settings'
+    except Exception as e:
+        db.session.rollback()
+        _log(f'crawl settings error: {e}')
+        return False, 'Error'
+
+
+def index_metrics(days: int = 7) -> Dict[str, object]:
+    """Chatbot document and index size, with documents added and replaced per day, for the scraper admin page."""
+    stats = document_stats(days)
+    since = datetime.utcnow() - timedelta(days=days)
+    replaced = {str(day): int(n or 0) for day, n in
+                db.session.query(func.date(ScrapeLog.scraped_at), func.sum(ScrapeLog.documents_replaced))
+                .filter(ScrapeLog.scraped_at >= since)
+                .group_by(func.date(ScrapeLog.scraped_at)).all()}
+    added = stats.pop('added_per_day')
+    stats['growth'] = [{'day': day, 'added': added.get(day, 0), 'replaced': replaced.get(day, 0)}
+                       for day in sorted(set(added) | set(replaced))]
+    path = chatbot_index_store.INDEX_PATH
+    stats['artifact_bytes'] = os.path.getsize(path) if os.path.exists(path) else 0
+    return stats
+
+
 def list_websites() -> List[ScrapedWebsite]:
     return ScrapedWebsite.query.order_by(ScrapedWebsite.added_at.desc()).all()
 
@@ -48,106 +110,603 @@ def get_website(website_id: int) -> ScrapedWebsite | None:
         return None
 
 
-def _extract_visible_text(html: str) -> str:
-    soup = BeautifulSoup(html, 'html.parser')
-    for tag in soup(['script', 'style', 'noscript']):
-        tag.decompose()
-    text = soup.get_text(separator=' ')
-    normalized = " ".join(text.split()).strip()
-    return normalized
+class HostLimiter:
+    """Per-host politeness: at most `connections` requests in flight to one host,
+    and request starts to the same host spaced at least `delay` seconds apart.
+    """
 
+    def __init__(self, connections: int = HOST_CONNECTIONS, delay: float = HOST_DELAY,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.connections = max(1, connections)
+        self.delay = max(0.0, delay)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
 
-def _find_pdf_links(base_url: str, html: str) -> List[str]:
-    soup = BeautifulSoup(html, 'html.parser')
-    links = []
-    for a in soup.find_all('a', href=True):
-        href = a['href']
-        if href.lower().endswith('.pdf'):
-            links.append(urljoin(base_url, href))
-    return links
+    @contextmanager
+    def slot(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            sem = self._slots.setdefault(host, threading.BoundedSemaphore(self.connections))
+        sem.acquire()
+        try:
+            # Reserve the next start time under the lock, then wait outside it
+            with self._lock:
+                now = self._clock()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.delay
+            if start > now:
+                self._sleep(start - now)
+            yield
+        finally:
+            sem.release()
 
 
-def _save_pdf(url: str, website_id: int) -> str:
-    os.makedirs(SCRAPED_DIR, exist_ok=True)
-    fname = f"site{website_id}_{int(time.time())}_{hashlib.sha256(url.encode()).hexdigest()[:8]}.pdf"
-    path = os.path.join(SCRAPED_DIR, fname)
-    r = requests.get(url, timeout=15)
-    r.raise_for_status()
-    with open(path, 'wb') as f:
-        f.write(r.content)
-    return path
+@dataclass(frozen=True)
+class Validators:
+    """What we know about a URL from its last fetch (see FetchRecord)."""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    size: int = 0
 
+    def headers(self) -> Dict[str, str]:
+        h = {}
+        if self.etag:
+            h['If-None-Match'] = self.etag
+        if self.last_modified:
+            h['If-Modified-Since'] = self.last_modified
+        return h
 
-def scrape_website(website: ScrapedWebsite) -> Tuple[bool, str]:
-    status = 'success'
-    text_len = 0
-    pdf_count = 0
+
+@dataclass
+class FetchResult:
+    website_id: int
+    url: str
+    nbytes: int = 0
+    # 304 (not_modified) or a 200 whose body hashes the same as last time (unchanged):
+    # either way nothing downstream is parsed, written or extracted
+    not_modified: bool = False
+    unchanged: bool = False
+    bytes_saved: int = 0
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    error: Optional[str] = None
+    # HTTP status of the last response (set on errors too, e.g. 404)
+    status: Optional[int] = None
+    # Crawl mode: robots.txt disallows the URL, so no request was made
+    robots_blocked: bool = False
+    stats: RequestStats = field(default_factory=RequestStats)
+
+    @property
+    def skipped(self) -> bool:
+        return self.not_modified or self.unchanged
+
+
+@dataclass
+class PageResult(FetchResult):
+    text: str = ''
+    pdf_links: List[str] = field(default_factory=list)
+    title: str = ''
+    links: List[str] = field(default_factory=list)
+    modified_hint: Optional[str] = None
+    # Link hops from the site's URL (always 0 unless the site is crawled)
+    depth: int = 0
+    # <lastmod> of the page's sitemap entry, stored once the fetch succeeds
+    lastmod: Optional[str] = None
+
+
+@dataclass
+class SitemapResult(FetchResult):
+    entries: List[SitemapEntry] = field(default_factory=list)
+
+
+@dataclass
+class PdfResult(FetchResult):
+    text: Optional[str] = None
+    path: Optional[str] = None
+    parsed: Optional[ParsedPdf] = None
+    # The file's text was extracted before (another URL, site or upload); read it from the cache
+    text_cached: bool = False
+    # (page number, text) of the pages `text` was joined from, for page-level passages
+    pages: List[Tuple[int, str]] = field(default_factory=list)
+
+
+# Worker-side steps: network, parsing and files only; never the database session
+
+def _conditional_get(result: FetchResult, known: Validators, slot: Optional[Callable[[str], ContextManager]] = None,
+                     stream: bool = False) -> Optional[requests.Response]:
+    """GET with the known validators; fills `result` and returns the response, or None when skipped.
+
+    With `stream` the body is left unread (and unhashed) for the caller.
+    """
+    r = http_client.get(result.url, headers=known.headers(), slot=slot, stats=result.stats, stream=stream)
+    result.status = r.status_code
+    if r.status_code == 304:
+        r.close()
+        result.not_modified = True
+        result.bytes_saved = known.size
+        result.etag = r.headers.get('ETag') or known.etag
+        result.last_modified = r.headers.get('Last-Modified') or known.last_modified
+        result.content_hash = known.content_hash
+        return None
     try:
-        r = requests.get(website.url, timeout=15)
         r.raise_for_status()
-        html = r.text
-        # Extract text
-        visible = _extract_visible_text(html)
-        if visible:
-            text_len = len(visible)
-            h = _hash_text(visible)
-            if not ChatbotDocument.query.filter_by(content_hash=h).first():
-                db.session.add(ChatbotDocument(
-                    source_type='scrape_text',
-                    source_id=website.id,
-                    content=visible,
-                    content_hash=h,
-                    visibility='public',
-                ))
-                db.session.commit()
-        # PDFs
-        pdf_links = _find_pdf_links(website.url, html)
-        for link in pdf_links:
-            try:
-                path = _save_pdf(link, website.id)
-                text = extract_pdf_text(path)
-                if text:
-                    h = _hash_text(text)
-                    if not ChatbotDocument.query.filter_by(content_hash=h).first():
-                        db.session.add(ChatbotDocument(
-                            source_type='scrape_pdf',
-                            source_id=website.id,
-                            content=text,
-                            content_hash=h,
-                            visibility='public',
-                        ))
-                        db.session.commit()
-                pdf_count += 1
-            except Exception as e:
-                db.session.add(SystemLog(module='scraper', message=f'pdf download/extract error: {e}'))
-                db.session.commit()
-        status = 'success'
+    except requests.HTTPError:
+        r.close()
+        raise
+    result.etag = r.headers.get('ETag')
+    result.last_modified = r.headers.get('Last-Modified')
+    if stream:
+        return r
+    body = r.content
+    result.nbytes = len(body)
+    result.content_hash = hashlib.sha256(body).hexdigest()
+    if known.content_hash and result.content_hash == known.content_hash:
+        result.unchanged = True
+        return None
+    return r
+
+
+def _check_pdf_headers(r: requests.Response) -> None:
+    ctype = (r.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+    if ctype and ctype not in PDF_CONTENT_TYPES:
+        raise ValueError(f'not a PDF (Content-Type {ctype})')
+    length = (r.headers.get('Content-Length') or '').strip()
+    if length.isdigit() and int(length) > PDF_MAX_BYTES:
+        raise ValueError(f'PDF too large ({length} bytes, limit {PDF_MAX_BYTES})')
+
+
+def _stream_pdf(r: requests.Response, result: PdfResult, known: Validators) -> Optional[str]:
+    """Stream a PDF response to a temp file, hashing as it goes; returns its blob path.
+
+    The temp file is only moved to its content address once the whole body has
+    arrived within PDF_MAX_BYTES; None (and no file) when the bytes are unchanged.
+    """
+    started = time.monotonic()
+    digest = hashlib.sha256()
+    head = b''
+    fd, tmp = blob_store.temp_file()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in r.iter_content(PDF_CHUNK):
+                if len(head) < 5:
+                    head += chunk[:5 - len(head)]
+                    if len(head) == 5 and head != b'%PDF-':
+                        raise ValueError('not a PDF (bad signature)')
+                result.nbytes += len(chunk)
+                if result.nbytes > PDF_MAX_BYTES:
+                    raise ValueError(f'PDF too large (over {PDF_MAX_BYTES} bytes)')
+                digest.update(chunk)
+                f.write(chunk)
+        if head != b'%PDF-':
+            raise ValueError('not a PDF (bad signature)')
+        result.content_hash = digest.hexdigest()
+        if known.content_hash and result.content_hash == known.content_hash:
+            result.unchanged = True
+            os.remove(tmp)
+            return None
+        return blob_store.commit_file(tmp, result.content_hash)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    finally:
+        r.close()
+        result.stats.latency += time.monotonic() - started
+
+
+def _fetch_page(website_id: int, url: str, limiter: HostLimiter, known: Validators = Validators(),
+                depth: int = 0, robots: Optional[RobotsCache] = None, lastmod: Optional[str] = None) -> PageResult:
+    result = PageResult(website_id, url, depth=depth, lastmod=lastmod)
+    try:
+        if robots is not None and not robots.allowed(url):
+            result.robots_blocked = True
+            return result
+        r = _conditional_get(result, known, limiter.slot)
+        if r is not None:
+            page = parse_page(url, r.text)
+            result.text = page.text
+            result.pdf_links = page.pdf_links
+            result.title = page.title
+            result.links = page.links
+            result.modified_hint = page.modified_hint
     except Exception as e:
-        status = 'error'
-        db.session.add(SystemLog(module='scraper', message=f'scrape error: {e}'))
+        result.error = str(e)
+    return result
+
+
+def _fetch_pdf(website_id: int, url: str, limiter: HostLimiter, known: Validators = Validators(),
+               extracted: Container[str] = frozenset(), robots: Optional[RobotsCache] = None) -> PdfResult:
+    result = PdfResult(website_id, url)
+    try:
+        if robots is not None and not robots.allowed(url):
+            result.robots_blocked = True
+            return result
+        # The body is read under the same host slot as the request, so slow
+        # downloads still count against the per-host connection limit
+        with limiter.slot(url):
+            r = _conditional_get(result, known, stream=True)
+            if r is not None:
+                try:
+                    _check_pdf_headers(r)
+                except ValueError:
+                    r.close()
+                    raise
+                result.path = _stream_pdf(r, result, known)
+        if result.path:
+            if result.content_hash in extracted:
+                result.text_cached = True
+            else:
+                result.parsed = read_pdf(result.path)
+                result.text = result.parsed.text
+                result.pages = result.parsed.numbered_pages
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def _fetch_sitemaps(website_id: int, url: str, limiter: HostLimiter, robots: RobotsCache) -> SitemapResult:
+    """Entries of the site's sitemaps: those named in robots.txt, else /sitemap.xml."""
+    result = SitemapResult(website_id, url)
+    try:
+        parts = urlsplit(url)
+        urls = robots.sitemaps(url) or [f'{parts.scheme}://{parts.netloc}/sitemap.xml']
+        result.entries, errors = read_sitemaps(url, urls, limiter.slot, result.stats)
+        if errors:
+            result.error = '; '.join(errors)
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+# Writer-side steps: run on the calling thread, which owns the app context and session
+
+def _log(message: str) -> None:
+    try:
+        db.session.add(SystemLog(module='scraper', message=message))
         db.session.commit()
-    finally:
-        try:
-            db.session.add(ScrapeLog(
-                website_id=website.id,
-                status=status,
-                extracted_text_length=text_len,
-                pdf_links_found=pdf_count,
-            ))
-            db.session.commit()
-        except Exception:
-            pass
+    except Exception:
+        db.session.rollback()
+
+
+def _store(source_type: str, website_id: int, url: str, text: str, replace_legacy: bool = False,
+           pages: Optional[List[Tuple[int, str]]] = None) -> int:
+    """Store `text` as the current document for `url`; returns how many older versions were retired.
+
+    On failure the URL's validators are dropped, so the next run fetches and stores it again.
+    """
+    try:
+        return replace_document(source_type, website_id, url, text, 'public', replace_legacy, pages)[1]
+    except Exception as e:
+        db.session.rollback()
+        _log(f'store error: {e}')
+        _forget_validators(url)
+        return 0
+
+
+def _forget_validators(url: str) -> None:
+    try:
+        FetchRecord.query.filter_by(url=url).update(
+            {'etag': None, 'last_modified': None, 'content_hash': None, 'lastmod': None})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def _validators(record: FetchRecord) -> Validators:
+    return Validators(etag=record.etag, last_modified=record.last_modified,
+                      content_hash=record.content_hash, size=record.size or 0)
+
+
+def _known_validators(urls: List[str]) -> Dict[str, Validators]:
+    if not urls:
+        return {}
+    try:
+        records = FetchRecord.query.filter(FetchRecord.url.in_(urls)).all()
+    except Exception:
+        db.session.rollback()
+        return {}
+    return {r.url: _validators(r) for r in records}
+
+
+def _stored_links(url: str) -> List[str]:
+    """Links saved for a crawled page the last time it was parsed."""
+    try:
+        record = FetchRecord.query.filter_by(url=url).first()
+    except Exception:
+        db.session.rollback()
+        return []
+    return record.links.splitlines() if record is not None and record.links else []
+
+
+def _sitemap_records(urls: List[str], website_id: int) -> Dict[str, FetchRecord]:
+    if not urls:
+        return {}
+    try:
+        records = FetchRecord.query.filter(FetchRecord.url.in_(urls), FetchRecord.website_id == website_id).all()
+    except Exception:
+        db.session.rollback()
+        return {}
+    return {r.url: r for r in records}
+
+
+def _forget_fetch(url: str, website_id: int) -> int:
+    """Drop a page or PDF that is gone (404/410): its FetchRecord and its documents.
+
+    Returns the number of documents retired.
+    """
+    try:
+        FetchRecord.query.filter_by(url=url, website_id=website_id).delete()
+        db.session.commit()
+        return retire_documents(url)
+    except Exception:
+        db.session.rollback()
+        return 0
+
+
+def _record_fetch(result: FetchResult, extracted: Set[str], crawled: bool = False) -> None:
+    """Upsert the URL's FetchRecord after a successful (200 or 304) fetch.
+
+    A downloaded PDF is registered as a blob; its text goes to the extraction
+    cache the first time, or is read back from it when the worker skipped extraction.
+    A parsed page of a crawled site keeps its links for later 304 answers.
+    """
+    try:
+        now = datetime.utcnow()
+        path = getattr(result, 'path', None)
+        if path:
+            blob = blob_store.ensure_blob(result.content_hash, result.nbytes, 'application/pdf')
+            if result.text_cached:
+                cached = cached_extraction(blob.sha256)
+                result.text = cached.text if cached else None
+                result.pages = cached_pages(blob.sha256)
+            elif result.parsed is not None:
+                cache_extraction(blob.sha256, result.parsed)
+            extracted.add(blob.sha256)
+        record = FetchRecord.query.filter_by(url=result.url).first()
+        if record is None:
+            record = FetchRecord(url=result.url)
+            db.session.add(record)
+        record.website_id = result.website_id
+        record.etag = result.etag
+        record.last_modified = result.last_modified
+        record.checked_at = now
+        if not result.not_modified:
+            record.content_hash = result.content_hash
+            record.size = result.nbytes
+            record.fetched_at = now
+        if crawled and not result.skipped:
+            record.links = '\n'.join(result.links) or None
+        if getattr(result, 'lastmod', None):
+            record.lastmod = result.lastmod
+        if path:
+            record.file_path = path
+            record.blob_sha256 = result.content_hash
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        _log(f'fetch record error: {e}')
+
+
+@dataclass
+class _SiteState:
+    status: str = 'success'
+    text_len: int = 0
+    pdf_count: int = 0
+    pending: int = 0
+    bytes_fetched: int = 0
+    bytes_saved: int = 0
+    not_modified: int = 0
+    extractions_skipped: int = 0
+    urls: int = 0
+    requests_made: int = 0
+    retries: int = 0
+    latency: float = 0.0
+    latency_max: float = 0.0
+    pages_crawled: int = 0
+    robots_blocked: int = 0
+    pages_skipped: int = 0
+    documents_replaced: int = 0
+    # Crawl mode only; None when the site is a single page
+    frontier: Optional[Frontier] = None
+    # Canonical PDF URLs already queued for this site (pages of a crawl share links)
+    pdfs: Set[str] = field(default_factory=set)
+
+    def add_request(self, stats: RequestStats) -> None:
+        self.urls += 1
+        self.requests_made += stats.attempts
+        self.retries += stats.retries
+        self.latency += stats.latency
+        self.latency_max = max(self.latency_max, stats.latency)
+
+
+def _finish_site(website_id: int, state: _SiteState) -> None:
+    try:
+        db.session.add(ScrapeLog(
+            website_id=website_id,
+            status=state.status,
+            extracted_text_length=state.text_len,
+            pdf_links_found=state.pdf_count,
+            bytes_fetched=state.bytes_fetched,
+            bytes_saved=state.bytes_saved,
+            not_modified=state.not_modified,
+            extractions_skipped=state.extractions_skipped,
+            requests_made=state.requests_made,
+            retries=state.retries,
+            latency_ms_avg=int(1000 * state.latency / state.urls) if state.urls else 0,
+            latency_ms_max=int(1000 * state.latency_max),
+            pages_crawled=state.pages_crawled,
+            robots_blocked=state.robots_blocked,
+            pages_skipped=state.pages_skipped,
+            documents_replaced=state.documents_replaced,
+        ))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+
+def scrape_sites(sites: Iterable[ScrapedWebsite], workers: int = WORKERS,
+                 limiter: Optional[HostLimiter] = None,
+                 progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[int, str]:
+    """Scrape sites concurrently; returns {website_id: 'success' | 'error'}.
+
+    Pages and PDFs are fetched and parsed on a bounded thread pool, with per-host
+    limits from `limiter`. Every database write (documents, SystemLog, one
+    ScrapeLog per site) happens here on the calling thread as results arrive,
+    so SQLite only ever sees a single writer. `progress`, if given, is called on
+    this thread after each result with running totals (sites_done, sites_failed,
+    pdfs_fetched, bytes_fetched).
+
+    Requests are conditional on the validators stored in FetchRecord: a page
+    answered with 304 (or with an identical body) is not parsed and its PDFs
+    are not requested; such a PDF is neither saved nor extracted again.
+    Downloaded PDFs go to the content-addressed blob store, and a PDF whose
+    bytes were extracted before (under any URL) is not extracted again.
+    Each page or PDF URL keeps one chatbot document: changed content replaces
+    the previous version, and URLs that are gone (404/410) lose theirs.
+
+    Sites with crawl mode on also follow same-site links breadth first within
+    their CrawlPolicy, honouring robots.txt for every URL past the site's own;
+    a page answered with 304 is followed through the links stored at its last
+    parse. Crawls start from the site's sitemaps: entries whose <lastmod> is
+    unchanged since they were last fetched are not requested at all. Only a
+    failure of the site's URL itself marks the site as an error.
+    """
+    limiter = limiter or HostLimiter()
+    targets = [(s.id, s.url, CrawlPolicy.from_site(s)) for s in sites]
+    states: Dict[int, _SiteState] = {}
+    totals = {'sites_done': 0, 'sites_failed': 0, 'pdfs_fetched': 0, 'bytes_fetched': 0}
+    if not targets:
+        return {}
+    known = _known_validators([url for _, url, _ in targets])
+    extracted = {sha for (sha,) in db.session.query(PdfExtraction.sha256)
+                 .filter(PdfExtraction.extractor_version == EXTRACTOR_VERSION)}
+    robots = RobotsCache(limiter.slot)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='scraper') as pool:
+        pending = set()
+
+        def submit(fn, website_id: int, *args, **kwargs) -> None:
+            states[website_id].pending += 1
+            pending.add(pool.submit(fn, website_id, *args, **kwargs))
+
+        def follow(website_id: int, links: Iterable[str], depth: int) -> None:
+            queued = states[website_id].frontier.offer_all(links, depth)
+            page_known = _known_validators(queued)
+            for link in queued:
+                submit(_fetch_page, website_id, link, limiter, page_known.get(link, Validators()), depth, robots)
+
+        def schedule_sitemap(website_id: int, entries: List[SitemapEntry]) -> None:
+            # Unchanged entries are claimed without a request; their stored links still get followed
+            state = states[website_id]
+            by_url = {canonicalize(e.url): e for e in entries}
+            records = _sitemap_records(list(by_url), website_id)
+            fresh = []
+            for url, entry in by_url.items():
+                record = records.get(url)
+                if entry.lastmod and record is not None and record.lastmod == entry.lastmod:
+                    if state.frontier.mark_seen(url):
+                        state.pages_skipped += 1
+                        if record.links:
+                            follow(website_id, record.links.splitlines(), 2)
+                elif state.frontier.offer(url, 1):
+                    fresh.append((url, entry.lastmod))
+            page_known = _known_validators([url for url, _ in fresh])
+            for url, lastmod in fresh:
+                submit(_fetch_page, website_id, url, limiter, page_known.get(url, Validators()), 1, robots,
+                       lastmod=lastmod)
+
+        for website_id, url, policy in targets:
+            state = states[website_id] = _SiteState()
+            if policy is None:
+                submit(_fetch_page, website_id, url, limiter, known.get(url, Validators()))
+                continue
+            state.frontier = Frontier(policy)
+            state.frontier.add_seed(url)
+            if sitemap.SITEMAPS_ENABLED and policy.max_depth > 0:
+                # The site's URL is fetched once the sitemap is in, so its links
+                # cannot pre-empt unchanged sitemap entries
+                submit(_fetch_sitemaps, website_id, url, limiter, robots)
+            else:
+                submit(_fetch_page, website_id, url, limiter, known.get(url, Validators()))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                state = states[result.website_id]
+                state.pending -= 1
+                if not result.robots_blocked:
+                    totals['bytes_fetched'] += result.nbytes
+                    state.bytes_fetched += result.nbytes
+                    state.bytes_saved += result.bytes_saved
+                    state.not_modified += result.skipped
+                    state.add_request(result.stats)
+                    if not result.error and not isinstance(result, SitemapResult):
+                        _record_fetch(result, extracted, state.frontier is not None)
+                if result.robots_blocked:
+                    state.robots_blocked += 1
+                elif isinstance(result, SitemapResult):
+                    if result.error:
+                        _log(f'sitemap error: {result.error}')
+                    submit(_fetch_page, result.website_id, result.url, limiter, known.get(result.url, Validators()))
+                    schedule_sitemap(result.website_id, result.entries)
+                elif isinstance(result, PageResult):
+                    if result.error:
+                        if result.depth == 0:
+                            state.status = 'error'
+                            _log(f'scrape error: {result.error}')
+                        else:
+                            _log(f'crawl error: {result.url}: {result.error}')
+                            if result.status in (404, 410):
+                                state.documents_replaced += _forget_fetch(result.url, result.website_id)
+                    else:
+                        state.pages_crawled += state.frontier is not None
+                        if not result.skipped:
+                            if result.text:
+                                state.text_len += len(result.text)
+                                state.documents_replaced += _store('scrape_text', result.website_id, result.url,
+                                                                   result.text, result.depth == 0)
+                            links = [link for link in result.pdf_links if canonicalize(link) not in state.pdfs]
+                            state.pdfs.update(canonicalize(link) for link in links)
+                            pdf_known = _known_validators(links)
+                            for link in links:
+                                submit(_fetch_pdf, result.website_id, link, limiter,
+                                       pdf_known.get(link, Validators()), extracted,
+                                       robots if state.frontier is not None else None)
+                        if state.frontier is not None:
+                            links = _stored_links(result.url) if result.skipped else result.links
+                            follow(result.website_id, links, result.depth + 1)
+                elif result.error:
+                    _log(f'pdf download/extract error: {result.error}')
+                    if result.status in (404, 410):
+                        state.documents_replaced += _forget_fetch(result.url, result.website_id)
+                else:
+                    state.extractions_skipped += result.text_cached
+                    if result.text:
+                        state.documents_replaced += _store('scrape_pdf', result.website_id, result.url, result.text,
+                                                           pages=result.pages)
+                    state.pdf_count += 1
+                    totals['pdfs_fetched'] += 1
+                if state.pending == 0:
+                    _finish_site(result.website_id, state)
+                    totals['sites_done'] += 1
+                    totals['sites_failed'] += state.status != 'success'
+                if progress:
+                    progress(dict(totals))
+    return {website_id: state.status for website_id, state in states.items()}
+
+
+def scrape_website(website: ScrapedWebsite) -> Tuple[bool, str]:
+    status = scrape_sites([website]).get(website.id, 'error')
     return (status == 'success'), status
 
 
 def scrape_all() -> Tuple[int, int]:
-    ok = 0
-    total = 0
-    for site in list_websites():
-        total += 1
-        if getattr(site, 'enabled', True):
-            s, _ = scrape_website(site)
-        else:
-            s = False
-        ok += 1 if s else 0
-    return ok, total
+    sites = list_websites()
+    enabled = [s for s in sites if getattr(s, 'enabled', True)]
+    statuses = scrape_sites(enabled)
+    ok = sum(1 for status in statuses.values() if status == 'success')
+    return ok, len(sites)
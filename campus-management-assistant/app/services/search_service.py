@@ -0,0 +1,186 @@
+from typing import List, Dict, Optional
+from sqlalchemy import text
+from ..extensions import db
+from ..models.user import User
+from ..models.notice import Notice
+from ..models.faq import FAQ
+from .document_index import ROLE_VISIBILITY, query_terms
+
+# Keep Devanagari/Tamil/Telugu vowel signs (categories Mn/Mc) inside tokens;
+# the default unicode61 tokenizer treats them as separators.
+_TOKENIZER = "unicode61 categories 'L* N* Co Mc Mn'"
+
+# name -> (source table, indexed columns)
+FTS_TABLES = {
+    'chatbot_chunks_fts': ('chatbot_chunks', ['content']),
+    'notices_fts': ('notices', ['title', 'summary', 'content']),
+    'faqs_fts': ('faqs', ['question', 'answer']),
+}
+
+_available: Optional[bool] = None
+
+
+def _is_sqlite() -> bool:
+    return db.engine.dialect.name == 'sqlite'
+
+
+def _ddl(fts: str, source: str, columns: List[str]) -> List[str]:
+    cols = ', '.join(columns)
+    new_vals = ', '.join(f'new.{c}' for c in columns)
+    old_vals = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', "
+        f"content_rowid='id', tokenize=\"{_TOKENIZER}\")",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def _existing_tables() -> set:
+    rows = db.session.execute(text("SELECT name FROM sqlite_master WHERE type='table'")).fetchall()
+    return {r[0] for r in rows}
+
+
+def ensure_fts() -> bool:
+    """Create the FTS5 mirrors and sync triggers if missing; populate new mirrors once."""
+    global _available
+    if not _is_sqlite():
+        _available = False
+        return False
+    try:
+        # Start clean in case an earlier startup migration left the session failed
+        db.session.rollback()
+        existing = _existing_tables()
+        for fts, (source, columns) in FTS_TABLES.items():
+            for stmt in _ddl(fts, source, columns):
+                db.session.execute(text(stmt))
+            if fts not in existing:
+                db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        db.session.commit()
+        _available = True
+    except Exception:
+        # SQLite built without FTS5: callers fall back to LIKE / in-memory search
+        db.session.rollback()
+        _available = False
+    return _available
+
+
+def rebuild_fts() -> Dict[str, int]:
+    """Repopulate every FTS mirror from its source table; returns row counts."""
+    if not ensure_fts():
+        return {}
+    counts = {}
+    for fts, (source, _) in FTS_TABLES.items():
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        counts[fts] = db.session.execute(text(f"SELECT COUNT(*) FROM {source}")).scalar() or 0
+    db.session.commit()
+    return counts
+
+
+def fts_available() -> bool:
+    global _available
+    if _available is None:
+        try:
+            _available = _is_sqlite() and set(FTS_TABLES).issubset(_existing_tables())
+        except Exception:
+            _available = False
+    return _available
+
+
+def match_expression(query: str, match_all: bool = False) -> Optional[str]:
+    """Build a safe FTS5 MATCH expression: quoted prefix terms joined by AND/OR."""
+    terms = query_terms(query or '')
+    if not terms:
+        return None
+    joiner = ' AND ' if match_all else ' OR '
+    return joiner.join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def search_faqs(q: str, category: Optional[str] = None, limit: int = 100) -> List[FAQ]:
+    """Answered FAQs matching every query term, best bm25() rank first."""
+    expr = match_expression(q, match_all=True)
+    if not expr:
+        return []
+    sql = ("SELECT f.id FROM faqs_fts JOIN faqs f ON f.id = faqs_fts.rowid "
+           "WHERE faqs_fts MATCH :expr AND f.status = 'answered'")
+    params = {'expr': expr, 'limit': limit}
+    if category:
+        sql += " AND f.category = :category"
+        params['category'] = category
+    sql += " ORDER BY bm25(faqs_fts) LIMIT :limit"
+    ids = [r[0] for r in db.session.execute(text(sql), params).fetchall()]
+    by_id = {f.id: f for f in FAQ.query.filter(FAQ.id.in_(ids)).all()} if ids else {}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def search_notices(q: str, user: Optional[User], limit: int = 50) -> List[Notice]:
+    """Published notices visible to `user` (None = guest), best bm25() rank first.
+
+    Title matches weigh more than summary, and summary more than body text.
+    """
+    expr = match_expression(q, match_all=True)
+    if not expr:
+        return []
+    sql = ("SELECT n.id FROM notices_fts JOIN notices n ON n.id = notices_fts.rowid "
+           "WHERE notices_fts MATCH :expr AND n.status = 'published'")
+    params = {'expr': expr, 'limit': limit}
+    role = getattr(user, 'role', 'guest') if user else 'guest'
+    if role == 'student':
+        sql += (" AND (n.visibility IN ('public', 'student') OR (n.visibility = 'restricted' "
+                "AND n.target_department = :dept AND n.target_year = :year))")
+        params['dept'] = user.department
+        params['year'] = user.year
+    elif role not in ('moderator', 'admin'):
+        sql += " AND n.visibility = 'public'"
+    sql += " ORDER BY bm25(notices_fts, 10.0, 4.0, 1.0) LIMIT :limit"
+    ids = [r[0] for r in db.session.execute(text(sql), params).fetchall()]
+    by_id = {n.id: n for n in Notice.query.filter(Notice.id.in_(ids)).all()} if ids else {}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def search_chatbot_documents(q: str, role: str, limit: int = 3) -> List[Dict[str, object]]:
+    """Chatbot documents visible to `role`, ranked by bm25() of their best passage, with highlighted snippets.
+
+    Result entries have the same shape as chatbot_document_service.search_documents,
+    plus a `highlight` with matches wrapped in <mark>.
+    """
+    expr = match_expression(q)
+    if not expr:
+        return []
+    visibilities = sorted(ROLE_VISIBILITY.get(role, ROLE_VISIBILITY['guest']))
+    placeholders = ', '.join(f':v{i}' for i in range(len(visibilities)))
+    # Several passages of one document may match; fetch extra and keep the best per document
+    sql = ("SELECT d.id, c.id, c.page_no, d.source_type, d.source_id, bm25(chatbot_chunks_fts) AS rank, "
+           "snippet(chatbot_chunks_fts, 0, '<mark>', '</mark>', '…', 24) AS snip "
+           "FROM chatbot_chunks_fts JOIN chatbot_chunks c ON c.id = chatbot_chunks_fts.rowid "
+           "JOIN chatbot_documents d ON d.id = c.document_id "
+           f"WHERE chatbot_chunks_fts MATCH :expr AND d.visibility IN ({placeholders}) "
+           "ORDER BY rank LIMIT :limit")
+    params = {'expr': expr, 'limit': limit * 4}
+    params.update({f'v{i}': v for i, v in enumerate(visibilities)})
+    results = []
+    seen = set()
+    rows = db.session.execute(text(sql), params).fetchall()
+    for doc_id, chunk_id, page_no, source_type, source_id, rank, snip in rows:
+        if doc_id in seen:
+            continue
+        seen.add(doc_id)
+        results.append({
+            'document_id': doc_id,
+            'chunk_id': chunk_id,
+            'page_no': page_no,
+            'source_type': source_type,
+            'source_id': source_id,
+            # bm25() is negative with lower = better; flip it for callers
+            'score': round(-rank, 3),
+            'snippet': " ".join((snip or '').replace('<mark>', '').replace('</mark>', '').split()),
+            'highlight': snip or '',
+        })
+        if len(results) == limit:
+            break
+    return results
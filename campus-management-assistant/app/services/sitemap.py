@@ -0,0 +1,130 @@
+from typing import Callable, ContextManager, List, Optional, Tuple
+from dataclasses import dataclass
+from contextlib import nullcontext
+from urllib.parse import urljoin, urlsplit
+import io
+import os
+import zlib
+import xml.etree.ElementTree as ET
+import requests
+from . import http_client
+from .http_client import RequestStats
+
+# sitemap.xml / sitemap index support for crawled sites: each <url> entry with its
+# <lastmod> lets a re-crawl skip pages that have not changed since the last run.
+SITEMAPS_ENABLED = os.getenv('SCRAPER_SITEMAPS', '1') == '1'
+MAX_FILES = int(os.getenv('SCRAPER_SITEMAP_MAX_FILES', '20'))
+# Per sitemap file, after gunzip (the sitemaps.org limit is 50 MB / 50,000 URLs)
+MAX_BYTES = int(float(os.getenv('SCRAPER_SITEMAP_MAX_MB', '10')) * 1024 * 1024)
+MAX_URLS = 50000
+CHUNK = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    url: str
+    lastmod: Optional[str] = None
+
+
+def _site(url: str) -> str:
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _local(tag) -> str:
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _gunzip(body: bytes) -> bytes:
+    out = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, MAX_BYTES + 1)
+    if len(out) > MAX_BYTES:
+        raise ValueError(f'sitemap too large (over {MAX_BYTES} bytes unzipped)')
+    return out
+
+
+def parse_sitemap(base_url: str, body: bytes) -> Tuple[List[SitemapEntry], List[str]]:
+    """(page entries of a <urlset>, child sitemap URLs of a <sitemapindex>).
+
+    Gzipped bodies are unpacked; a body that is not XML is read as a plain-text
+    sitemap (one URL per line). Raises ValueError on malformed XML.
+    """
+    if body[:2] == b'\x1f\x8b':
+        body = _gunzip(body)
+    if not body.lstrip().startswith(b'<'):
+        lines = body.decode('utf-8', errors='replace').splitlines()
+        urls = [line.strip() for line in lines if line.strip().startswith(('http://', 'https://'))]
+        return [SitemapEntry(u) for u in urls[:MAX_URLS]], []
+    entries: List[SitemapEntry] = []
+    children: List[str] = []
+    try:
+        for _, el in ET.iterparse(io.BytesIO(body)):
+            kind = _local(el.tag)
+            if kind not in ('url', 'sitemap'):
+                continue
+            loc = lastmod = None
+            for child in el:
+                name = _local(child.tag)
+                if name == 'loc':
+                    loc = (child.text or '').strip()
+                elif name == 'lastmod':
+                    lastmod = (child.text or '').strip() or None
+            el.clear()
+            if not loc:
+                continue
+            if kind == 'url' and len(entries) < MAX_URLS:
+                entries.append(SitemapEntry(urljoin(base_url, loc), lastmod))
+            elif kind == 'sitemap':
+                children.append(urljoin(base_url, loc))
+    except ET.ParseError as e:
+        raise ValueError(f'bad sitemap XML: {e}')
+    return entries, children
+
+
+def _download(url: str, slot: Optional[Callable[[str], ContextManager]], stats: RequestStats) -> Optional[bytes]:
+    """Body of one sitemap file, or None when it does not exist (404/410)."""
+    with slot(url) if slot else nullcontext():
+        r = http_client.get(url, stats=stats, stream=True)
+        try:
+            if r.status_code in (404, 410):
+                return None
+            r.raise_for_status()
+            body = bytearray()
+            for chunk in r.iter_content(CHUNK):
+                body += chunk
+                if len(body) > MAX_BYTES:
+                    raise ValueError(f'sitemap too large (over {MAX_BYTES} bytes)')
+            return bytes(body)
+        finally:
+            r.close()
+
+
+def read_sitemaps(site_url: str, sitemap_urls: List[str],
+                  slot: Optional[Callable[[str], ContextManager]] = None,
+                  stats: Optional[RequestStats] = None) -> Tuple[List[SitemapEntry], List[str]]:
+    """Follow sitemaps and sitemap indexes for one site; returns (entries, errors).
+
+    Only files and entries on the site's own host (www. ignored) are used, at
+    most MAX_FILES files are read, and a file that fails does not stop the rest.
+    """
+    stats = stats if stats is not None else RequestStats()
+    site = _site(site_url)
+    queue = [u for u in sitemap_urls if _site(u) == site]
+    seen = set()
+    entries: List[SitemapEntry] = []
+    errors: List[str] = []
+    while queue and len(seen) < MAX_FILES:
+        url = queue.pop(0)
+        if url in seen:
+            continue
+        seen.add(url)
+        try:
+            body = _download(url, slot, stats)
+            if body is None:
+                continue
+            found, children = parse_sitemap(url, body)
+        except (requests.RequestException, ValueError, zlib.error) as e:
+            errors.append(f'{url}: {e}')
+            continue
+        entries.extend(e for e in found if _site(e.url) == site)
+        queue.extend(c for c in children if _site(c) == site and c not in seen)
+    return entries, errors
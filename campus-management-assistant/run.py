@@ -1,7 +1,13 @@
 from app import create_app
+from app.services.scrape_job_service import JOB_WORKER, start_job_worker
 
 app = create_app()
 
+# Queued scrape jobs run in serving processes only (this module is what the dev
+# server and WSGI servers load), never in scripts or tests that call create_app()
+if JOB_WORKER:
+    start_job_worker(app)
+
 if __name__ == "__main__":
     # Built-in Flask dev server; no routes yet
     app.run()
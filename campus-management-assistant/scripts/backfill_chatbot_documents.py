@@ -0,0 +1,29 @@
+"""
+One-time backfill for chatbot documents stored before passage chunking and
+near-duplicate detection: splits each document without passages into
+chatbot_chunks rows, which the BM25 index and the FTS mirror search, and adds
+the MinHash signature and LSH buckets of each unsigned document. Run once
+after upgrading; safe to run multiple times (finished documents are skipped).
+"""
+import os
+import sys
+
+# Ensure project root is on sys.path for direct execution
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app
+from app.services.chatbot_document_service import chunk_documents, sign_documents
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        print(f"Chunked {chunk_documents()} documents")
+        print(f"Signed {sign_documents()} documents")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,245 @@
+"""
+Benchmark: chatbot latency and answer quality on a labelled query corpus.
+
+Replays scripts/chatbot_bench_corpus.json (English, Hindi, Marathi, Hinglish)
+against `answer_for` and the `/chatbot/query` endpoint, optionally with the
+knowledge base padded to 10x/100x with synthetic entries, and reports:
+- p50/p95/p99/mean latency (ms) and sequential throughput (queries/s)
+- hit rate (answerable queries that got an answer), accuracy (answer matches
+  the label, or a fallback where one is expected), false positive rate
+
+Targets:
+- answer_for:     keyword knowledge only, no app or database
+- endpoint_cold:  POST /chatbot/query with the answer cache cleared per request
+- endpoint_warm:  POST /chatbot/query with the cache primed by a first pass
+
+Student-only cases go through the endpoint only when --student LOGIN:PASSWORD
+is given; otherwise the endpoint targets replay the guest cases.
+
+Writes a JSON report (--out). With --baseline, compares against an earlier
+report and exits non-zero if p95 latency or accuracy regressed.
+
+Usage: python scripts/bench_chatbot.py [--scales 1,10,100] [--rounds 5]
+                                       [--targets answer_for,endpoint_cold,endpoint_warm]
+                                       [--out bench_chatbot_report.json]
+                                       [--baseline old.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+# Ensure project root on path
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from app.services import chatbot_static_knowledge as kb
+
+CORPUS_PATH = os.path.join(BASE, 'scripts', 'chatbot_bench_corpus.json')
+TARGETS = ('answer_for', 'endpoint_cold', 'endpoint_warm')
+SYLLABLES = ["ka", "ri", "mo", "tu", "sen", "dar", "vik", "lo", "pra", "nesh", "qua", "zet"]
+# Sub-millisecond timings are noisy; p95 must also grow by this much to count as a regression
+P95_NOISE_MS = 0.1
+
+
+def load_corpus(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['cases']
+
+
+def scaled_snapshot(base: kb.KnowledgeSnapshot, scale: int, seed: int = 42) -> kb.KnowledgeSnapshot:
+    """`base` padded with synthetic public entries to `scale` times its entry count."""
+    rng = random.Random(seed)
+    public = list(base.public)
+    extra = (scale - 1) * (len(base.public) + len(base.private))
+    for i in range(extra):
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(3)]
+        public.append({"keywords": [" ".join(words), f"{words[0]} {i}", words[1] + words[2]],
+                       "answer": f"Synthetic answer {i}"})
+    return kb.compile_snapshot(public, base.private, version=f"{base.version}x{scale}", stamp=base.stamp)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def is_correct(case, ok: bool, answer: str) -> bool:
+    expect = case['expect']
+    if expect is None:
+        return not ok
+    accepted = expect if isinstance(expect, list) else [expect]
+    return ok and any(e in answer for e in accepted)
+
+
+def summarize(target: str, scale: int, entries: int, cases, outcomes, latencies, wall: float):
+    lat = sorted(latencies)
+    answerable = [o for c, o in zip(cases, outcomes) if c['expect'] is not None]
+    unanswerable = [o for c, o in zip(cases, outcomes) if c['expect'] is None]
+    by_lang = {}
+    for c, o in zip(cases, outcomes):
+        good, total = by_lang.get(c['lang'], (0, 0))
+        by_lang[c['lang']] = (good + o['correct'], total + 1)
+    return {
+        'target': target,
+        'scale': scale,
+        'entries': entries,
+        'cases': len(cases),
+        'requests': len(latencies),
+        'p50_ms': round(percentile(lat, 50) * 1000, 4),
+        'p95_ms': round(percentile(lat, 95) * 1000, 4),
+        'p99_ms': round(percentile(lat, 99) * 1000, 4),
+        'mean_ms': round(sum(lat) / len(lat) * 1000, 4) if lat else 0.0,
+        'throughput_qps': round(len(lat) / wall, 1) if wall else 0.0,
+        'hit_rate': round(sum(o['ok'] for o in answerable) / len(answerable), 4) if answerable else None,
+        'accuracy': round(sum(o['correct'] for o in outcomes) / len(outcomes), 4) if outcomes else None,
+        'false_positive_rate': (round(sum(o['ok'] for o in unanswerable) / len(unanswerable), 4)
+                                if unanswerable else None),
+        'accuracy_by_lang': {k: round(g / t, 4) for k, (g, t) in sorted(by_lang.items())},
+        'failures': [
+            {'role': c['role'], 'query': c['query'], 'expect': c['expect'], 'got': o['answer'][:120]}
+            for c, o in zip(cases, outcomes) if not o['correct']
+        ],
+    }
+
+
+def replay(cases, ask, rounds: int, before_each=None):
+    """Run every case `rounds` times; outcomes come from the first round."""
+    outcomes, latencies = [], []
+    started = time.perf_counter()
+    for r in range(rounds):
+        for case in cases:
+            if before_each:
+                before_each()
+            t0 = time.perf_counter()
+            ok, answer = ask(case)
+            latencies.append(time.perf_counter() - t0)
+            if r == 0:
+                outcomes.append({'ok': ok, 'answer': answer, 'correct': is_correct(case, ok, answer)})
+    return outcomes, latencies, time.perf_counter() - started
+
+
+def endpoint_clients(student: str):
+    from app import create_app
+    app = create_app()
+    app.testing = True
+    clients = {'guest': app.test_client()}
+    if student:
+        login_id, _, password = student.partition(':')
+        client = app.test_client()
+        client.post('/login', data={'login_id': login_id, 'password': password})
+        # A rejected login redirects too; only a student session can open the dashboard
+        r = client.get('/student/dashboard')
+        if r.status_code != 200:
+            raise SystemExit(f'student login failed: /student/dashboard returned HTTP {r.status_code}')
+        clients['student'] = client
+    return app, clients
+
+
+def ask_endpoint(clients):
+    def ask(case):
+        r = clients[case['role']].post('/chatbot/query', json={'query': case['query']})
+        body = r.get_json(silent=True) or {}
+        return bool(body.get('ok')), str(body.get('answer', ''))
+    return ask
+
+
+def compare(report, baseline, tolerance: float):
+    """Regressions of `report` against `baseline`: slower p95 or lower accuracy."""
+    previous = {(r['target'], r['scale']): r for r in baseline.get('results', [])}
+    problems = []
+    for r in report['results']:
+        old = previous.get((r['target'], r['scale']))
+        if not old:
+            continue
+        limit = max(old['p95_ms'] * (1 + tolerance), old['p95_ms'] + P95_NOISE_MS)
+        if r['p95_ms'] > limit:
+            problems.append(f"{r['target']} x{r['scale']}: p95 {old['p95_ms']}ms -> {r['p95_ms']}ms")
+        if old.get('accuracy') is not None and r['accuracy'] is not None and r['accuracy'] < old['accuracy']:
+            problems.append(f"{r['target']} x{r['scale']}: accuracy {old['accuracy']} -> {r['accuracy']}")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--corpus', default=CORPUS_PATH)
+    ap.add_argument('--scales', default='1,10,100')
+    ap.add_argument('--rounds', type=int, default=5)
+    ap.add_argument('--targets', default=','.join(TARGETS))
+    ap.add_argument('--student', default='', help='LOGIN:PASSWORD of a student account for endpoint runs')
+    ap.add_argument('--out', default='bench_chatbot_report.json')
+    ap.add_argument('--baseline', default='')
+    ap.add_argument('--tolerance', type=float, default=0.25)
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    targets = [t for t in args.targets.split(',') if t]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        raise SystemExit(f'unknown targets: {", ".join(sorted(unknown))}')
+    app = clients = None
+    if any(t.startswith('endpoint') for t in targets):
+        app, clients = endpoint_clients(args.student)
+    from app.services.chatbot_cache import invalidate_answers
+
+    base = kb.current_snapshot()
+    results = []
+    print(f"{'target':>14} {'scale':>5} {'entries':>7} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} "
+          f"{'qps':>8} {'hit':>6} {'acc':>6} {'fp':>6}")
+    try:
+        for scale in [int(s) for s in args.scales.split(',') if s]:
+            snapshot = scaled_snapshot(base, scale) if scale > 1 else base
+            kb.install_snapshot(snapshot)
+            entries = len(snapshot.public) + len(snapshot.private)
+            for target in targets:
+                if target == 'answer_for':
+                    cases = corpus
+                    outcomes, latencies, wall = replay(cases, lambda c: kb.answer_for(c['query'], c['role']),
+                                                       args.rounds)
+                else:
+                    cases = [c for c in corpus if c['role'] in clients]
+                    with app.app_context():
+                        invalidate_answers()
+                        if target == 'endpoint_warm':
+                            replay(cases, ask_endpoint(clients), 1)
+                        outcomes, latencies, wall = replay(
+                            cases, ask_endpoint(clients), args.rounds,
+                            before_each=invalidate_answers if target == 'endpoint_cold' else None)
+                row = summarize(target, scale, entries, cases, outcomes, latencies, wall)
+                results.append(row)
+                print(f"{target:>14} {scale:>5} {entries:>7} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} "
+                      f"{row['p99_ms']:>8.3f} {row['throughput_qps']:>8.0f} {row['hit_rate']:>6.0%} "
+                      f"{row['accuracy']:>6.0%} {row['false_positive_rate']:>6.0%}")
+    finally:
+        kb.install_snapshot(base)
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'knowledge_version': base.version,
+        'corpus': os.path.relpath(args.corpus, BASE),
+        'rounds': args.rounds,
+        'results': results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"report written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: typo-tolerant (trigram) matching on the chatbot miss path.
+
+Builds a typo corpus by applying one random edit (drop, swap, substitute) to
+one word of every keyword, then compares exact-only matching with the fuzzy
+fallback: answer rate on the typo corpus, and per-query latency of queries
+that miss exactly. Optionally pads the knowledge base with synthetic entries
+to show lookup cost at thousands of keywords.
+
+Usage: python scripts/bench_chatbot_fuzzy.py [--pad 0,3000] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Ensure project root on path
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from app.services import chatbot_static_knowledge as kb
+from app.services.chatbot_matcher import KeywordMatcher, normalize_text
+
+MISS_QUERIES = ["what is the canteen menu today", "Hello", "cricket ground booking", "wifi password kya hai"]
+
+
+def typo(word: str, rng: random.Random) -> str:
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    op = rng.choice(['drop', 'swap', 'sub'])
+    if op == 'drop':
+        return word[:i] + word[i + 1:]
+    if op == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice('aeiourstn') + word[i + 1:]
+
+
+def typo_corpus(seed: int = 3):
+    rng = random.Random(seed)
+    corpus = []
+    for item in kb.PUBLIC_KNOWLEDGE + kb.PRIVATE_KNOWLEDGE:
+        for kw in item['keywords']:
+            words = normalize_text(kw).split()
+            long_words = [i for i, w in enumerate(words) if len(w) >= 5]
+            if not long_words:
+                continue
+            i = rng.choice(long_words)
+            words[i] = typo(words[i], rng)
+            corpus.append((' '.join(words), str(item['answer'])))
+    return corpus
+
+
+def padded_entries(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    entries = list(kb.PUBLIC_KNOWLEDGE) + list(kb.PRIVATE_KNOWLEDGE)
+    for i in range(n):
+        words = [''.join(rng.choice(letters) for _ in range(rng.randint(5, 9))) for _ in range(2)]
+        entries.append({"keywords": [' '.join(words)], "answer": f"Synthetic {i}"})
+    return entries
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--pad', default='0,3000')
+    ap.add_argument('--rounds', type=int, default=20)
+    args = ap.parse_args()
+    corpus = typo_corpus()
+
+    print(f"typo corpus: {len(corpus)} queries")
+    print(f"{'keywords':>9} {'mode':>6} {'answered':>9} {'correct':>8} {'miss_path_us':>13}")
+    for pad in [int(p) for p in args.pad.split(',') if p]:
+        entries = padded_entries(pad)
+        matcher = KeywordMatcher(entries)
+        n_keywords = sum(len(e['keywords']) for e in entries)
+        for fuzzy in (False, True):
+            answered = correct = 0
+            for q, expected in corpus:
+                top = matcher.rank(q, limit=1, fuzzy=fuzzy)
+                if top:
+                    answered += 1
+                    correct += top[0].answer == expected
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                for q in MISS_QUERIES:
+                    matcher.rank(q, limit=1, fuzzy=fuzzy)
+            per_query = (time.perf_counter() - start) / (args.rounds * len(MISS_QUERIES))
+            mode = 'fuzzy' if fuzzy else 'exact'
+            print(f"{n_keywords:>9} {mode:>6} {answered / len(corpus):>8.0%} {correct / len(corpus):>7.0%} "
+                  f"{per_query * 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: legacy per-entry keyword scan vs compiled KeywordMatcher.
+
+Grows the knowledge base with synthetic entries and reports the mean
+per-query cost of both paths. The compiled matcher should stay roughly flat
+as the entry count grows; the legacy scan grows linearly.
+
+Usage: python scripts/bench_chatbot_matcher.py [--sizes 50,500,5000] [--rounds 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Ensure project root on path
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from app.services import chatbot_static_knowledge as kb
+from app.services.chatbot_matcher import KeywordMatcher
+from tests.matcher_reference import legacy_matches
+
+QUERIES = [
+    "Library timings", "परीक्षा फॉर्म कब भरना है?", "Hostel rules", "Admission process",
+    "Exam form last date", "CDC placement process", "Fees kab jama karni hai?",
+    "what is the canteen menu today", "Hello",
+]
+
+SYLLABLES = ["ka", "ri", "mo", "tu", "sen", "dar", "vik", "lo", "pra", "nesh", "qua", "zet"]
+
+
+def synthetic_knowledge(n: int, seed: int = 42):
+    """Return the real public+private entries padded with `n` synthetic entries."""
+    rng = random.Random(seed)
+    entries = list(kb.PUBLIC_KNOWLEDGE) + list(kb.PRIVATE_KNOWLEDGE)
+    for i in range(n):
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(3)) for _ in range(3)]
+        entries.append({
+            "keywords": [" ".join(words), f"{words[0]} {i}", words[1] + words[2]],
+            "answer": f"Synthetic answer {i}",
+        })
+    return entries
+
+
+def legacy_answer(entries, query):
+    for item in entries:
+        kws = item.get("keywords", [])
+        if isinstance(kws, list) and legacy_matches(query, kws):
+            return str(item.get("answer", ""))
+    return None
+
+
+def time_per_query(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in QUERIES:
+            fn(q)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='50,500,5000')
+    ap.add_argument('--rounds', type=int, default=200)
+    args = ap.parse_args()
+
+    print(f"{'entries':>8} {'build_ms':>10} {'legacy_us':>12} {'compiled_us':>12} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(',') if s]:
+        entries = synthetic_knowledge(size)
+        t0 = time.perf_counter()
+        matcher = KeywordMatcher(entries)
+        build_ms = (time.perf_counter() - t0) * 1000
+        for q in QUERIES:
+            # Both paths must agree on whether anything matches (ranking may pick a better entry)
+            assert (matcher.answer(q) is None) == (legacy_answer(entries, q) is None), q
+        # Keep the legacy path affordable at large sizes
+        legacy_rounds = max(1, args.rounds * 50 // max(size, 50))
+        legacy = time_per_query(lambda q: legacy_answer(entries, q), legacy_rounds)
+        compiled = time_per_query(matcher.answer, args.rounds)
+        print(f"{len(entries):>8} {build_ms:>10.1f} {legacy * 1e6:>12.1f} {compiled * 1e6:>12.1f} {legacy / compiled:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
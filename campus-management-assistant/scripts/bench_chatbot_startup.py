@@ -0,0 +1,79 @@
+"""
+Benchmark: worker startup cost of the chatbot document index.
+
+Compares rebuilding the BM25 index by tokenizing every document with loading
+the serialized artifact, for synthetic corpora of growing size. Also reports
+the artifact size and the peak traced memory of each path.
+
+Usage: python scripts/bench_chatbot_startup.py [--sizes 1000,10000,50000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Ensure project root on path
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from app.services.document_index import DocumentIndex
+from app.services.chatbot_index_store import save_index, load_index
+
+WORDS = (
+    "exam form fees hostel library notice circular semester result admission scholarship "
+    "placement internship timetable lab viva project attendance department syllabus "
+    "परीक्षा शुल्क छात्रावास पुस्तकालय सूचना परिणाम प्रवेश वेळापत्रक"
+).split()
+
+
+def synthetic_documents(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    for i in range(1, n + 1):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(40, 160))]
+        words += [f"ref{rng.randrange(n * 2)}" for _ in range(3)]
+        yield i, ' '.join(words), 'public' if i % 3 else 'student'
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def build(docs):
+    index = DocumentIndex()
+    for doc_id, text, visibility in docs:
+        index.add(doc_id, text, visibility)
+    return index
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='1000,10000,50000')
+    args = ap.parse_args()
+
+    print(f"{'documents':>9} {'rebuild_s':>10} {'load_s':>8} {'speedup':>8} {'artifact_kb':>12} "
+          f"{'rebuild_peak_mb':>16} {'load_peak_mb':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'chatbot_index.pkl')
+        for size in [int(s) for s in args.sizes.split(',') if s]:
+            docs = list(synthetic_documents(size))
+            index, rebuild_s, rebuild_peak = measure(lambda: build(docs))
+            nbytes = save_index(index, (size, size, ''), path)
+            loaded, load_s, load_peak = measure(lambda: load_index(path))
+            assert loaded is not None and len(loaded[0]) == len(index)
+            assert loaded[0].search('exam fees', {'public'}) == index.search('exam fees', {'public'})
+            print(f"{size:>9} {rebuild_s:>10.3f} {load_s:>8.3f} {rebuild_s / load_s:>7.1f}x {nbytes / 1024:>12.0f} "
+                  f"{rebuild_peak / 2**20:>16.1f} {load_peak / 2**20:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
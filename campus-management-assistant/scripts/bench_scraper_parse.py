@@ -0,0 +1,123 @@
+"""
+Benchmark: legacy two-parse page handling vs the single-pass page parser.
+
+The legacy path parsed every scraped page twice with html.parser (once for
+visible text, once for PDF links). parse_page() parses once and runs all
+extractors (links, title, modified date, text) over the same tree, with lxml
+when it is installed. Pages are synthetic college sites (menus, notice tables
+full of PDF links, inline scripts) at several sizes; pass --file to time real
+saved pages instead.
+
+Usage: python scripts/bench_scraper_parse.py [--rows 100,600,2500] [--rounds 5] [--file page.html ...]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from urllib.parse import urljoin
+
+# Ensure project root on path
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from app.services import page_parser
+
+SITE = 'https://www.example-college.ac.in/'
+DEPARTMENTS = ['Computer Science', 'Electronics', 'Mechanical', 'Civil', 'Physics', 'Chemistry',
+               'Mathematics', 'Commerce', 'Hindi', 'English', 'Library', 'Hostel', 'Examination Cell']
+NOTICE_WORDS = ['examination', 'schedule', 'semester', 'admission', 'scholarship', 'revised', 'circular',
+                'fee', 'timetable', 'result', 'workshop', 'holiday', 'परीक्षा', 'सूचना', 'प्रवेश']
+
+
+def legacy_parse(url: str, html: str):
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript']):
+        tag.decompose()
+    text = " ".join(soup.get_text(separator=' ').split()).strip()
+    soup = BeautifulSoup(html, 'html.parser')
+    links = [urljoin(url, a['href']) for a in soup.find_all('a', href=True) if a['href'].lower().endswith('.pdf')]
+    return text, links
+
+
+def college_page(rows: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    menu = ''.join(
+        f'<li><a href="/dept/{i}">{d}</a><ul>' + ''.join(
+            f'<li><a href="/dept/{i}/{j}">{d} page {j}</a></li>' for j in range(6)) + '</ul></li>'
+        for i, d in enumerate(DEPARTMENTS))
+    table = ''.join(
+        f'<tr><td>{n + 1}</td><td>{" ".join(rng.choice(NOTICE_WORDS) for _ in range(8))}</td>'
+        f'<td>{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025</td>'
+        f'<td><a href="/uploads/notices/{n}.pdf" target="_blank">Download</a>'
+        f' <a href="/notice/{n}">View</a></td></tr>'
+        for n in range(rows))
+    script = '<script>var cfg = {' + ','.join(f'k{i}: "{i * 7}"' for i in range(300)) + '};</script>'
+    style = '<style>' + ''.join(f'.c{i}{{margin:{i}px;color:#{i:06x}}}' for i in range(300)) + '</style>'
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Example College - Notices</title>'
+        '<meta name="last-modified" content="2025-03-12">' + style + script + '</head><body>'
+        f'<header><nav><ul class="menu">{menu}</ul></nav></header>'
+        '<marquee>' + ' | '.join(f'<a href="/n/{i}">Latest {i}</a>' for i in range(20)) + '</marquee>'
+        f'<main><h1>Notices &amp; Circulars</h1><table>{table}</table></main>'
+        '<footer><p>Last updated: 12/03/2025</p><a href="https://twitter.com/college">Twitter</a>'
+        '<a href="mailto:office@example-college.ac.in">Mail</a></footer>' + script + '</body></html>'
+    )
+
+
+def timed(fn, rounds: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def available_parsers():
+    names = []
+    for name in page_parser.PREFERRED_PARSERS:
+        try:
+            BeautifulSoup('', name)
+            names.append(name)
+        except FeatureNotFound:
+            pass
+    return names
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Legacy vs single-pass scraper page parsing')
+    ap.add_argument('--rows', default='100,600,2500', help='notice-table rows per synthetic page')
+    ap.add_argument('--rounds', type=int, default=5)
+    ap.add_argument('--file', action='append', default=[], help='saved HTML page(s) to time instead')
+    args = ap.parse_args()
+
+    if args.file:
+        pages = []
+        for path in args.file:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [(f'{int(r)} rows', college_page(int(r))) for r in args.rows.split(',')]
+
+    parsers = available_parsers()
+    print(f"Parsers available: {', '.join(parsers)} (default: {page_parser.PARSER})")
+    header = f"{'page':>12} {'KB':>7} {'legacy ms':>10}" + ''.join(f" {p + ' ms':>16} {'speedup':>8}" for p in parsers)
+    print(header)
+    print('-' * len(header))
+    for label, html in pages:
+        legacy = timed(lambda: legacy_parse(SITE, html), args.rounds)
+        row = f"{label:>12} {len(html.encode()) / 1024:>7.0f} {legacy:>10.1f}"
+        for name in parsers:
+            single = timed(lambda: page_parser.parse_page(SITE, html, parser=name), args.rounds)
+            row += f" {single:>16.1f} {legacy / single:>7.2f}x"
+        print(row)
+    page = page_parser.parse_page(SITE, pages[-1][1])
+    print(f"\nLast page: title={page.title!r}, {len(page.pdf_links)} PDFs, {len(page.links)} same-site links, "
+          f"modified={page.modified_hint!r}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,48 @@
+"""
+Garbage-collect the content-addressed blob store (app/uploads/blobs).
+
+Recounts references from notice attachments and scraped-PDF fetch records,
+then deletes blobs nothing points at (older than the grace period), files
+without a blob row and abandoned temp files.
+
+Usage:
+  python scripts/gc_blobs.py [--dry-run] [--grace SECONDS] [--adopt]
+
+--adopt first moves attachments/scraped PDFs saved before the blob store
+(uploads/notices, uploads/scraped) into it.
+"""
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path for direct execution
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app
+from app.services import blob_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='report what would be deleted')
+    parser.add_argument('--grace', type=float, default=blob_store.GC_GRACE,
+                        help='keep anything touched within this many seconds (default %(default)s)')
+    parser.add_argument('--adopt', action='store_true', help='move pre-blob-store files into the store first')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.adopt and not args.dry_run:
+            print(f"Adopted {blob_store.adopt_legacy_files()} legacy files")
+        stats = blob_store.collect_garbage(grace=args.grace, dry_run=args.dry_run)
+    prefix = 'Would free' if args.dry_run else 'Freed'
+    print(f"Recounted references on {stats['recounted']} blobs")
+    print(f"{prefix} {stats['bytes_freed']} bytes: {stats['blobs_deleted']} unreferenced blobs, "
+          f"{stats['orphan_files']} orphan files, {stats['temp_files']} temp files")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+"""
+One-shot rebuild of the SQLite FTS5 search mirrors (notices, FAQs, chatbot document passages).
+Creates the virtual tables and sync triggers if missing, then repopulates them
+from the source tables. Safe to run multiple times.
+"""
+import os
+import sys
+
+# Ensure project root is on sys.path for direct execution
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import create_app
+from app.services.search_service import rebuild_fts
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        counts = rebuild_fts()
+        if not counts:
+            print("FTS5 is not available for this database; nothing rebuilt.")
+            return 1
+        for table, rows in counts.items():
+            print(f"Rebuilt {table}: {rows} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
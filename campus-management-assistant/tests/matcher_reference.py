@@ -0,0 +1,23 @@
+"""
+Reference keyword matcher: the original per-entry scan the compiled
+KeywordMatcher replaced. Kept out of the app for parity tests and for the
+legacy baseline in scripts/bench_chatbot_matcher.py.
+"""
+from typing import List
+from app.services.chatbot_matcher import normalize_text
+
+
+def legacy_matches(query: str, keywords: List[str]) -> bool:
+    q = normalize_text(query)
+    q_ns = q.replace(' ', '')
+    for kw in keywords:
+        k = normalize_text(kw)
+        k_ns = k.replace(' ', '')
+        # Direct substring or ignoring spaces
+        if k in q or k_ns in q_ns:
+            return True
+        # Token containment: all tokens of keyword appear in query
+        k_tokens = [tok for tok in k.split(' ') if tok]
+        if k_tokens and all(tok in q for tok in k_tokens):
+            return True
+    return False
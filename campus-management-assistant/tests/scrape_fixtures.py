@@ -0,0 +1,114 @@
+"""
+Local HTTP fixtures for scraper tests: a threaded http.server that serves a
+dict of canned responses and records every request it receives, a tiny
+PDF generator (readable by pdfplumber), and a lister for files
+written to a (temporary) blob store.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def minimal_pdf(*pages: str) -> bytes:
+    """A PDF with one page per argument, each showing that text."""
+    kids = ' '.join(f'{4 + 2 * n} 0 R' for n in range(len(pages))).encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for n, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % (5 + 2 * n))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def stored_files(blob_dir: str):
+    """Paths of complete blobs under a blob store root (temp files excluded)."""
+    return sorted(os.path.join(root, name)
+                  for root, _dirs, files in os.walk(blob_dir)
+                  if os.path.basename(root) != 'tmp'
+                  for name in files)
+
+
+class FixtureServer:
+    """Routes map a path to (status, headers, body) or to a callable(handler) returning one.
+
+    `requests` collects (path, headers dict, start time, end time) for every hit.
+    `delay` holds each response that many seconds (to observe concurrency).
+    """
+
+    def __init__(self, routes, delay: float = 0.0):
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                started = time.monotonic()
+                with fixture._lock:
+                    fixture.in_flight += 1
+                    fixture.max_in_flight = max(fixture.max_in_flight, fixture.in_flight)
+                try:
+                    if fixture.delay:
+                        time.sleep(fixture.delay)
+                    route = fixture.routes.get(self.path.split('?')[0])
+                    if route is None:
+                        status, headers, body = 404, {}, b'not found'
+                    elif callable(route):
+                        status, headers, body = route(self)
+                    else:
+                        status, headers, body = route
+                    if isinstance(body, str):
+                        body = body.encode('utf-8')
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    if self.command != 'HEAD':
+                        self.wfile.write(body)
+                finally:
+                    with fixture._lock:
+                        fixture.in_flight -= 1
+                        fixture.requests.append((self.path, dict(self.headers), started, time.monotonic()))
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def paths(self):
+        return [r[0] for r in self.requests]
+
+
+@contextmanager
+def serve(routes, delay: float = 0.0):
+    server = FixtureServer(routes, delay=delay)
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.httpd.shutdown()
+        server.httpd.server_close()
@@ -0,0 +1,216 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import io
+import tempfile
+import time
+import uuid
+from werkzeug.datastructures import FileStorage
+from app import create_app
+from app.extensions import db
+from app.models.blob import Blob
+from app.models.pdf_extraction import PdfExtraction
+from app.models.user import User
+from app.models.scraper import ScrapedWebsite, ScrapeLog
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store, pdf_service, scraper_service
+from app.services.notice_service import attach_file, create_notice, delete_notice_owned, publish_notice
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve, minimal_pdf, stored_files
+
+"""
+Content-addressed blob store tests (temporary blob directory, no internet):
+- Identical notice uploads share one sharded blob; the text is extracted once
+- Reference counts follow notice deletes; garbage collection reclaims unreferenced blobs,
+  orphan files and stale temp files
+- A PDF scraped from a second URL reuses the blob's extracted text
+- Extractions are cached by content hash and extractor version, also for files outside the store
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def counting(fn, calls):
+    def wrapper(path):
+        calls.append(path)
+        return fn(path)
+    return wrapper
+
+
+def upload(notice, data, name='circular.pdf'):
+    ok, nf, msg = attach_file(notice, FileStorage(stream=io.BytesIO(data), filename=name, content_type='application/pdf'))
+    assert ok, msg
+    return nf
+
+
+def test_notice_uploads_share_blobs():
+    app = setup_app()
+    token = 'bl' + uuid.uuid4().hex[:10]
+    data = minimal_pdf(f'Shared circular {token}', f'Annexure {token}')
+    saved_dir, saved_read = blob_store.BLOB_DIR, pdf_service.read_pdf
+    calls = []
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        blob_store.BLOB_DIR = tmp
+        pdf_service.read_pdf = counting(saved_read, calls)
+        admin = User.query.filter_by(role='admin').first()
+        notices = []
+        try:
+            for n in range(2):
+                ok, notice, _ = create_notice(admin, f'{token} notice {n}', None, 'body', 'General', 'public', None, None)
+                assert ok
+                notices.append(notice)
+            first = upload(notices[0], data, 'first.pdf')
+            second = upload(notices[1], data, 'second.pdf')
+            assert first.blob_sha256 == second.blob_sha256
+            sha = first.blob_sha256
+            path = blob_store.blob_path(sha)
+            assert stored_files(tmp) == [path]
+            assert path == os.path.join(tmp, sha[:2], sha[2:4], sha)
+            assert db.session.get(Blob, sha).ref_count == 2
+
+            for notice in notices:
+                publish_notice(notice, send_email=False)
+            assert len(calls) == 1
+            assert token.lower() in pdf_service.cached_extraction(sha).text
+            # Passages of the attachment are cut per page, from the cached page texts
+            doc = ChatbotDocument.query.filter_by(source_type='notice_pdf', source_id=notices[0].id).one()
+            assert [c.page_no for c in doc.chunks] == [1, 2]
+
+            # Served under its uploaded name
+            r = app.test_client().get(f'/files/notice/{second.id}')
+            assert r.status_code == 200 and r.data == data
+            assert 'second.pdf' in r.headers['Content-Disposition']
+            r.close()
+
+            assert delete_notice_owned(notices.pop(0).id, admin)[0]
+            assert db.session.get(Blob, sha).ref_count == 1 and os.path.exists(path)
+            blob_store.collect_garbage(grace=0)
+            assert db.session.get(Blob, sha) is not None and os.path.exists(path)
+
+            assert delete_notice_owned(notices.pop(0).id, admin)[0]
+            assert db.session.get(Blob, sha).ref_count == 0
+            # A dry run reports drifted counts and candidates without writing anything
+            db.session.get(Blob, sha).ref_count = 3
+            db.session.commit()
+            dry = blob_store.collect_garbage(grace=0, dry_run=True)
+            assert dry['recounted'] >= 1
+            db.session.expire_all()
+            assert db.session.get(Blob, sha).ref_count == 3 and os.path.exists(path)
+            # Within the grace period nothing is collected; afterwards the blob goes
+            blob_store.collect_garbage(grace=3600)
+            assert db.session.get(Blob, sha) is not None
+            stats = blob_store.collect_garbage(grace=0)
+            assert stats['blobs_deleted'] >= 1 and stats['bytes_freed'] >= len(data)
+            assert db.session.get(Blob, sha) is None and not os.path.exists(path)
+        finally:
+            blob_store.BLOB_DIR, pdf_service.read_pdf = saved_dir, saved_read
+            for notice in notices:
+                delete_notice_owned(notice.id, admin)
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token.lower())).all():
+                db.session.delete(d)
+            db.session.commit()
+
+
+def test_gc_removes_orphans_and_stale_temp_files():
+    app = setup_app()
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        blob_store.BLOB_DIR = tmp
+        try:
+            orphan_sha = uuid.uuid4().hex * 2
+            orphan = blob_store.blob_path(orphan_sha)
+            os.makedirs(os.path.dirname(orphan))
+            with open(orphan, 'wb') as f:
+                f.write(b'left behind')
+            fd, stale = blob_store.temp_file()
+            os.close(fd)
+            fd, fresh = blob_store.temp_file()
+            os.close(fd)
+            old = time.time() - 7200
+            os.utime(orphan, (old, old))
+            os.utime(stale, (old, old))
+
+            dry = blob_store.collect_garbage(grace=3600, dry_run=True)
+            assert (dry['orphan_files'], dry['temp_files']) == (1, 1) and os.path.exists(orphan)
+            blob_store.collect_garbage(grace=3600)
+            assert not os.path.exists(orphan) and not os.path.exists(stale) and os.path.exists(fresh)
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+
+
+def test_scraped_pdf_text_is_reused_across_urls():
+    app = setup_app()
+    token = 'bs' + uuid.uuid4().hex[:10]
+    pdf = minimal_pdf(f'Mirrored {token}')
+    routes = {
+        '/a': (200, {'Content-Type': 'text/html'}, '<p>A</p><a href="/one.pdf">pdf</a>'),
+        '/b': (200, {'Content-Type': 'text/html'}, '<p>B</p><a href="/two.pdf">pdf</a>'),
+        '/one.pdf': (200, {'Content-Type': 'application/pdf'}, pdf),
+        '/two.pdf': (200, {'Content-Type': 'application/pdf'}, pdf),
+    }
+    saved_dir, saved_read = blob_store.BLOB_DIR, scraper_service.read_pdf
+    calls = []
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        scraper_service.read_pdf = counting(saved_read, calls)
+        sites = [ScrapedWebsite(url=f'{server.base_url}/{p}', name=f'{token}-{p}') for p in 'ab']
+        db.session.add_all(sites)
+        db.session.commit()
+        try:
+            scrape_sites(sites[:1], limiter=HostLimiter(delay=0))
+            scrape_sites(sites[1:], limiter=HostLimiter(delay=0))
+            assert len(calls) == 1 and len(stored_files(tmp)) == 1
+            log = ScrapeLog.query.filter_by(website_id=sites[1].id).one()
+            assert log.extractions_skipped == 1 and log.pdf_links_found == 1
+            sha = next(r.blob_sha256 for r in sites[1].fetch_records if r.blob_sha256)
+            assert db.session.get(Blob, sha).ref_count == 2
+        finally:
+            blob_store.BLOB_DIR, scraper_service.read_pdf = saved_dir, saved_read
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token.lower())).all():
+                db.session.delete(d)
+            for s in sites:
+                db.session.delete(s)
+            db.session.commit()
+
+
+def test_extraction_cache_by_content():
+    app = setup_app()
+    token = 'bx' + uuid.uuid4().hex[:10]
+    saved_read, saved_version = pdf_service.read_pdf, pdf_service.EXTRACTOR_VERSION
+    calls = []
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        pdf_service.read_pdf = counting(saved_read, calls)
+        paths = [os.path.join(tmp, name) for name in ('a.pdf', 'b.pdf')]
+        for path in paths:
+            with open(path, 'wb') as f:
+                f.write(minimal_pdf(f'Fee circular {token}'))
+        try:
+            assert pdf_service.extract_pdf_text(paths[0]) == f'fee circular {token}'
+            assert pdf_service.extract_pdf_text(paths[1]) == f'fee circular {token}'
+            assert len(calls) == 1
+            row = pdf_service.cached_extraction(pdf_service.file_sha256(paths[1]))
+            assert row.page_count == 1 and row.extract_seconds >= 0 and row.error is None
+
+            # A new extractor version parses again
+            pdf_service.EXTRACTOR_VERSION = saved_version + '-test'
+            assert pdf_service.extract_pdf_text(paths[0]) == f'fee circular {token}'
+            assert len(calls) == 2
+        finally:
+            pdf_service.read_pdf, pdf_service.EXTRACTOR_VERSION = saved_read, saved_version
+            sha = pdf_service.file_sha256(paths[0])
+            PdfExtraction.query.filter_by(sha256=sha).delete()
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_notice_uploads_share_blobs()
+    test_gc_removes_orphans_and_stale_temp_files()
+    test_scraped_pdf_text_is_reused_across_urls()
+    test_extraction_cache_by_content()
+    print('BLOB_STORE_TESTS_OK')
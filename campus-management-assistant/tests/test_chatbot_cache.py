@@ -0,0 +1,140 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import time
+import uuid
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models.chatbot_document import ChatbotDocument
+from app.services.chatbot_cache import AnswerCache, ANSWER_CACHE
+from app.services import chatbot_service, chatbot_document_service
+from app.services.chatbot_service import answer_query, answer_batch, chatbot_health
+from app.services.chatbot_document_service import store_document
+
+"""
+Chatbot answer cache tests:
+- LRU eviction and TTL expiry with counters
+- Cache is keyed per role and invalidated when a new document is stored
+- Batches look up each distinct query once and compute only the misses, in one call;
+  cache hits between revision checks touch no database
+- A document stored by another worker process retires cached answers through the shared revision
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_lru_and_ttl():
+    now = [0.0]
+    cache = AnswerCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # evicts 'b', the least recently used
+    assert cache.get('b') is None
+    now[0] = 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert stats['evictions'] == 1 and stats['expirations'] == 1
+    assert AnswerCache(maxsize=0, ttl=10).get('x') is None
+
+
+def test_role_keys_and_invalidation():
+    app = setup_app()
+    with app.app_context():
+        ANSWER_CACHE.clear()
+        # Same normalized query, different role -> different entries
+        guest = answer_query('CDC placement process', 'guest')
+        student = answer_query('cdc  placement process?', 'student')
+        assert student['source'] == 'knowledge' and guest['answer'] != student['answer']
+        before = ANSWER_CACHE.stats()
+        answer_query('CDC Placement Process', 'student')
+        assert ANSWER_CACHE.stats()['hits'] == before['hits'] + 1
+
+        token = 'cc' + uuid.uuid4().hex[:10]
+        assert answer_query(token, 'guest')['ok'] is False
+        doc = store_document('notice', None, f'Circular {token}: seminar at noon.', 'public')
+        try:
+            result = answer_query(token, 'guest')
+            assert result['ok'] is True and result['sources'][0]['document_id'] == doc.id
+            assert chatbot_health()['cache']['invalidations'] >= 1
+        finally:
+            db.session.delete(db.session.get(ChatbotDocument, doc.id))
+            db.session.commit()
+
+
+def test_revision_invalidates_other_workers():
+    app = setup_app()
+    with app.app_context():
+        token = 'cr' + uuid.uuid4().hex[:10]
+        assert answer_query(token, 'guest')['ok'] is False
+        hits = ANSWER_CACHE.stats()['hits']
+        assert answer_query(token, 'guest')['ok'] is False  # the fallback is cached
+        assert ANSWER_CACHE.stats()['hits'] == hits + 1
+        # Another worker's write: nothing clears this process's cache directly
+        local_clear = chatbot_document_service.invalidate_answers
+        chatbot_document_service.invalidate_answers = lambda: None
+        try:
+            before = chatbot_document_service.document_revision()
+            body = ' '.join(f'Session {n} of the workshop is in hall B.' for n in range(60))
+            doc = store_document('notice', None, f'Circular {token}: {body}', 'public')
+            # One bump per flush, however many passages it wrote
+            assert len(doc.chunks) > 1 and chatbot_document_service.document_revision() == before + 1
+        finally:
+            chatbot_document_service.invalidate_answers = local_clear
+        try:
+            # Within the check interval this worker still serves its cached answer
+            assert answer_query(token, 'guest')['ok'] is False
+            chatbot_service._revision_next_check = 0.0  # the interval elapses
+            result = answer_query(token, 'guest')
+            assert result['ok'] is True and result['sources'][0]['document_id'] == doc.id
+            cache = AnswerCache(maxsize=4, ttl=10)
+            cache.sync(1)
+            cache.put('q', 'old', generation=0)  # computed before the change: not stored
+            assert cache.get('q') is None
+        finally:
+            db.session.delete(db.session.get(ChatbotDocument, doc.id))
+            db.session.commit()
+
+
+def test_batch_computes_misses_once_together():
+    app = setup_app()
+    with app.app_context():
+        ANSWER_CACHE.clear()
+        answer_query('Hostel rules', 'guest')  # cached
+        calls = []
+        original = chatbot_service._compute_answers
+        chatbot_service._compute_answers = lambda qs, role, snap: (
+            calls.append(list(qs)) or [({'ok': True, 'answer': q, 'sources': []}, True) for q in qs])
+        try:
+            out = answer_batch(['Exam form', 'exam  form?', 'Hostel rules', 'Bus timings'], 'guest')
+        finally:
+            chatbot_service._compute_answers = original
+        assert calls == [['Exam form', 'Bus timings']]
+        assert [r['answer'] for r in out][:2] == ['Exam form', 'Exam form'] and out[3]['answer'] == 'Bus timings'
+
+        # Cache hits between revision checks run no SQL at all
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            chatbot_service._revision_next_check = time.monotonic() + 60
+            answer_batch(['Exam form', 'Hostel rules'], 'guest')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+            ANSWER_CACHE.clear()  # drop the stubbed answers
+        assert statements == []
+
+if __name__ == '__main__':
+    test_lru_and_ttl()
+    test_role_keys_and_invalidation()
+    test_revision_invalidates_other_workers()
+    test_batch_computes_misses_once_together()
+    print('CHATBOT_CACHE_TESTS_OK')
@@ -0,0 +1,80 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.chatbot_document import ChatbotDocument
+from app.services.document_index import DocumentIndex, make_snippet
+from app.services.chatbot_document_service import store_document, search_documents
+
+"""
+Chatbot document retrieval tests:
+- BM25 ranking and visibility filtering on the in-memory index
+- Snippet selection
+- /chatbot/query falls back to published documents and cites them
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_bm25_ranking_and_visibility():
+    idx = DocumentIndex()
+    idx.add(1, 'Scholarship form for first year students is open.', 'public')
+    idx.add(2, 'Scholarship scholarship renewal deadline for hostel students.', 'student')
+    idx.add(3, 'Canteen menu for the week.', 'public')
+    hits = idx.search('scholarship renewal', {'public', 'student'})
+    assert [h.doc_id for h in hits][:2] == [2, 1]
+    hits = idx.search('scholarship renewal', {'public'})
+    assert [h.doc_id for h in hits] == [1]
+    assert idx.search('the is what', {'public'}) == []
+    # Incremental add updates statistics without a rebuild
+    idx.add(4, 'Renewal of library cards.', 'public')
+    assert 4 in [h.doc_id for h in idx.search('renewal', {'public'})]
+
+
+def test_snippet_prefers_matching_sentence():
+    text = 'Welcome to the college. The scholarship portal closes on 10 July. Contact the office.'
+    assert make_snippet(text, 'scholarship portal') == 'The scholarship portal closes on 10 July.'
+
+
+def test_chatbot_query_document_fallback():
+    app = setup_app()
+    with app.app_context():
+        token = 'qz' + uuid.uuid4().hex[:10]
+        pub = store_document('notice', None, f'Public circular {token}. Fee counter opens at 10 AM.', 'public')
+        priv = store_document('notice', None, f'Student circular {token} {token}. Lab viva on Monday.', 'student')
+        try:
+            assert pub is not None and priv is not None
+            # Duplicate content is not stored twice
+            assert store_document('notice', None, pub.content, 'public') is None
+            guest_hits = search_documents(token, 'guest')
+            assert [h['document_id'] for h in guest_hits] == [pub.id]
+            student_hits = search_documents(token, 'student')
+            assert student_hits[0]['document_id'] == priv.id
+
+            client = app.test_client()
+            r = client.post('/chatbot/query', json={'query': f'what about {token}?'})
+            assert r.status_code == 200
+            data = r.get_json()
+            assert data['ok'] is True and token in data['answer']
+            assert data['sources'][0]['document_id'] == pub.id
+            assert data['sources'][0]['source_type'] == 'notice'
+        finally:
+            for d in (pub, priv):
+                if d is not None:
+                    db.session.delete(db.session.get(ChatbotDocument, d.id))
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_bm25_ranking_and_visibility()
+    test_snippet_prefers_matching_sentence()
+    test_chatbot_query_document_fallback()
+    print('CHATBOT_DOCUMENT_TESTS_OK')
@@ -0,0 +1,172 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import contextvars
+import subprocess
+import tempfile
+import threading
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.chatbot_document import ChatbotDocument, ChatbotChunk
+from app.services.chatbot_document_service import (store_document, replace_document, retire_documents,
+                                                   search_documents, reset_index, current_index)
+from app.services.chatbot_index_store import warm_index, load_index, save_index, db_version
+
+"""
+Chatbot index artifact tests:
+- Startup builds the artifact once, then loads it while the database is unchanged
+- Appended documents are synced on top of the artifact; deletions force a rebuild
+- A corrupt artifact is ignored and rewritten
+- Searching with a chunk delete pending in the session does not deadlock on the index lock
+- Deleted passages leave the index on commit only; a rolled-back delete keeps them
+- Passages replaced by another worker process leave this process's index at its next search
+"""
+
+# Another worker process (e.g. the scrape job) replacing the document of a URL
+OTHER_WORKER = """
+import sys
+from app import create_app
+from app.services.chatbot_document_service import replace_document
+with create_app().app_context():
+    replace_document('scrape_text', None, sys.argv[1], sys.argv[2], 'public')
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_artifact_roundtrip_and_staleness():
+    app = setup_app()
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.pkl')
+        token = 'ix' + uuid.uuid4().hex[:10]
+        assert load_index(path) is None
+        assert warm_index(path)['source'] == 'rebuilt'
+        index, version = load_index(path)
+        assert version == db_version() and len(index) == len(current_index())
+
+        reset_index()
+        assert warm_index(path)['source'] == 'artifact'
+
+        doc = store_document('notice', None, f'Circular {token}: library closed on Friday.', 'public')
+        chunk_ids = [c.id for c in doc.chunks]
+        try:
+            reset_index()
+            info = warm_index(path)
+            assert info['source'] == 'artifact+sync'
+            assert [h['document_id'] for h in search_documents(token, 'guest')] == [doc.id]
+            assert load_index(path)[1] == db_version()
+        finally:
+            db.session.delete(db.session.get(ChatbotDocument, doc.id))
+            db.session.commit()
+
+        # A deleted row means the artifact no longer describes the table
+        reset_index()
+        assert warm_index(path)['source'] == 'rebuilt'
+        assert chunk_ids and not any(c in current_index() for c in chunk_ids)
+
+        with open(path, 'wb') as f:
+            f.write(b'not a pickle')
+        reset_index()
+        assert warm_index(path)['source'] == 'rebuilt'
+        assert load_index(path) is not None
+
+
+def test_format_mismatch_is_ignored():
+    app = setup_app()
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.pkl')
+        save_index(current_index(), db_version(), path)
+        from app.services import chatbot_index_store
+        saved = chatbot_index_store.FORMAT_VERSION
+        chatbot_index_store.FORMAT_VERSION = saved + 1
+        try:
+            assert load_index(path) is None
+        finally:
+            chatbot_index_store.FORMAT_VERSION = saved
+
+
+def test_search_with_pending_delete():
+    app = setup_app()
+    with app.app_context():
+        token = 'ip' + uuid.uuid4().hex[:10]
+        doc = store_document('notice', None, f'Circular {token}: library closed on Friday.', 'public')
+        try:
+            assert search_documents(token, 'guest')
+            db.session.delete(doc)  # not flushed yet
+            results = []
+            ctx = contextvars.copy_context()  # same app context, hence the same session
+            worker = threading.Thread(target=ctx.run, args=(lambda: results.append(search_documents(token, 'guest')),),
+                                      daemon=True)
+            worker.start()
+            worker.join(timeout=10)
+            assert not worker.is_alive(), 'search deadlocked on the index lock'
+            db.session.commit()
+            assert search_documents(token, 'guest') == []
+        finally:
+            db.session.rollback()
+            leftover = db.session.get(ChatbotDocument, doc.id)
+            if leftover is not None:
+                db.session.delete(leftover)
+                db.session.commit()
+
+
+def test_rolled_back_delete_stays_indexed():
+    app = setup_app()
+    with app.app_context():
+        token = 'ir' + uuid.uuid4().hex[:10]
+        doc = store_document('notice', None, f'Circular {token}: canteen closed on Monday.', 'public')
+        chunk_id = doc.chunks[0].id
+        try:
+            assert search_documents(token, 'guest')
+            db.session.delete(doc)
+            db.session.flush()
+            db.session.rollback()
+            assert chunk_id in current_index()
+            assert [h['document_id'] for h in search_documents(token, 'guest')] == [doc.id]
+
+            db.session.delete(db.session.get(ChatbotDocument, doc.id))
+            db.session.commit()
+            assert chunk_id not in current_index()
+        finally:
+            db.session.rollback()
+            leftover = db.session.get(ChatbotDocument, doc.id)
+            if leftover is not None:
+                db.session.delete(leftover)
+                db.session.commit()
+
+
+def test_replacement_in_another_process_leaves_the_index():
+    app = setup_app()
+    with app.app_context():
+        token = 'iw' + uuid.uuid4().hex[:10]
+        url = f'https://example.edu/timetable/{token}'
+        old, _ = replace_document('scrape_text', None, url, f'Timetable {token}: exams start {token}a.', 'public')
+        try:
+            assert [h['document_id'] for h in search_documents(f'{token}a', 'guest')] == [old.id]
+            subprocess.run([sys.executable, '-c', OTHER_WORKER, url, f'Timetable {token}: exams postponed {token}b.'],
+                           cwd=BASE, check=True, timeout=120)
+            db.session.expire_all()
+            new = ChatbotDocument.query.filter_by(source_url=url).one()
+            assert [h['document_id'] for h in search_documents(f'{token}b', 'guest')] == [new.id]
+            # No postings of the replaced passages are left behind
+            assert search_documents(f'{token}a', 'guest') == []
+            assert len(current_index()) == ChatbotChunk.query.count()
+        finally:
+            db.session.rollback()
+            retire_documents(url)
+
+
+if __name__ == '__main__':
+    test_artifact_roundtrip_and_staleness()
+    test_format_mismatch_is_ignored()
+    test_search_with_pending_delete()
+    test_rolled_back_delete_stays_indexed()
+    test_replacement_in_another_process_leaves_the_index()
+    print('CHATBOT_INDEX_STORE_TESTS_OK')
@@ -0,0 +1,85 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import time
+from app.services import chatbot_static_knowledge as kb
+from app.services.chatbot_service import answer_query
+
+"""
+Hot-reloadable knowledge file tests (no app context needed):
+- The shipped JSON file loads and validates
+- Edits are picked up by the periodic check and swap the snapshot atomically
+- Invalid files keep the last good snapshot and report the error
+"""
+
+
+class use_knowledge_file:
+    """Point the knowledge module at a scratch file for the duration of a test."""
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = (kb.KNOWLEDGE_PATH, kb.RELOAD_INTERVAL)
+        kb.KNOWLEDGE_PATH = os.path.join(self.tmp.name, 'knowledge.json')
+        kb.RELOAD_INTERVAL = 0
+        kb._next_check = 0.0
+        return kb.KNOWLEDGE_PATH
+
+    def __exit__(self, *exc):
+        kb.KNOWLEDGE_PATH, kb.RELOAD_INTERVAL = self.saved
+        kb._next_check = 0.0
+        assert kb.reload_knowledge()
+        self.tmp.cleanup()
+
+
+def test_shipped_knowledge_file_loads():
+    version, public, private = kb.load_knowledge_file(kb.KNOWLEDGE_PATH)
+    assert version is not None and len(public) > 10 and len(private) > 5
+    status = kb.knowledge_status()
+    assert status['error'] is None and status['public_entries'] == len(public)
+    assert kb.answer_for('Library timings', 'guest') == (True, 'Library is open 9 AM to 8 PM.')
+
+
+def test_edit_swaps_snapshot_and_clears_cache():
+    with use_knowledge_file():
+        assert kb.save_knowledge([{'keywords': ['canteen'], 'answer': 'Canteen opens at 8.'}], [], version=1)
+        before = kb.current_snapshot()
+        assert answer_query('canteen menu', 'guest')['answer'] == 'Canteen opens at 8.'
+        # Another process edits the file in place; the next check picks it up
+        time.sleep(0.01)
+        with open(kb.KNOWLEDGE_PATH, 'w', encoding='utf-8') as f:
+            f.write('{"version": 2, "public": [{"keywords": ["canteen"], "answer": "Canteen opens at 9."}],'
+                    ' "private": [{"keywords": ["marks"], "answer": "See the portal."}]}')
+        assert answer_query('canteen menu', 'guest')['answer'] == 'Canteen opens at 9.'
+        assert kb.knowledge_status()['version'] == 2
+        assert kb.answer_for('marks', 'guest')[0] is False and kb.answer_for('marks', 'student')[0] is True
+        # A snapshot held by an in-flight request is untouched by the swap
+        assert before.version == 1 and before.matchers['guest'].answer('canteen') == 'Canteen opens at 8.'
+        assert kb.PUBLIC_KNOWLEDGE == [{'keywords': ['canteen'], 'answer': 'Canteen opens at 9.'}]
+
+
+def test_invalid_file_keeps_last_good_snapshot():
+    with use_knowledge_file():
+        assert kb.save_knowledge([{'keywords': ['bus'], 'answer': 'Bus at 7.'}], [])
+        time.sleep(0.01)
+        with open(kb.KNOWLEDGE_PATH, 'w', encoding='utf-8') as f:
+            f.write('{"version": 3, "public": [{"keywords": "bus"')
+        assert kb.answer_for('bus timing', 'guest') == (True, 'Bus at 7.')
+        assert kb.knowledge_status()['error'].startswith('JSONDecodeError')
+        try:
+            kb.save_knowledge([{'keywords': 'bus', 'answer': 'x'}], [])
+            raise AssertionError('expected ValueError')
+        except ValueError:
+            pass
+        assert kb.save_knowledge([{'keywords': ['bus'], 'answer': 'Bus at 8.'}], [])
+        assert kb.answer_for('bus timing', 'guest') == (True, 'Bus at 8.')
+        assert kb.knowledge_status()['error'] is None
+
+
+if __name__ == '__main__':
+    test_shipped_knowledge_file_loads()
+    test_edit_swaps_snapshot_and_clears_cache()
+    test_invalid_file_keeps_last_good_snapshot()
+    print('CHATBOT_KNOWLEDGE_TESTS_OK')
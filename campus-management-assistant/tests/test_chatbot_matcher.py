@@ -0,0 +1,112 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import random
+from app.services import chatbot_static_knowledge as kb
+from app.services.chatbot_matcher import AhoCorasick, KeywordMatcher, bounded_edit_distance
+from tests.matcher_reference import legacy_matches
+
+"""
+Compiled keyword matcher tests (no app context needed):
+- Aho-Corasick reports every overlapping pattern
+- Compiled matcher finds the same entries as the legacy per-entry scan
+- Scores rank match types and specific keywords above generic ones
+- Typo-tolerant fallback via the trigram index
+"""
+
+
+def legacy_matching_answers(query, role):
+    groups = list(kb.PUBLIC_KNOWLEDGE)
+    if role == 'student':
+        groups = groups + kb.PRIVATE_KNOWLEDGE
+    return [str(item.get('answer', '')) for item in groups
+            if isinstance(item.get('keywords'), list) and legacy_matches(query, item['keywords'])]
+
+
+def sample_queries():
+    queries = [
+        'Library timings', 'library hours', 'परीक्षा फॉर्म कब भरना है?', 'Hostel rules',
+        'College website', 'Admission process', 'Exam form last date', 'परीक्षा समय सारणी',
+        'CDC placement process', 'Internal marks calculation', 'Third year exam schedule',
+        'तीसरे वर्ष की परीक्षा कब है?', 'Fees kab jama karni hai?', 'Exam registration third year',
+        'परीक्षा वेळापत्रक', 'Hello', '', '   ', 'libraryhours please', 'rules for the hostel',
+        'When is the   exam​ form due?', 'bus।timing', 'what is ATKT',
+    ]
+    for item in kb.PUBLIC_KNOWLEDGE + kb.PRIVATE_KNOWLEDGE:
+        queries.extend(item['keywords'])
+    rng = random.Random(7)
+    words = ' '.join(queries).split()
+    for _ in range(300):
+        queries.append(' '.join(rng.choice(words) for _ in range(rng.randint(1, 5))))
+    return queries
+
+
+def test_aho_corasick_overlaps():
+    ac = AhoCorasick()
+    ids = {p: ac.add(p) for p in ['he', 'she', 'his', 'hers']}
+    ac.build()
+    found = ac.find('ushers')
+    assert found == {ids['he'], ids['she'], ids['hers']}
+    assert ac.find('xyz') == set()
+
+
+def test_matcher_parity_with_legacy_scan():
+    for role in ('guest', 'student'):
+        for q in sample_queries():
+            expected = legacy_matching_answers(q, role)
+            ranked = kb._matcher(role).rank(q, fuzzy=False)
+            assert sorted(m.answer for m in ranked) == sorted(expected), (role, q)
+            if expected:
+                assert kb.answer_for(q, role) == (True, ranked[0].answer)
+                assert [m.score for m in ranked] == sorted((m.score for m in ranked), reverse=True)
+
+
+def test_scores_prefer_specific_entries():
+    # Legacy first-match returned the generic library-timings entry here
+    ok, ans = kb.answer_for('library rules', 'guest')
+    assert ok and ans.startswith('Library rules')
+    top = kb.rank_answers('Library timings', 'guest', limit=2)
+    assert top[0]['confidence'] == 100 and top[0]['match'] == 'phrase'
+    m = KeywordMatcher([{'keywords': ['exam form'], 'answer': 'a'}])
+    phrase, nospace, tokens = (m.rank(q)[0] for q in ('exam form', 'examform', 'form for exam'))
+    assert phrase.score > nospace.score > tokens.score
+    assert (phrase.match_type, nospace.match_type, tokens.match_type) == ('phrase', 'nospace', 'tokens')
+
+
+def test_ties_keep_list_order_and_empty_keyword():
+    m = KeywordMatcher([
+        {'keywords': ['exam form'], 'answer': 'first'},
+        {'keywords': ['exam'], 'answer': 'second'},
+        {'keywords': 'not-a-list', 'answer': 'skipped'},
+    ])
+    assert m.answer('Exam form last date?') == 'first'
+    assert m.answer('exam hall') == 'second'
+    assert m.answer('nothing here') is None
+    m = KeywordMatcher([{'keywords': ['zzz'], 'answer': 'a'}, {'keywords': ['?'], 'answer': 'b'}])
+    assert m.answer('anything') == 'b'
+
+
+def test_fuzzy_matching_after_exact_miss():
+    assert bounded_edit_distance('libary', 'library', 1) == 1
+    assert bounded_edit_distance('hsotel', 'hostel', 1) == 1
+    assert bounded_edit_distance('canteen', 'library', 2) is None
+    ok, ans = kb.answer_for('libary timngs', 'guest')
+    assert ok and ans == 'Library is open 9 AM to 8 PM.'
+    top = kb.rank_answers('libary timngs', 'guest', limit=1)[0]
+    assert top['match'] == 'fuzzy' and top['confidence'] < 100
+    assert kb.answer_for('hsotel rules', 'guest')[0] is True
+    assert kb.answer_for('pariksa samay sarani', 'guest')[0] is True
+    # Short or unrelated words are never corrected
+    assert kb.answer_for('xyzzy plugh', 'guest')[0] is False
+    # Exact hits never go through the fuzzy pass
+    assert kb.rank_answers('library timings', 'guest', limit=1)[0]['match'] == 'phrase'
+
+if __name__ == '__main__':
+    test_aho_corasick_overlaps()
+    test_matcher_parity_with_legacy_scan()
+    test_scores_prefer_specific_entries()
+    test_ties_keep_list_order_and_empty_keyword()
+    test_fuzzy_matching_after_exact_miss()
+    print('CHATBOT_MATCHER_TESTS_OK')
@@ -0,0 +1,134 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.chatbot_document import ChatbotDocument, ChatbotChunk
+from app.services.chatbot_document_service import (chunk_documents, current_index, hash_text,
+                                                   search_documents, store_document)
+from app.services.chunking import chunk_spans, make_chunks, sentence_spans
+from app.services.search_service import fts_available, search_chatbot_documents
+
+"""
+Passage chunking tests:
+- Sentences end at . ! ? and the Hindi danda; passages keep whole sentences, stay within
+  the size limit and overlap their neighbours
+- Stored documents get passages with offsets into the parent; search returns the document
+  with its best passage (in-memory index and FTS), and deleting it drops the passages
+- Documents stored before chunking are chunked by chunk_documents()
+- A PDF's passages are cut page by page and carry their page numbers
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_sentences_and_passages():
+    text = 'परीक्षा 10 जुलाई से शुरू होगी। प्रवेश पत्र कार्यालय से लें॥ Fees are due on 5 May. Pay online!\nOffice hours'
+    assert [text[s:e] for s, e in sentence_spans(text)] == [
+        'परीक्षा 10 जुलाई से शुरू होगी।', 'प्रवेश पत्र कार्यालय से लें॥', 'Fees are due on 5 May.',
+        'Pay online!', 'Office hours']
+
+    body = ' '.join(f'Sentence number {n} of the hostel rules.' for n in range(60))
+    spans = chunk_spans(body, size=200, overlap=60)
+    assert len(spans) > 10
+    assert all(e - s <= 200 for s, e in spans)
+    assert all(body[s:e].startswith('Sentence') and body[s:e].endswith('.') for s, e in spans)
+    assert all(b[0] < a[1] for a, b in zip(spans, spans[1:]))  # neighbours overlap
+    assert spans[0][0] == 0 and spans[-1][1] == len(body)
+
+    # A sentence longer than the limit is cut at spaces
+    long = 'word ' * 100 + 'end.'
+    assert all(e - s <= 50 for s, e in chunk_spans(long, size=50, overlap=10))
+    assert chunk_spans('short note', size=50) == [(0, 10)]
+    assert chunk_spans('   ') == []
+
+
+def test_documents_are_searched_by_passage():
+    app = setup_app()
+    token = 'ch' + uuid.uuid4().hex[:10]
+    filler = ' '.join(f'Clause {n} concerns general campus conduct and discipline.' for n in range(80))
+    content = f'{filler} The {token} hostel mess closes at 9 PM on weekdays. {filler}'
+    with app.app_context():
+        doc = store_document('scrape_text', None, content, 'public')
+        try:
+            chunks = doc.chunks
+            assert len(chunks) > 3
+            assert [c.seq for c in chunks] == list(range(len(chunks)))
+            assert all(c.content == content[c.start_offset:c.end_offset] for c in chunks)
+
+            hits = search_documents(token, 'guest')
+            assert len(hits) == 1 and hits[0]['document_id'] == doc.id
+            assert token in hits[0]['snippet'] and 'mess closes' in hits[0]['snippet']
+            assert token in db.session.get(ChatbotChunk, hits[0]['chunk_id']).content
+            if fts_available():
+                fts = search_chatbot_documents(token, 'guest')
+                assert [h['document_id'] for h in fts] == [doc.id] and '<mark>' in fts[0]['highlight']
+        finally:
+            chunk_ids = [c.id for c in doc.chunks]
+            db.session.delete(doc)
+            db.session.commit()
+        assert ChatbotChunk.query.filter(ChatbotChunk.id.in_(chunk_ids)).count() == 0
+        assert not any(c in current_index() for c in chunk_ids)
+        assert search_documents(token, 'guest') == []
+        if fts_available():
+            assert search_chatbot_documents(token, 'guest') == []
+
+
+def test_existing_documents_are_chunked():
+    app = setup_app()
+    token = 'cu' + uuid.uuid4().hex[:10]
+    content = f'Older notice {token}. Written before passages were stored.'
+    with app.app_context():
+        doc = ChatbotDocument(source_type='notice', content=content, content_hash=hash_text(content),
+                              visibility='public')
+        db.session.add(doc)
+        db.session.commit()
+        try:
+            assert doc.chunks == [] and search_documents(token, 'guest') == []
+            assert chunk_documents() >= 1
+            db.session.refresh(doc)
+            assert [c.content for c in doc.chunks] == [content]
+            assert [h['document_id'] for h in search_documents(token, 'guest')] == [doc.id]
+        finally:
+            db.session.delete(doc)
+            db.session.commit()
+
+
+def test_pdf_passages_keep_their_pages():
+    pages = [(1, 'admit cards are issued at the office.'), (3, 'exams start on 10 july. bring your admit card.')]
+    content = ' '.join(text for _, text in pages)
+    chunks = make_chunks(content, pages)
+    assert [(c.page_no, c.content) for c in chunks] == pages
+    assert all(c.content == content[c.start_offset:c.end_offset] for c in chunks)
+    # Pages that do not add up to the content are ignored
+    assert [c.page_no for c in make_chunks(content, pages[:1])] == [None]
+    assert [c.page_no for c in make_chunks(content)] == [None]
+
+    app = setup_app()
+    token = 'cp' + uuid.uuid4().hex[:10]
+    pages = [(1, f'circular {token} page one.'), (2, f'hall tickets {token}x are at the office.')]
+    with app.app_context():
+        doc = store_document('notice_pdf', None, ' '.join(text for _, text in pages), 'public', pages=pages)
+        try:
+            assert [c.page_no for c in doc.chunks] == [1, 2]
+            assert [h['page_no'] for h in search_documents(f'{token}x', 'guest')] == [2]
+            if fts_available():
+                assert [h['page_no'] for h in search_chatbot_documents(f'{token}x', 'guest')] == [2]
+        finally:
+            db.session.delete(doc)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_sentences_and_passages()
+    test_documents_are_searched_by_passage()
+    test_existing_documents_are_chunked()
+    test_pdf_passages_keep_their_pages()
+    print('CHUNKING_TESTS_OK')
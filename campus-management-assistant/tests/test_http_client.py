@@ -0,0 +1,114 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import socket
+import uuid
+import requests
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog
+from app.models.chatbot_document import ChatbotDocument
+from app.services import http_client
+from app.services.http_client import RequestStats, backoff_delay, session_for
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve
+
+"""
+Scraper HTTP client tests (local HTTP fixture, no internet):
+- One pooled Session per host
+- Transient statuses and connection errors are retried with jittered exponential backoff
+- Attempts and latency are counted, and reach the ScrapeLog
+"""
+
+
+def flaky(failures, body, status=503):
+    calls = {'n': 0}
+
+    def route(handler):
+        calls['n'] += 1
+        if calls['n'] <= failures:
+            return status, {'Retry-After': '0'}, b'busy'
+        return 200, {'Content-Type': 'text/html'}, body
+    return route
+
+
+def test_session_per_host():
+    assert session_for('http://a.example/x') is session_for('http://A.example/y')
+    assert session_for('http://a.example/x') is not session_for('http://b.example/x')
+    assert session_for('http://a.example/x') is not session_for('https://a.example/x')
+
+
+def test_backoff_is_jittered_and_capped():
+    saved = http_client.BACKOFF, http_client.BACKOFF_MAX
+    http_client.BACKOFF, http_client.BACKOFF_MAX = 0.5, 3.0
+    try:
+        assert backoff_delay(0, rng=lambda: 1.0) == 0.5
+        assert backoff_delay(2, rng=lambda: 1.0) == 2.0
+        assert backoff_delay(10, rng=lambda: 1.0) == 3.0
+        assert backoff_delay(2, rng=lambda: 0.25) == 0.5
+    finally:
+        http_client.BACKOFF, http_client.BACKOFF_MAX = saved
+
+
+def test_retries_transient_failures():
+    sleeps = []
+    with serve({'/ok': flaky(2, 'fine'), '/down': flaky(99, 'never'), '/404': (404, {}, b'no')}) as server:
+        stats = RequestStats()
+        r = http_client.get(f'{server.base_url}/ok', stats=stats, retries=3, sleep=sleeps.append)
+        assert r.status_code == 200 and r.text == 'fine'
+        assert (stats.attempts, stats.retries) == (3, 2) and stats.latency > 0
+        assert len(sleeps) == 2
+
+        stats = RequestStats()
+        r = http_client.get(f'{server.base_url}/down', stats=stats, retries=2, sleep=sleeps.append)
+        assert r.status_code == 503 and stats.attempts == 3
+
+        stats = RequestStats()
+        r = http_client.get(f'{server.base_url}/404', stats=stats, sleep=sleeps.append)
+        assert r.status_code == 404 and stats.attempts == 1
+
+    # Nothing listening: connection errors are retried, then raised with stats filled in
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    stats = RequestStats()
+    try:
+        http_client.get(f'http://127.0.0.1:{port}/', stats=stats, retries=1, sleep=lambda _: None)
+        raise AssertionError('expected a connection error')
+    except requests.ConnectionError:
+        pass
+    assert stats.attempts == 2
+
+
+def test_transient_503_does_not_fail_the_site():
+    app = create_app()
+    app.testing = True
+    token = 'hc' + uuid.uuid4().hex[:10]
+    saved = http_client.BACKOFF
+    http_client.BACKOFF = 0.01
+    with app.app_context(), serve({'/page': flaky(1, f'<p>Retried page {token}</p>')}) as server:
+        site = ScrapedWebsite(url=f'{server.base_url}/page', name=token)
+        db.session.add(site)
+        db.session.commit()
+        try:
+            assert scrape_sites([site], limiter=HostLimiter(delay=0)) == {site.id: 'success'}
+            log = ScrapeLog.query.filter_by(website_id=site.id).one()
+            assert (log.requests_made, log.retries) == (2, 1)
+            assert log.latency_ms_max >= log.latency_ms_avg >= 0
+            assert server.paths() == ['/page', '/page']
+        finally:
+            http_client.BACKOFF = saved
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_session_per_host()
+    test_backoff_is_jittered_and_capped()
+    test_retries_transient_failures()
+    test_transient_503_does_not_fail_the_site()
+    print('HTTP_CLIENT_TESTS_OK')
@@ -0,0 +1,140 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.chatbot_document import ChatbotDocument, ChatbotLshBucket
+from app.services import minhash
+from app.services.chatbot_document_service import (hash_text, near_duplicates, replace_document,
+                                                   search_documents, sign_documents, store_document)
+
+"""
+Near-duplicate chatbot document tests (MinHash/LSH):
+- Signatures: near-identical texts share LSH buckets and score high, unrelated texts do not,
+  very short texts are not signed
+- A near-duplicate from the same source supersedes the stored one (same visibility only);
+  near-duplicates of other sources are kept
+- A scraped page that mirrors another URL is merged into it; notices and scraped pages never
+  delete each other
+- Documents stored before signatures existed are signed by sign_documents(), too-short ones
+  are marked checked
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def circular(token, footer):
+    body = ' '.join(f'Rule {n}: students of batch {token} must follow hostel regulation {n * 7}.'
+                    for n in range(40))
+    return f'{body} Page generated on {footer}.'
+
+
+def cleanup(token):
+    for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+        db.session.delete(d)
+    db.session.commit()
+
+
+def test_signatures():
+    a = minhash.signature(circular('x1', '1 May 2025'))
+    b = minhash.signature(circular('x1', '2 May 2025'))
+    c = minhash.signature(circular('y2', '1 May 2025').replace('Rule', 'Clause').replace('hostel', 'library'))
+    assert len(a) == minhash.NUM_PERM and minhash.unpack(minhash.pack(a)) == a
+    assert minhash.similarity(a, b) >= 0.9
+    assert set(minhash.band_keys(a)) & set(minhash.band_keys(b))
+    assert minhash.similarity(a, c) < 0.5
+    assert minhash.band_keys(a) == minhash.band_keys(minhash.signature(circular('x1', '1 May 2025')))
+    assert minhash.signature('Fee counter opens at 10 AM.') is None
+
+
+def test_same_source_supersedes():
+    app = setup_app()
+    token = 'nd' + uuid.uuid4().hex[:10]
+    with app.app_context():
+        try:
+            first = store_document('notice_pdf', 9001, circular(token, '1 May 2025'), 'public')
+            assert first is not None and len(first.lsh_buckets) == minhash.BANDS
+            first_id = first.id
+            # Same text for students only is a different audience: kept separately
+            private = store_document('notice_pdf', 9001, circular(token, '1 May 2025 (students)'), 'student')
+            # Another notice with almost the same text (e.g. the next semester's) is its own document
+            other = store_document('notice_pdf', 9002, circular(token, '2 May 2025'), 'public')
+            assert private is not None and other is not None
+            assert db.session.get(ChatbotDocument, first_id) is not None
+
+            second = store_document('notice_pdf', 9001, circular(token, '3 May 2025'), 'public')
+            assert second is not None
+            assert db.session.get(ChatbotDocument, first_id) is None
+            assert ChatbotLshBucket.query.filter_by(document_id=first_id).count() == 0
+            assert db.session.get(ChatbotDocument, private.id) is not None
+            assert db.session.get(ChatbotDocument, other.id) is not None
+            hits = search_documents(f'batch {token}', 'guest', limit=5)
+            assert sorted(h['document_id'] for h in hits) == sorted([second.id, other.id])
+        finally:
+            cleanup(token)
+
+
+def test_scraped_mirror_is_merged():
+    app = setup_app()
+    token = 'nm' + uuid.uuid4().hex[:10]
+    with app.app_context():
+        try:
+            notice = store_document('notice', 9003, circular(token, '1 May 2025'), 'public')
+            page, retired = replace_document('scrape_text', None, f'http://a.{token}.example/',
+                                             circular(token, '2 May 2025'), 'public')
+            assert notice is not None and page is not None and retired == 0
+            mirror, retired = replace_document('scrape_text', None, f'http://b.{token}.example/',
+                                               circular(token, '3 May 2025'), 'public')
+            assert mirror is None and retired == 0
+            again = store_document('notice', 9004, circular(token, '4 May 2025'), 'public')
+            assert again is not None
+
+            # The page itself changing slightly still replaces its own version only
+            update, retired = replace_document('scrape_text', None, page.source_url,
+                                               circular(token, '5 May 2025'), 'public')
+            assert update is not None and retired == 1
+            remaining = {d.id for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token))}
+            assert remaining == {notice.id, again.id, update.id}
+        finally:
+            cleanup(token)
+
+
+def test_existing_documents_are_signed():
+    app = setup_app()
+    token = 'ns' + uuid.uuid4().hex[:10]
+    content = circular(token, '1 May 2025')
+    with app.app_context():
+        doc = ChatbotDocument(source_type='notice', content=content, content_hash=hash_text(content),
+                              visibility='public')
+        db.session.add(doc)
+        db.session.commit()
+        short = ChatbotDocument(source_type='notice', content=f'Holiday {token}.',
+                                content_hash=hash_text(f'Holiday {token}.'), visibility='public')
+        db.session.add(short)
+        db.session.commit()
+        try:
+            assert doc.minhash is None and short.minhash is None
+            assert sign_documents() >= 1
+            db.session.refresh(doc)
+            db.session.refresh(short)
+            assert minhash.unpack(doc.minhash) == minhash.signature(content)
+            assert short.minhash == b'' and not short.lsh_buckets  # checked, not re-read
+            assert ChatbotDocument.query.filter(ChatbotDocument.minhash.is_(None)).count() == 0
+            assert [d.id for d in near_duplicates(minhash.signature(circular(token, '9 May')), 'public')] == [doc.id]
+        finally:
+            cleanup(token)
+
+
+if __name__ == '__main__':
+    test_signatures()
+    test_same_source_supersedes()
+    test_scraped_mirror_is_merged()
+    test_existing_documents_are_signed()
+    print('NEAR_DUPLICATE_TESTS_OK')
@@ -0,0 +1,63 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from app.services import page_parser
+from app.services.page_parser import ParsedPage, parse_page, extract_links
+
+"""
+Single-pass page parser tests (pure functions, no app or network):
+- One parse feeds text, PDF links, same-site links, title and modified-date extractors
+- Script/style content never reaches the text; links are absolute, de-duplicated and fragment-free
+- Custom extractor pipelines and parser backends
+"""
+
+PAGE = """<!DOCTYPE html><html><head><title> College
+ Notices </title><meta property="article:modified_time" content="2025-03-12T10:00:00+05:30">
+<style>.x{color:red}</style><script>var hidden = 'secret';</script></head>
+<body><nav><a href="/about">About</a><a href="https://college.example/about#team">About again</a>
+<a href="http://www.college.example/admissions">Admissions</a><a href="https://other.example/">Other</a>
+<a href="mailto:office@college.example">Mail</a><a href="javascript:void(0)">JS</a></nav>
+<p>Exam   schedule released.</p><noscript>enable js</noscript>
+<a href="files/Exam.PDF">Exam</a><a href="/get.pdf?id=3">Fee</a><a href="files/Exam.PDF#page=2">dup</a>
+</body></html>"""
+
+
+def test_parse_page_runs_all_extractors():
+    page = parse_page('https://college.example/notices/index.html', PAGE)
+    assert page.title == 'College Notices'
+    assert page.text.startswith('College Notices About About again Admissions')
+    assert 'Exam schedule released.' in page.text
+    assert 'secret' not in page.text and 'color' not in page.text and 'enable js' not in page.text
+    assert page.pdf_links == ['https://college.example/notices/files/Exam.PDF', 'https://college.example/get.pdf?id=3']
+    assert page.links == ['https://college.example/about', 'http://www.college.example/admissions']
+    assert page.modified_hint == '2025-03-12T10:00:00+05:30'
+
+
+def test_modified_hint_fallbacks():
+    html = '<html><body><time datetime="2024-11-02">2 Nov</time></body></html>'
+    assert parse_page('http://c.example/', html).modified_hint == '2024-11-02'
+    html = '<html><body><p>Home</p><footer>Last updated on: 05/01/2025</footer></body></html>'
+    assert parse_page('http://c.example/', html).modified_hint == '05/01/2025'
+    assert parse_page('http://c.example/', '<p>nothing</p>').modified_hint is None
+
+
+def test_custom_pipeline_and_backend():
+    calls = []
+
+    def count_tables(soup, page):
+        calls.append(len(soup.find_all('table')))
+
+    page = parse_page('http://c.example/', '<table></table><a href="a.pdf">a</a>', extractors=(extract_links, count_tables))
+    assert calls == [1] and page.pdf_links == ['http://c.example/a.pdf'] and page.text == ''
+    assert isinstance(page, ParsedPage)
+    assert page_parser.PARSER in page_parser.PREFERRED_PARSERS
+    assert parse_page('http://c.example/', '<p>x</p>', parser='html.parser').text == 'x'
+
+
+if __name__ == '__main__':
+    test_parse_page_runs_all_extractors()
+    test_modified_hint_fallbacks()
+    test_custom_pipeline_and_backend()
+    print('PAGE_PARSER_TESTS_OK')
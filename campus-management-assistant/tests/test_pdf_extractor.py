@@ -0,0 +1,183 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import time
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.logs import SystemLog
+from app.services import pdf_extractor
+from app.services.pdf_extractor import ExtractionFailed, ExtractorPool
+import pdfplumber
+from app.services.pdf_service import (cached_extraction, cached_pages, extract_pdf_text, file_sha256,
+                                     iter_pdf_pages, parse_pdf)
+from tests.scrape_fixtures import minimal_pdf
+
+"""
+PDF extraction worker tests:
+- Text comes back from a separate process; several documents extract in parallel
+- A document that hangs, crashes its process or overruns the memory cap fails with
+  the matching kind, and the pool replaces the worker and keeps going
+- extract_pdf_text logs failures to system_logs
+- Pages are extracted one at a time (caches released, optional page limit) and cached per page
+"""
+
+
+def sleepy(path):
+    time.sleep(float(path))
+    return path
+
+
+def crashing(path):
+    os._exit(3)
+
+
+def greedy(path):
+    blocks = []
+    while True:
+        blocks.append(bytearray(32 * 1024 * 1024))
+
+
+def failing(path):
+    raise ValueError(f'not a PDF: {path}')
+
+
+def write_pdf(folder, *pages):
+    path = os.path.join(folder, f'{uuid.uuid4().hex}.pdf')
+    with open(path, 'wb') as f:
+        f.write(minimal_pdf(*pages))
+    return path
+
+
+def test_extracts_in_worker_process():
+    pool = ExtractorPool(workers=2)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [write_pdf(tmp, f'Hostel notice {i}') for i in range(3)]
+            results = pool.extract_many(paths)
+            assert [r.result.text for r in results] == [f'hostel notice {i}' for i in range(3)]
+            assert [r.result.page_count for r in results] == [1, 1, 1]
+            assert all(r.error is None for r in results)
+    finally:
+        pool.close()
+
+
+def test_parallel_extraction():
+    pool = ExtractorPool(workers=3, target=sleepy)
+    try:
+        pool.extract('0')  # warm one worker
+        started = time.monotonic()
+        results = pool.extract_many(['0.6', '0.6', '0.6'])
+        elapsed = time.monotonic() - started
+        assert [r.result for r in results] == ['0.6'] * 3
+        assert elapsed < 1.2, elapsed
+    finally:
+        pool.close()
+
+
+def test_timeout_kills_worker():
+    pool = ExtractorPool(workers=1, target=sleepy)
+    try:
+        started = time.monotonic()
+        try:
+            pool.extract('30', timeout=0.5)
+            assert False, 'hung extraction returned'
+        except ExtractionFailed as e:
+            assert e.kind == 'timeout'
+        assert time.monotonic() - started < 5
+        assert pool.extract('0') == '0'
+    finally:
+        pool.close()
+
+
+def test_crash_and_errors_are_contained():
+    pool = ExtractorPool(workers=1, target=crashing)
+    try:
+        try:
+            pool.extract('x')
+            assert False, 'crashed extraction returned'
+        except ExtractionFailed as e:
+            assert e.kind == 'crashed' and 'exit code 3' in str(e)
+    finally:
+        pool.close()
+    pool = ExtractorPool(workers=1, target=failing)
+    try:
+        results = pool.extract_many(['a', 'b'])
+        assert [r.kind for r in results] == ['error', 'error']
+        assert 'not a PDF: a' in results[0].error
+    finally:
+        pool.close()
+
+
+def test_memory_cap():
+    try:
+        import resource  # noqa: F401
+    except ImportError:
+        return  # no address-space limit on this platform
+    pool = ExtractorPool(workers=1, memory_mb=128, target=greedy)
+    try:
+        try:
+            pool.extract('x', timeout=30)
+            assert False, 'memory cap not applied'
+        except ExtractionFailed as e:
+            assert e.kind in ('memory', 'crashed')
+    finally:
+        pool.close()
+
+
+def test_extract_pdf_text_logs_failures():
+    app = create_app()
+    saved = pdf_extractor._POOL, pdf_extractor.ISOLATED
+    pdf_extractor._POOL = ExtractorPool(workers=1, timeout=0.5, target=sleepy)
+    pdf_extractor.ISOLATED = True
+    try:
+        with app.app_context():
+            before = SystemLog.query.filter_by(module='pdf').count()
+            sha = uuid.uuid4().hex * 2
+            assert extract_pdf_text('30', sha) is None
+            assert SystemLog.query.filter_by(module='pdf').count() == before + 1
+            assert 'timed out' in SystemLog.query.filter_by(module='pdf').order_by(SystemLog.id.desc()).first().message
+            assert cached_extraction(sha) is None  # a timeout is retried next time
+    finally:
+        pdf_extractor._POOL.close()
+        pdf_extractor._POOL, pdf_extractor.ISOLATED = saved
+
+
+def test_pages_are_streamed_and_cached():
+    app = create_app()
+    token = 'pg' + uuid.uuid4().hex[:10]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_pdf(tmp, f'Admit card {token}', '', f'Seating  plan {token}')
+        with pdfplumber.open(path) as pdf:
+            pages = []
+            for number, text in iter_pdf_pages(pdf):
+                pages.append((number, text))
+                assert not any(hasattr(pdf.pages[number - 1], p) for p in ('_objects', '_layout'))
+        assert pages == [(1, f'admit card {token}'), (2, ''), (3, f'seating plan {token}')]
+        parsed = parse_pdf(path, max_pages=2)
+        assert parsed.pages == (f'admit card {token}', '') and parsed.page_count == 3
+        assert parsed.text == f'admit card {token}'
+
+        with app.app_context():
+            assert extract_pdf_text(path) == f'admit card {token} seating plan {token}'
+            sha = file_sha256(path)
+            try:
+                assert cached_pages(sha) == [(1, f'admit card {token}'), (3, f'seating plan {token}')]
+                assert cached_extraction(sha).page_count == 3
+            finally:
+                db.session.delete(cached_extraction(sha))
+                db.session.commit()
+
+
+if __name__ == '__main__':
+    test_extracts_in_worker_process()
+    test_parallel_extraction()
+    test_timeout_kills_worker()
+    test_crash_and_errors_are_contained()
+    test_memory_cap()
+    test_extract_pdf_text_logs_failures()
+    test_pages_are_streamed_and_cached()
+    print('PDF_EXTRACTOR_TESTS_OK')
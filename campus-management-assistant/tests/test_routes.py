@@ -89,6 +89,22 @@ def test_chatbot_json_no_key():
         data = r.get_json()
         assert data and data.get('ok') is False and isinstance(data.get('answer'), str)
 
+def test_chatbot_batch_endpoint():
+    app = setup_app()
+    with app.app_context():
+        client = app.test_client()
+        r = client.post('/chatbot/query/batch', json={'queries': []})
+        assert r.status_code == 400
+        r = client.post('/chatbot/query/batch', json={'queries': ['q'] * 1000})
+        assert r.status_code == 400
+        queries = ['Library timings', 'Hello', '', 'library timings?']
+        r = client.post('/chatbot/query/batch', json={'queries': queries})
+        assert r.status_code == 200
+        results = r.get_json()['results']
+        assert [x['query'] for x in results] == ['Library timings', 'Hello', '', 'library timings?']
+        assert results[0]['ok'] is True and results[0]['answer'] == results[3]['answer']
+        assert results[2]['ok'] is False
+
 if __name__ == '__main__':
     # Run tests sequentially
     app = setup_app()
@@ -96,4 +112,5 @@ if __name__ == '__main__':
         test_guest_and_downloads()
         test_student_detail_and_downloads()
         test_chatbot_json_no_key()
+        test_chatbot_batch_endpoint()
         print('ROUTE_TESTS_OK')
@@ -0,0 +1,98 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import time
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeJob
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services.scrape_job_service import start_job_worker
+from tests.scrape_fixtures import serve, minimal_pdf
+
+"""
+Background scrape job tests (local HTTP fixture, no internet):
+- Run endpoints return a job id immediately; the background worker runs it
+- Job status reports progress (sites, PDFs, bytes) and the final outcome
+- Re-submitting while a job is active returns the same job
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    start_job_worker(app)  # as run.py does for the server
+    return app
+
+
+def login_admin(client):
+    return client.post('/login', data={'login_id': 'admin', 'password': 'admin123'})
+
+
+def wait_for_job(client, job_id, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/api/admin/scraper/jobs/{job_id}').get_json()['job']
+        if job['done']:
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_site_run_is_a_background_job():
+    app = setup_app()
+    token = 'jb' + uuid.uuid4().hex[:10]
+    routes = {
+        '/page': (200, {'Content-Type': 'text/html'},
+                  f'<html><body><p>Job page {token}</p><a href="/c.pdf">c</a></body></html>'),
+        '/c.pdf': (200, {'Content-Type': 'application/pdf'}, minimal_pdf(f'Job circular {token}')),
+    }
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes, delay=0.3) as server:
+        blob_store.BLOB_DIR = tmp
+        client = app.test_client()
+        assert login_admin(client).status_code == 302
+        site = ScrapedWebsite(url=f'{server.base_url}/page', name=token)
+        db.session.add(site)
+        db.session.commit()
+        try:
+            started = time.monotonic()
+            r = client.post(f'/api/admin/scraper/sites/{site.id}/run')
+            assert r.status_code == 202
+            job_id = r.get_json()['job_id']
+            # Returned before the (slow) fetch could have finished
+            assert time.monotonic() - started < 0.3
+            again = client.post(f'/api/admin/scraper/sites/{site.id}/run').get_json()
+            assert again['job_id'] == job_id
+
+            job = wait_for_job(client, job_id)
+            assert job['status'] == 'success' and job['kind'] == 'site'
+            assert (job['sites_total'], job['sites_done'], job['sites_failed']) == (1, 1, 0)
+            assert job['pdfs_fetched'] == 1 and job['bytes_fetched'] > 0 and job['percent'] == 100
+            assert len(ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all()) == 2
+
+            # Finished jobs are not reused
+            r = client.post(f'/api/admin/scraper/sites/{site.id}/run')
+            assert r.get_json()['job_id'] != job_id
+            wait_for_job(client, r.get_json()['job_id'])
+
+            assert client.get('/api/admin/scraper/jobs/999999999').status_code == 404
+            site.enabled = False
+            db.session.commit()
+            assert client.post(f'/api/admin/scraper/sites/{site.id}/run').get_json()['status'] == 'disabled'
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            ScrapeJob.query.filter_by(website_id=site.id).delete()
+            db.session.delete(site)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_site_run_is_a_background_job()
+    print('SCRAPE_JOB_TESTS_OK')
@@ -0,0 +1,109 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import uuid
+from datetime import datetime
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services.chatbot_document_service import hash_text, search_documents
+from app.services.search_service import fts_available, search_chatbot_documents
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve
+
+"""
+Scraped document replacement tests (local HTTP fixture, no internet):
+- One chatbot document per scraped URL; changed content replaces it in the table,
+  the in-memory index and the FTS mirror
+- Copies stored before URLs were tracked are claimed or retired
+- Pages that disappear lose their documents; index size/growth on the admin API
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def login_admin(client):
+    return client.post('/login', data={'login_id': 'admin', 'password': 'admin123'})
+
+
+def page(text, links=()):
+    return 200, {'Content-Type': 'text/html'}, f'<html><body><p>{text}</p>' + ''.join(
+        f'<a href="{h}">x</a>' for h in links) + '</body></html>'
+
+
+def test_changed_pages_replace_their_document():
+    app = setup_app()
+    token = 'rd' + uuid.uuid4().hex[:10]
+    old, new = f'kharif{token} semester dates', f'rabi{token} semester dates'
+    routes = {'/': page(old, ['/sub']), '/sub': page(f'sub page {token}')}
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        site = ScrapedWebsite(url=f'{server.base_url}/', name=token, crawl_enabled=True, crawl_max_depth=1)
+        db.session.add(site)
+        db.session.commit()
+        # Written by an older scraper: same site, no URL
+        legacy = ChatbotDocument(source_type='scrape_text', source_id=site.id, content=f'stale copy {token}',
+                                 content_hash=hash_text(f'stale copy {token}'), visibility='public',
+                                 created_at=datetime.utcnow())
+        db.session.add(legacy)
+        db.session.commit()
+        limiter = HostLimiter(delay=0)
+        try:
+            scrape_sites([site], limiter=limiter)
+            docs = ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all()
+            assert sorted(d.source_url for d in docs) == [site.url, f'{server.base_url}/sub']
+            assert ScrapeLog.query.filter_by(website_id=site.id).one().documents_replaced == 1
+            assert search_documents(f'kharif{token}', 'guest')
+
+            routes['/'] = page(new, ['/sub'])
+            scrape_sites([site], limiter=limiter)
+            current = ChatbotDocument.query.filter_by(source_url=site.url).one()
+            assert new in current.content
+            assert not search_documents(f'kharif{token}', 'guest')
+            assert [r['document_id'] for r in search_documents(f'rabi{token}', 'guest')] == [current.id]
+            if fts_available():
+                assert not search_chatbot_documents(f'kharif{token}', 'guest')
+                assert search_chatbot_documents(f'rabi{token}', 'guest')[0]['document_id'] == current.id
+
+            # A sub-page that is gone takes its document with it
+            del routes['/sub']
+            scrape_sites([site], limiter=limiter)
+            assert ChatbotDocument.query.filter_by(source_url=f'{server.base_url}/sub').count() == 0
+            log = ScrapeLog.query.filter_by(website_id=site.id).order_by(ScrapeLog.id.desc()).first()
+            assert log.documents_replaced == 1 and log.status == 'success'
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+
+
+def test_index_stats_api():
+    app = setup_app()
+    with app.app_context():
+        client = app.test_client()
+        login_admin(client)
+        r = client.get('/api/admin/scraper/index-stats')
+        assert r.status_code == 200
+        stats = r.get_json()['stats']
+        assert stats['documents'] == ChatbotDocument.query.count()
+        assert sum(stats['by_source_type'].values()) == stats['documents']
+        for key in ('source_urls', 'indexed_documents', 'indexed_terms', 'artifact_bytes', 'growth'):
+            assert key in stats
+
+
+if __name__ == '__main__':
+    test_changed_pages_replace_their_document()
+    test_index_stats_api()
+    print('SCRAPED_DOCUMENTS_TESTS_OK')
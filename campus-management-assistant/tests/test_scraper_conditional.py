@@ -0,0 +1,142 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog, FetchRecord
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services import scraper_service
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve, minimal_pdf, stored_files
+
+"""
+Conditional fetch tests (local HTTP fixture, no internet):
+- Validators (ETag / Last-Modified / body hash) are stored per URL in fetch_records
+- A 304 page skips parsing and PDF requests; a 304 or identical PDF is not saved or re-extracted
+- A page whose document failed to store is fetched and stored again on the next run
+- ScrapeLog records bytes fetched/saved and unchanged URLs; only extraction cache hits count as skipped extractions
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def etag_route(body, etag, content_type):
+    def route(handler):
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': content_type, 'ETag': etag}, body
+    return route
+
+
+def test_unchanged_pages_and_pdfs_are_skipped():
+    app = setup_app()
+    token = 'cg' + uuid.uuid4().hex[:10]
+    page = f'<html><body><p>Conditional {token}</p><a href="/n.pdf">n</a><a href="/s.pdf">s</a></body></html>'
+    pdf_n = minimal_pdf(f'Notice {token}')
+    pdf_s = minimal_pdf(f'Static {token}')
+    routes = {
+        '/page': etag_route(page, f'"p-{token}"', 'text/html'),
+        '/n.pdf': etag_route(pdf_n, f'"n-{token}"', 'application/pdf'),
+        # No validators at all: only the body hash can tell it is unchanged
+        '/s.pdf': (200, {'Content-Type': 'application/pdf'}, pdf_s),
+    }
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        site = ScrapedWebsite(url=f'{server.base_url}/page', name=token)
+        db.session.add(site)
+        db.session.commit()
+        limiter = HostLimiter(connections=2, delay=0)
+        try:
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            first = ScrapeLog.query.filter_by(website_id=site.id).one()
+            assert first.not_modified == 0 and first.extractions_skipped == 0 and first.bytes_saved == 0
+            assert first.bytes_fetched == len(page) + len(pdf_n) + len(pdf_s)
+            record = FetchRecord.query.filter_by(url=site.url).one()
+            assert record.etag == f'"p-{token}"' and record.size == len(page) and record.content_hash
+            assert FetchRecord.query.filter_by(website_id=site.id).count() == 3
+            files = stored_files(tmp)
+            assert len(files) == 2
+            docs = ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).count()
+            assert docs == 3
+
+            # Page unchanged: one conditional request, nothing parsed, no PDF requests
+            server.requests.clear()
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            assert server.paths() == ['/page']
+            assert server.requests[0][1].get('If-None-Match') == f'"p-{token}"'
+            second = ScrapeLog.query.filter_by(website_id=site.id).order_by(ScrapeLog.id.desc()).first()
+            assert (second.not_modified, second.extractions_skipped) == (1, 0)
+            assert second.bytes_fetched == 0 and second.bytes_saved == len(page)
+
+            # Page changed: PDFs are revalidated; one 304, one identical 200
+            changed = page.replace('Conditional', 'Updated')
+            routes['/page'] = etag_route(changed, f'"p2-{token}"', 'text/html')
+            server.requests.clear()
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            assert sorted(server.paths()) == ['/n.pdf', '/page', '/s.pdf']
+            third = ScrapeLog.query.filter_by(website_id=site.id).order_by(ScrapeLog.id.desc()).first()
+            assert third.not_modified == 2 and third.extractions_skipped == 0
+            assert third.bytes_saved == len(pdf_n)
+            assert stored_files(tmp) == files
+            # The changed page replaces its previous document instead of adding a copy
+            assert ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).count() == docs
+            current = ChatbotDocument.query.filter_by(source_url=site.url).one()
+            assert 'Updated' in current.content and third.documents_replaced == 1
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+            assert FetchRecord.query.filter_by(url=site.url).count() == 0
+
+
+def test_failed_store_is_retried():
+    app = setup_app()
+    token = 'cf' + uuid.uuid4().hex[:10]
+    routes = {'/page': etag_route(f'<html><body><p>Retry {token}</p></body></html>', f'"r-{token}"', 'text/html')}
+    saved_replace = scraper_service.replace_document
+
+    def failing(*args, **kwargs):
+        raise RuntimeError('database is locked')
+
+    with app.app_context(), serve(routes) as server:
+        site = ScrapedWebsite(url=f'{server.base_url}/page', name=token)
+        db.session.add(site)
+        db.session.commit()
+        limiter = HostLimiter(delay=0)
+        try:
+            scraper_service.replace_document = failing
+            scrape_sites([site], limiter=limiter)
+            record = FetchRecord.query.filter_by(url=site.url).one()
+            assert record.etag is None and record.content_hash is None
+            assert ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).count() == 0
+
+            # No If-None-Match: the page comes back in full and is stored this time
+            scraper_service.replace_document = saved_replace
+            server.requests.clear()
+            scrape_sites([site], limiter=limiter)
+            assert 'If-None-Match' not in server.requests[0][1]
+            assert ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).count() == 1
+        finally:
+            scraper_service.replace_document = saved_replace
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_unchanged_pages_and_pdfs_are_skipped()
+    test_failed_store_is_retried()
+    print('SCRAPER_CONDITIONAL_TESTS_OK')
@@ -0,0 +1,191 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog, FetchRecord
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services.crawler import CrawlPolicy, Frontier, canonicalize
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve, minimal_pdf
+
+"""
+Same-site crawl tests (local HTTP fixture, no internet):
+- URL canonicalization and the frontier's depth, page budget and include/exclude patterns
+- robots.txt is honoured for discovered pages; fragments and query order do not cause refetches
+- Re-crawls revalidate pages with conditional GETs, follow 304 pages through their stored links
+  and drop pages that are gone
+- Crawl settings via the admin API
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+# robots.txt and the (missing) /sitemap.xml are requested alongside the pages
+AUX = ('/robots.txt', '/sitemap.xml')
+
+
+def login_admin(client):
+    return client.post('/login', data={'login_id': 'admin', 'password': 'admin123'})
+
+
+def page_route(token, name, links):
+    etag = f'"{name}-{token}"'
+    body = f'<html><body><p>{name} page {token}</p>' + ''.join(f'<a href="{h}">{h}</a>' for h in links) + '</body></html>'
+
+    def route(handler):
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'text/html', 'ETag': etag}, body
+    return route
+
+
+def site_routes(token):
+    return {
+        '/robots.txt': (200, {'Content-Type': 'text/plain'}, 'User-agent: *\nDisallow: /private/\n'),
+        '/': page_route(token, 'home', ['/a', '/a#top', '/a?y=2&x=1', '/a?x=1&y=2', '/private/p', '/skip/s',
+                                        '/b', 'http://other.example/', '/f.pdf']),
+        '/a': page_route(token, 'alpha', ['/a/deep', '/f.pdf', '/']),
+        '/a/deep': page_route(token, 'deep', ['/a/deep/deeper']),
+        '/a/deep/deeper': page_route(token, 'deeper', []),
+        '/b': page_route(token, 'beta', []),
+        '/private/p': page_route(token, 'private', []),
+        '/skip/s': page_route(token, 'skip', []),
+        '/f.pdf': (200, {'Content-Type': 'application/pdf'}, minimal_pdf(f'Crawled {token}')),
+    }
+
+
+def cleanup(token, sites):
+    for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+        db.session.delete(d)
+    for s in sites:
+        db.session.delete(s)
+    db.session.commit()
+
+
+def test_canonicalize_and_frontier():
+    assert canonicalize('HTTP://Example.ORG:80/a?b=2&a=1#x') == 'http://example.org/a?a=1&b=2'
+    assert canonicalize('https://example.org:8443') == 'https://example.org:8443/'
+    frontier = Frontier(CrawlPolicy(max_depth=1, max_pages=3, include=('/n*',), exclude=('*/old/*',)))
+    frontier.add_seed('http://c.example/')
+    assert frontier.offer('http://c.example/#top', 1) is None
+    assert frontier.offer('http://c.example/news', 2) is None
+    assert frontier.offer('http://c.example/about', 1) is None
+    assert frontier.offer('http://c.example/notices/old/1', 1) is None
+    assert frontier.offer_all(['http://c.example/news', 'http://c.example/notices', 'http://c.example/news2'], 1) \
+        == ['http://c.example/news', 'http://c.example/notices']
+    assert frontier.queued == 3
+
+
+def test_crawl_follows_links_within_limits():
+    app = setup_app()
+    token = 'cr' + uuid.uuid4().hex[:10]
+    routes = site_routes(token)
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        site = ScrapedWebsite(url=f'{server.base_url}/', name=token, crawl_enabled=True,
+                              crawl_max_depth=2, crawl_exclude='*/skip/*')
+        db.session.add(site)
+        db.session.commit()
+        limiter = HostLimiter(connections=2, delay=0)
+        try:
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            paths = server.paths()
+            assert sorted(p for p in paths if p not in AUX) == ['/', '/a', '/a/deep', '/a?x=1&y=2', '/b', '/f.pdf']
+            assert paths.count('/robots.txt') == 1
+            log = ScrapeLog.query.filter_by(website_id=site.id).one()
+            assert (log.pages_crawled, log.robots_blocked, log.pdf_links_found) == (5, 1, 1)
+            alpha = FetchRecord.query.filter_by(url=f'{server.base_url}/a').one()
+            assert alpha.website_id == site.id
+            assert alpha.links.splitlines() == [f'{server.base_url}/a/deep', f'{server.base_url}/']
+            assert ChatbotDocument.query.filter(ChatbotDocument.content.contains(f'deep page {token}')).count() == 1
+
+            # Re-crawl: every visited page is revalidated (304), nothing is parsed or downloaded
+            server.requests.clear()
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            assert sorted(p for p in server.paths() if p not in AUX) == ['/', '/a', '/a/deep', '/a?x=1&y=2', '/b']
+            assert all(h.get('If-None-Match') for p, h, _, _ in server.requests if p not in AUX)
+            log = ScrapeLog.query.filter_by(website_id=site.id).order_by(ScrapeLog.id.desc()).first()
+            assert (log.pages_crawled, log.not_modified, log.bytes_fetched) == (5, 5, 0)
+
+            # A page that disappears is dropped from the visited set; the site still succeeds
+            del routes['/b']
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            assert FetchRecord.query.filter_by(url=f'{server.base_url}/b').first() is None
+
+            # The seed itself failing fails the site
+            del routes['/']
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'error'}
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            cleanup(token, [site])
+
+
+def test_crawl_budget_and_include_patterns():
+    app = setup_app()
+    token = 'cb' + uuid.uuid4().hex[:10]
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(site_routes(token)) as server:
+        blob_store.BLOB_DIR = tmp
+        budget = ScrapedWebsite(url=f'{server.base_url}/', name=f'{token}-budget', crawl_enabled=True, crawl_max_pages=2)
+        db.session.add(budget)
+        db.session.commit()
+        try:
+            scrape_sites([budget], limiter=HostLimiter(delay=0))
+            pages = [p for p in server.paths() if not p.endswith(('.pdf', '.txt', '.xml'))]
+            assert sorted(pages) == ['/', '/a']
+            assert ScrapeLog.query.filter_by(website_id=budget.id).one().pages_crawled == 2
+
+            budget.crawl_max_pages = None
+            budget.crawl_include = '/a*'
+            db.session.commit()
+            server.requests.clear()
+            scrape_sites([budget], limiter=HostLimiter(delay=0))
+            pages = [p for p in server.paths() if not p.endswith(('.pdf', '.txt', '.xml'))]
+            assert '/b' not in pages and '/a/deep' in pages
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            cleanup(token, [budget])
+
+
+def test_admin_crawl_settings_api():
+    app = setup_app()
+    token = 'ca' + uuid.uuid4().hex[:10]
+    with app.app_context():
+        site = ScrapedWebsite(url=f'http://{token}.example/', name=token)
+        db.session.add(site)
+        db.session.commit()
+        client = app.test_client()
+        try:
+            login_admin(client)
+            url = f'/api/admin/scraper/sites/{site.id}/crawl'
+            r = client.post(url, json={'enabled': True, 'max_depth': '3', 'max_pages': '', 'include': '/notices/*, /exam*'})
+            assert r.status_code == 200 and r.get_json()['ok']
+            db.session.refresh(site)
+            assert site.crawl_enabled and site.crawl_max_depth == 3 and site.crawl_max_pages is None
+            assert site.crawl_include == '/notices/*\n/exam*'
+            assert CrawlPolicy.from_site(site).include == ('/notices/*', '/exam*')
+            assert client.post(url, json={'max_depth': 99}).status_code == 400
+            assert client.post(url, json={'max_pages': 'many'}).status_code == 400
+            sites = client.get('/api/admin/scraper/sites').get_json()['sites']
+            assert next(s for s in sites if s['id'] == site.id)['crawl']['max_depth'] == 3
+        finally:
+            cleanup(token, [site])
+
+
+if __name__ == '__main__':
+    test_canonicalize_and_frontier()
+    test_crawl_follows_links_within_limits()
+    test_crawl_budget_and_include_patterns()
+    test_admin_crawl_settings_api()
+    print('SCRAPER_CRAWL_TESTS_OK')
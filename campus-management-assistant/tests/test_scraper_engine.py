@@ -0,0 +1,90 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import tempfile
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve, minimal_pdf
+
+"""
+Concurrent scraper engine tests (local HTTP fixture, no internet):
+- Per-host limiter caps connections and spaces request starts
+- Sites and their PDFs are fetched on the pool; documents and one ScrapeLog per site are written
+- Page errors mark the site as failed; PDF errors are logged and skipped
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_host_limiter_spacing():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = HostLimiter(connections=1, delay=1.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        with limiter.slot('http://a.example/x'):
+            pass
+    with limiter.slot('http://b.example/y'):
+        pass
+    assert sleeps == [1.0, 1.0]
+
+
+def test_concurrent_scrape_writes_once_per_site():
+    app = setup_app()
+    token = 'sc' + uuid.uuid4().hex[:10]
+    routes = {
+        '/broken.pdf': (200, {'Content-Type': 'application/pdf'}, b'not a pdf'),
+    }
+    for n in range(3):
+        routes[f'/p{n}'] = (200, {'Content-Type': 'text/html'},
+                            f'<html><body><p>Page {n} {token} notice</p><script>skip()</script>'
+                            f'<a href="/d{n}.pdf">pdf</a><a href="/broken.pdf">bad</a></body></html>')
+        routes[f'/d{n}.pdf'] = (200, {'Content-Type': 'application/pdf'}, minimal_pdf(f'Circular {n} {token}'))
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes, delay=0.15) as server:
+        blob_store.BLOB_DIR = tmp
+        sites = [ScrapedWebsite(url=f'{server.base_url}/p{n}', name=f'{token}-{n}') for n in range(3)]
+        sites.append(ScrapedWebsite(url=f'{server.base_url}/missing', name=f'{token}-x'))
+        db.session.add_all(sites)
+        db.session.commit()
+        try:
+            statuses = scrape_sites(sites, workers=4, limiter=HostLimiter(connections=2, delay=0))
+            assert statuses == {s.id: 'success' for s in sites[:3]} | {sites[3].id: 'error'}
+            # Pool ran requests in parallel, but never more than the per-host cap
+            assert server.max_in_flight == 2
+            for s in sites:
+                logs = ScrapeLog.query.filter_by(website_id=s.id).all()
+                assert len(logs) == 1
+            log = ScrapeLog.query.filter_by(website_id=sites[0].id).one()
+            assert log.pdf_links_found == 1 and log.extracted_text_length > 0
+            docs = ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all()
+            assert sorted(d.source_type for d in docs) == ['scrape_pdf'] * 3 + ['scrape_text'] * 3
+            assert all('skip()' not in d.content for d in docs)
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            for s in sites:
+                db.session.delete(s)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_host_limiter_spacing()
+    test_concurrent_scrape_writes_once_per_site()
+    print('SCRAPER_ENGINE_TESTS_OK')
@@ -0,0 +1,108 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import hashlib
+import io
+import tempfile
+import uuid
+import requests
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, FetchRecord
+from app.models.chatbot_document import ChatbotDocument
+from app.models.logs import SystemLog
+from app.services import blob_store, scraper_service
+from app.services.scraper_service import HostLimiter, PdfResult, Validators, scrape_sites, _stream_pdf
+from tests.scrape_fixtures import serve, minimal_pdf, stored_files
+
+"""
+Streaming PDF download tests (local HTTP fixture, no internet):
+- PDFs are streamed to a temp file, hashed on the fly and moved to their blob address when complete
+- Non-PDF Content-Types, bad signatures and oversized bodies are dropped without leaving files
+"""
+
+
+def fake_response(body: bytes) -> requests.Response:
+    r = requests.Response()
+    r.status_code = 200
+    r.raw = io.BytesIO(body)
+    return r
+
+
+def test_stream_pdf_caps_size_without_content_length():
+    saved_dir, saved_max = blob_store.BLOB_DIR, scraper_service.PDF_MAX_BYTES
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_store.BLOB_DIR = tmp
+        try:
+            body = minimal_pdf('streamed')
+            result = PdfResult(1, 'http://x.example/a.pdf')
+            path = _stream_pdf(fake_response(body), result, Validators())
+            assert open(path, 'rb').read() == body
+            assert result.content_hash == hashlib.sha256(body).hexdigest() and result.nbytes == len(body)
+
+            # Same bytes again: nothing is written
+            again = PdfResult(1, 'http://x.example/a.pdf')
+            assert _stream_pdf(fake_response(body), again, Validators(content_hash=result.content_hash)) is None
+            assert again.unchanged
+
+            scraper_service.PDF_MAX_BYTES = 100
+            try:
+                _stream_pdf(fake_response(body), PdfResult(1, 'http://x.example/b.pdf'), Validators())
+                raise AssertionError('expected the size cap to trip')
+            except ValueError as e:
+                assert 'too large' in str(e)
+            assert stored_files(tmp) == [path]
+            assert os.listdir(os.path.join(tmp, 'tmp')) == []
+        finally:
+            blob_store.BLOB_DIR, scraper_service.PDF_MAX_BYTES = saved_dir, saved_max
+
+
+def test_scrape_drops_non_pdf_and_oversized_payloads():
+    app = create_app()
+    app.testing = True
+    token = 'pd' + uuid.uuid4().hex[:10]
+    good = minimal_pdf(f'Good {token}', f'Annexure {token}')
+    routes = {
+        '/page': (200, {'Content-Type': 'text/html'},
+                  '<html><body><p>Downloads</p><a href="/good.pdf">1</a><a href="/login.pdf">2</a>'
+                  '<a href="/fake.pdf">3</a><a href="/big.pdf">4</a></body></html>'),
+        '/good.pdf': (200, {'Content-Type': 'application/pdf'}, good),
+        '/login.pdf': (200, {'Content-Type': 'text/html'}, b'<html>please sign in</html>'),
+        '/fake.pdf': (200, {'Content-Type': 'application/octet-stream'}, b'<html>not really</html>'),
+        '/big.pdf': (200, {'Content-Type': 'application/pdf'}, good + b'%' * 4096),
+    }
+    saved_dir, saved_max = blob_store.BLOB_DIR, scraper_service.PDF_MAX_BYTES
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        scraper_service.PDF_MAX_BYTES = len(good) + 1024
+        site = ScrapedWebsite(url=f'{server.base_url}/page', name=token)
+        db.session.add(site)
+        db.session.commit()
+        first_log = db.session.query(db.func.max(SystemLog.id)).scalar() or 0
+        try:
+            assert scrape_sites([site], limiter=HostLimiter(delay=0)) == {site.id: 'success'}
+            files = stored_files(tmp)
+            assert len(files) == 1 and open(files[0], 'rb').read() == good
+            record = FetchRecord.query.filter_by(url=f'{server.base_url}/good.pdf').one()
+            assert record.content_hash == record.blob_sha256 == hashlib.sha256(good).hexdigest()
+            assert record.file_path == files[0] == blob_store.blob_path(record.blob_sha256)
+            errors = [l.message for l in SystemLog.query.filter(SystemLog.id > first_log).all()]
+            assert any('Content-Type text/html' in m for m in errors)
+            assert any('bad signature' in m for m in errors)
+            assert any('too large' in m for m in errors)
+            doc = ChatbotDocument.query.filter(ChatbotDocument.content.contains(token.lower())).one()
+            assert [c.page_no for c in doc.chunks] == [1, 2]
+        finally:
+            blob_store.BLOB_DIR, scraper_service.PDF_MAX_BYTES = saved_dir, saved_max
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token.lower())).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_stream_pdf_caps_size_without_content_length()
+    test_scrape_drops_non_pdf_and_oversized_payloads()
+    print('SCRAPER_PDF_DOWNLOAD_TESTS_OK')
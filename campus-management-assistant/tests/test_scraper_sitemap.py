@@ -0,0 +1,129 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import gzip
+import tempfile
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.scraper import ScrapedWebsite, ScrapeLog, FetchRecord
+from app.models.chatbot_document import ChatbotDocument
+from app.services import blob_store
+from app.services.sitemap import SitemapEntry, parse_sitemap
+from app.services.scraper_service import HostLimiter, scrape_sites
+from tests.scrape_fixtures import serve
+
+"""
+Sitemap-driven re-crawl tests (local HTTP fixture, no internet):
+- <urlset>, <sitemapindex>, gzipped and plain-text sitemaps are parsed
+- Sitemaps are found through robots.txt; each page's <lastmod> is stored in fetch_records
+- Re-crawls request only new or changed entries and report the rest as pages_skipped
+"""
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def urlset(entries):
+    rows = ''.join(f'<url><loc>{loc}</loc>' + (f'<lastmod>{mod}</lastmod>' if mod else '') + '</url>'
+                   for loc, mod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{rows}</urlset>'
+
+
+def test_parse_sitemap_formats():
+    entries, children = parse_sitemap('http://c.example/sitemap.xml', urlset([
+        ('http://c.example/a', '2025-03-01'), ('/b', None)]).encode())
+    assert entries == [SitemapEntry('http://c.example/a', '2025-03-01'), SitemapEntry('http://c.example/b')]
+    assert children == []
+    index = (f'<sitemapindex {NS}><sitemap><loc>http://c.example/s1.xml.gz</loc>'
+             f'<lastmod>2025-01-01</lastmod></sitemap></sitemapindex>')
+    assert parse_sitemap('http://c.example/', index.encode()) == ([], ['http://c.example/s1.xml.gz'])
+    packed = gzip.compress(urlset([('http://c.example/z', '2025-02-02')]).encode())
+    assert parse_sitemap('http://c.example/', packed)[0] == [SitemapEntry('http://c.example/z', '2025-02-02')]
+    text = b'http://c.example/one\n\nhttp://c.example/two\n'
+    assert [e.url for e in parse_sitemap('http://c.example/', text)[0]] == ['http://c.example/one', 'http://c.example/two']
+    try:
+        parse_sitemap('http://c.example/', b'<urlset><url>')
+        assert False, 'malformed XML accepted'
+    except ValueError:
+        pass
+
+
+def test_recrawl_fetches_only_changed_entries():
+    app = setup_app()
+    token = 'sm' + uuid.uuid4().hex[:10]
+
+    def page(name, links=()):
+        body = f'<html><body><p>{name} {token}</p>' + ''.join(f'<a href="{h}">x</a>' for h in links) + '</body></html>'
+        return 200, {'Content-Type': 'text/html'}, body
+
+    routes = {
+        '/': page('home', ['/n1']),
+        '/n1': page('notice one'),
+        '/n2': page('notice two'),
+        '/n3': page('notice three'),
+        '/p1': page('programmes', ['/p1/att']),
+        '/p1/att': page('attachments'),
+    }
+    saved_dir = blob_store.BLOB_DIR
+    with app.app_context(), tempfile.TemporaryDirectory() as tmp, serve(routes) as server:
+        blob_store.BLOB_DIR = tmp
+        base = server.base_url
+        lastmods = {'/n1': '2025-03-01', '/n2': '2025-03-02', '/p1': '2025-01-10T08:00:00+05:30'}
+
+        def publish():
+            routes['/sitemap-notices.xml'] = (200, {'Content-Type': 'application/xml'}, urlset(
+                [(f'{base}{p}', lastmods[p]) for p in sorted(lastmods) if p.startswith('/n')]
+                + [('http://other.example/n9', '2025-03-01')]))
+            routes['/sitemap-pages.xml.gz'] = (200, {'Content-Type': 'application/gzip'}, gzip.compress(
+                urlset([(f'{base}/p1', lastmods['/p1'])]).encode()))
+
+        routes['/robots.txt'] = (200, {'Content-Type': 'text/plain'}, f'User-agent: *\nSitemap: {base}/sitemap_index.xml\n')
+        routes['/sitemap_index.xml'] = (200, {'Content-Type': 'application/xml'}, (
+            f'<sitemapindex {NS}><sitemap><loc>{base}/sitemap-notices.xml</loc></sitemap>'
+            f'<sitemap><loc>{base}/sitemap-pages.xml.gz</loc></sitemap></sitemapindex>'))
+        publish()
+        site = ScrapedWebsite(url=f'{base}/', name=token, crawl_enabled=True, crawl_max_depth=2)
+        db.session.add(site)
+        db.session.commit()
+        limiter = HostLimiter(connections=2, delay=0)
+        try:
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            pages = sorted(p for p in server.paths() if not p.endswith(('.txt', '.xml', '.gz')))
+            assert pages == ['/', '/n1', '/n2', '/p1', '/p1/att']
+            assert FetchRecord.query.filter_by(url=f'{base}/p1').one().lastmod == lastmods['/p1']
+            assert FetchRecord.query.filter_by(url=f'{base}/p1/att').one().lastmod is None
+            assert ScrapeLog.query.filter_by(website_id=site.id).one().pages_skipped == 0
+
+            # One entry changed, one is new: everything else is skipped without a request,
+            # though links stored for skipped pages are still followed
+            lastmods['/n2'] = '2025-04-01'
+            lastmods['/n3'] = '2025-04-02'
+            publish()
+            server.requests.clear()
+            assert scrape_sites([site], limiter=limiter) == {site.id: 'success'}
+            pages = sorted(p for p in server.paths() if not p.endswith(('.txt', '.xml', '.gz')))
+            assert pages == ['/', '/n2', '/n3', '/p1/att']
+            log = ScrapeLog.query.filter_by(website_id=site.id).order_by(ScrapeLog.id.desc()).first()
+            assert log.pages_skipped == 2 and log.pages_crawled == 4
+            assert FetchRecord.query.filter_by(url=f'{base}/n2').one().lastmod == '2025-04-01'
+            assert ChatbotDocument.query.filter(ChatbotDocument.content.contains(f'notice three {token}')).count() == 1
+        finally:
+            blob_store.BLOB_DIR = saved_dir
+            for d in ChatbotDocument.query.filter(ChatbotDocument.content.contains(token)).all():
+                db.session.delete(d)
+            db.session.delete(site)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_parse_sitemap_formats()
+    test_recrawl_fetches_only_changed_entries()
+    print('SCRAPER_SITEMAP_TESTS_OK')
@@ -0,0 +1,110 @@
+import os, sys
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+import uuid
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.faq import FAQ
+from app.models.notice import Notice
+from app.models.notice_category import NoticeCategory
+from app.services.search_service import (
+    fts_available, match_expression, search_faqs, search_notices, search_chatbot_documents,
+)
+from app.services.faq_service import answered_faqs_filtered
+
+"""
+FTS5 search service tests:
+- Triggers keep the FTS mirrors in sync on insert/update/delete
+- Notice search applies role visibility (guest/student/restricted)
+- FAQ filter uses ranked full-text search
+"""
+
+
+def setup_app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+def test_match_expression_is_quoted():
+    assert match_expression('the') is None
+    assert match_expression('exam "form"', match_all=True) == '"exam"* AND "form"*'
+
+
+def test_notice_visibility_and_trigger_sync():
+    app = setup_app()
+    with app.app_context():
+        assert fts_available()
+        token = 'ft' + uuid.uuid4().hex[:10]
+        admin = User.query.filter_by(role='admin').first()
+        cat = NoticeCategory.query.first()
+        if not cat:
+            cat = NoticeCategory(name='General')
+            db.session.add(cat)
+            db.session.flush()
+        student = User(login_id=f'stu_{token}', password_hash='x', role='student', department='ECE', year=3)
+        db.session.add(student)
+        notices = [
+            Notice(title=f'{token} public', content='body', category_id=cat.id, visibility='public',
+                   status='published', created_by=admin.id),
+            Notice(title='student only', content=f'{token} body', category_id=cat.id, visibility='student',
+                   status='published', created_by=admin.id),
+            Notice(title='restricted', content=f'{token} lab', category_id=cat.id, visibility='restricted',
+                   target_department='ECE', target_year=3, status='published', created_by=admin.id),
+            Notice(title='draft', content=f'{token} draft', category_id=cat.id, visibility='public',
+                   status='draft', created_by=admin.id),
+        ]
+        db.session.add_all(notices)
+        db.session.commit()
+        try:
+            assert [n.id for n in search_notices(token, None)] == [notices[0].id]
+            # Title hit outranks body hits for a student
+            found = [n.id for n in search_notices(token, student)]
+            assert found[0] == notices[0].id and set(found) == {n.id for n in notices[:3]}
+            student.department = 'CSE'
+            assert {n.id for n in search_notices(token, student)} == {notices[0].id, notices[1].id}
+            # Update trigger: old text is gone, new text is searchable
+            notices[0].title = 'renamed'
+            db.session.commit()
+            assert search_notices(token, None) == []
+            assert [n.id for n in search_notices('renamed', None) if n.id == notices[0].id]
+        finally:
+            for n in notices:
+                db.session.delete(n)
+            db.session.delete(student)
+            db.session.commit()
+        assert search_notices(token, User(role='admin')) == []
+
+
+def test_faq_search_ranked_and_filtered():
+    app = setup_app()
+    with app.app_context():
+        token = 'fq' + uuid.uuid4().hex[:10]
+        faqs = [
+            FAQ(question=f'Where is the {token} office?', answer=f'{token} office is in block A.',
+                category='General', status='answered'),
+            FAQ(question='Unrelated', answer=f'Mentions {token} once.', category='Exams', status='answered'),
+            FAQ(question=f'{token} pending?', category='General', status='pending'),
+        ]
+        db.session.add_all(faqs)
+        db.session.commit()
+        try:
+            assert [f.id for f in search_faqs(token)] == [faqs[0].id, faqs[1].id]
+            assert [f.id for f in answered_faqs_filtered(category='Exams', q=token)] == [faqs[1].id]
+            assert search_faqs(f'{token} nonexistentword') == []
+            hits = search_chatbot_documents(token, 'guest')
+            assert hits == []
+        finally:
+            for f in faqs:
+                db.session.delete(f)
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    test_match_expression_is_quoted()
+    test_notice_visibility_and_trigger_sync()
+    test_faq_search_ranked_and_filtered()
+    print('SEARCH_SERVICE_TESTS_OK')